@@ -0,0 +1,300 @@
+# api_v3/mixins.py
+# Provides v3 view mixins: conditional GET, payload and count caching, sparse fieldsets, history and scan updates.
+# Exists so the frontend can revalidate cached payloads without the server re-running queries and serializers.
+
+import hashlib
+import json
+from concurrent import futures
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+
+from api_v3.serializers import SampleHistoryEntrySerializer, build_history_entries
+from app.pagination import HistoryKeysetPagination
+from core.services.coalescer import COALESCE_RETRY_AFTER, get_sample_scan_coalescer
+from core.services.samples import SCAN_STATUS_NOT_FOUND
+from core.versions import get_data_versions
+
+
+class ConditionalGetMixin:
+    """
+    Answers list and retrieve requests with 304 Not Modified while the client's ETag or Last-Modified
+    validator still matches.
+
+    Validators come from the row count and ``max(last_modified)`` of the filtered scope plus the data
+    versions of ``conditional_models`` (the models the payload is built from), so checking them costs one
+    aggregate query and one cache read instead of the full query, annotations and serialization.
+    """
+
+    conditional_models = ()
+
+    def get_conditional_models(self):
+        return self.conditional_models or (self.get_queryset().model,)
+
+    def get_conditional_queryset(self):
+        """
+        Queryset the validators are aggregated over; override to drop annotations the payload does not filter on.
+        """
+        return self.get_queryset()
+
+    def get_conditional_scope(self):
+        queryset = self.filter_queryset(self.get_conditional_queryset())
+        if self.action == "retrieve":
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return queryset
+
+    def get_conditional_validators(self):
+        """
+        Return the (etag, last_modified timestamp) pair for the current request.
+        """
+        queryset = self.get_conditional_scope()
+        aggregates = {"row_count": Count("pk")}
+        if any(field.name == "last_modified" for field in queryset.model._meta.concrete_fields):
+            aggregates["latest"] = Max("last_modified")
+        scope = queryset.order_by().aggregate(**aggregates)
+        latest = scope.get("latest")
+        versions = get_data_versions(*self.get_conditional_models())
+
+        user = getattr(self.request, "user", None)
+        fingerprint = json.dumps(
+            [
+                self.request.get_full_path(),
+                getattr(user, "pk", None),
+                versions,
+                scope["row_count"],
+                latest.isoformat() if latest else None,
+            ]
+        )
+        etag = quote_etag(hashlib.sha1(fingerprint.encode("utf-8")).hexdigest())
+        last_modified = max(versions) // 1_000_000_000
+        if latest:
+            last_modified = max(last_modified, int(latest.timestamp()))
+        return etag, last_modified
+
+    def conditional_get(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_conditional_validators()
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+            # Clients may keep the payload but must revalidate it on every use.
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_get(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_get(super().retrieve, request, *args, **kwargs)
+
+
+class VersionedCacheMixin:
+    """
+    Serves an APIView's GET payload from the shared cache, keyed by the data versions of ``cache_models``.
+
+    Any save, delete or many-to-many change on those models bumps their version (see core.signals), so a
+    stale payload is never served. Responses carry an ETag and a private ``max-age`` so browsers can skip
+    the request entirely for ``cache_max_age`` seconds and revalidate cheaply afterwards.
+    """
+
+    cache_models = ()
+    cache_max_age = 60
+    cache_timeout = 24 * 60 * 60
+    cache_key_prefix = "api-v3-payload"
+
+    def build_payload(self, request):
+        raise NotImplementedError
+
+    def get_payload_cache_key(self):
+        versions = get_data_versions(*self.cache_models) if self.cache_models else ()
+        return ":".join([self.cache_key_prefix, type(self).__name__, *map(str, versions)])
+
+    def get(self, request):
+        key = self.get_payload_cache_key()
+        cached = cache.get(key)
+        if cached is None:
+            payload = self.build_payload(request)
+            serialized = json.dumps(payload, sort_keys=True, cls=DjangoJSONEncoder)
+            cached = (quote_etag(hashlib.sha1(serialized.encode("utf-8")).hexdigest()), payload)
+            cache.set(key, cached, self.cache_timeout)
+
+        etag, payload = cached
+        response = get_conditional_response(request, etag=etag) or Response(payload)
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, max_age=self.cache_max_age)
+        return response
+
+
+class CachedCountMixin:
+    """
+    Routes list totals through the count cache (core.counts) and counts the un-annotated scope.
+
+    ``get_count_queryset`` should return the same rows as ``get_queryset`` without annotations (which never
+    change cardinality but keep their joins in a COUNT); ``count_models`` lists every model the filters read.
+    Actions paginating a different queryset (e.g. search) pass their own ``count_queryset``.
+    """
+
+    count_models = ()
+
+    def get_count_queryset(self):
+        return self.get_queryset()
+
+    def paginate_queryset(self, queryset, count_queryset=None):
+        paginator = self.paginator
+        if paginator is not None and hasattr(paginator, "count_queryset"):
+            if count_queryset is None and self.action == "list":
+                count_queryset = self.filter_queryset(self.get_count_queryset())
+            paginator.count_queryset = count_queryset
+            paginator.count_models = self.count_models
+        return super().paginate_queryset(queryset)
+
+
+class SparseFieldsetMixin:
+    """
+    Lets list and search requests pick their columns with ``fields=a,b`` and/or ``omit=c,d``.
+
+    The selection prunes the serializer and should also drive ``get_queryset``: views check ``wants_fields`` before
+    adding annotations, prefetches or joins, so a grid that hides the clinical columns never pays for them.
+    Other actions always serialize every field.
+    """
+
+    sparse_fields_param = "fields"
+    sparse_omit_param = "omit"
+    sparse_actions = ("list", "search")
+    # Always returned so clients can key rows and follow links.
+    sparse_required_fields = ("id",)
+
+    def _parse_field_names(self, param):
+        raw = self.request.query_params.get(param, "")
+        return [name.strip() for name in raw.split(",") if name.strip()]
+
+    def get_sparse_fields(self):
+        """
+        Return the frozenset of serialized field names for this request, or None when every field is serialized.
+        """
+        if hasattr(self, "_sparse_fields"):
+            return self._sparse_fields
+        selected = None
+        request = getattr(self, "request", None)
+        if request is not None and getattr(self, "action", None) in self.sparse_actions:
+            available = list(self.get_serializer_class()().fields)
+            requested = self._parse_field_names(self.sparse_fields_param)
+            omitted = self._parse_field_names(self.sparse_omit_param)
+            unknown = [name for name in requested if name not in available]
+            if unknown:
+                raise ValidationError({self.sparse_fields_param: [f"Unknown field(s): {', '.join(unknown)}."]})
+            # Unknown omitted names are ignored: leaving out a field that does not exist is already satisfied.
+            selected = set(requested or available) - set(omitted)
+            selected.update(name for name in self.sparse_required_fields if name in available)
+            selected = frozenset(selected)
+        self._sparse_fields = selected
+        return selected
+
+    def wants_fields(self, *names) -> bool:
+        """
+        True when any of ``names`` will be serialized, i.e. the queryset must provide what they read.
+        """
+        selected = self.get_sparse_fields()
+        return selected is None or any(name in selected for name in names)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["sparse_fields"] = self.get_sparse_fields()
+        return context
+
+
+class HistoryMixin:
+    """
+    Adds a ``history/`` sub-resource listing the object's audit entries newest first, one cursor page at a time.
+
+    Detail payloads only carry a summary (see ``build_history_summary``), so their cost no longer grows with
+    the length of the audit trail; each history page costs the page query plus one row for the oldest diff.
+    """
+
+    history_pagination_class = HistoryKeysetPagination
+
+    @extend_schema(tags=["v3"], responses=SampleHistoryEntrySerializer(many=True))
+    @action(detail=True, methods=["get"], url_path="history")
+    def history(self, request, *args, **kwargs):
+        instance = self.get_object()
+        history = instance.history.all()
+        paginator = self.history_pagination_class()
+        records = paginator.paginate_queryset(history, request, view=self)
+        predecessor = None
+        if records:
+            oldest = records[-1]
+            predecessor = (
+                history.filter(
+                    Q(history_date__lt=oldest.history_date)
+                    | Q(history_date=oldest.history_date, history_id__lt=oldest.history_id)
+                )
+                .order_by("-history_date", "-history_id")
+                .first()
+            )
+        entries = build_history_entries(records, predecessor)
+        return paginator.get_paginated_response(SampleHistoryEntrySerializer(entries, many=True).data)
+
+
+class CoalescedScanUpdateMixin:
+    """
+    Sends single-sample scan updates through the group-commit coalescer (core.services.coalescer) when enabled.
+
+    The views are excluded from ATOMIC_REQUESTS, since a request holding the write lock would block the coalescer
+    thread it waits on; the direct path (coalescing off, a backed-up queue, or changes beyond ``coalesced_fields``)
+    opens its own transaction instead. Views provide ``_current_user_identifier``.
+
+    A scan whose batch does not commit in time gets a 503 with Retry-After. Its change stays queued and may still be
+    applied, which is safe: repeating a scan sets the same values.
+    """
+
+    coalesced_fields = ("sample_location", "sample_sublocation", "is_used")
+
+    @classmethod
+    def as_view(cls, *args, **kwargs):
+        return transaction.non_atomic_requests(super().as_view(*args, **kwargs))
+
+    def update(self, request, *args, **kwargs):
+        coalescer = get_sample_scan_coalescer()
+        if coalescer is None or coalescer.backed_up():
+            return self._update_directly(request, *args, **kwargs)
+
+        instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=kwargs.get("partial", False))
+        serializer.is_valid(raise_exception=True)
+        changes = dict(serializer.validated_data)
+        if changes.get("sample_id", instance.sample_id) == instance.sample_id:
+            changes.pop("sample_id", None)
+        if not changes or set(changes) - set(self.coalesced_fields):
+            return self._update_directly(request, *args, **kwargs)
+
+        try:
+            scan_status = coalescer.submit(
+                instance.sample_id, changes, user=request.user, user_identifier=self._current_user_identifier()
+            )
+        except futures.TimeoutError:
+            return Response(
+                {"detail": "The scan was not saved in time and may still be applied. Retry it."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(COALESCE_RETRY_AFTER)},
+            )
+        if scan_status == SCAN_STATUS_NOT_FOUND:
+            raise NotFound()
+        for field, value in changes.items():
+            setattr(instance, field, value)
+        return Response(self.get_serializer(instance).data)
+
+    def _update_directly(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().update(request, *args, **kwargs)
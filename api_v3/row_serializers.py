@@ -0,0 +1,152 @@
+# api_v3/row_serializers.py
+# Serializes sample list rows straight from values() dicts, using choice label maps built once at import.
+# Exists because model instantiation and per-field serializer calls dominated the cost of the sample list endpoint.
+
+from rest_framework import serializers
+
+from app.choices import (
+    MarvelTimepointChoices,
+    MusicTimepointChoices,
+    SampleTypeChoices,
+    SexChoices,
+    StudyCenterChoices,
+    StudyGroupChoices,
+    StudyNameChoices,
+)
+
+STUDY_NAME_LABELS = dict(StudyNameChoices.choices)
+SAMPLE_TYPE_LABELS = dict(SampleTypeChoices.choices)
+MUSIC_TIMEPOINT_LABELS = dict(MusicTimepointChoices.choices)
+MARVEL_TIMEPOINT_LABELS = dict(MarvelTimepointChoices.choices)
+STUDY_GROUP_LABELS = dict(StudyGroupChoices.choices)
+SEX_LABELS = dict(SexChoices.choices)
+STUDY_CENTER_LABELS = dict(StudyCenterChoices.choices)
+
+# Shared so timestamps follow the same timezone and ISO 8601 rules as the model serializer.
+_datetime_field = serializers.DateTimeField()
+
+
+def _display(labels, value):
+    # Mirrors Model.get_FOO_display: unknown codes are returned as-is.
+    return labels.get(value, value)
+
+
+def _label_or_none(labels, value):
+    # Mirrors SampleV3Serializer._format_choice applied to a display value.
+    if not value:
+        return None
+    return _display(labels, value) or None
+
+
+def _study_label(labels, column):
+    def build(row):
+        if row["study_id"] is None:
+            return None
+        return _label_or_none(labels, row[column])
+
+    return build
+
+
+def _timepoint_label(row):
+    if row["music_timepoint"]:
+        return _label_or_none(MUSIC_TIMEPOINT_LABELS, row["music_timepoint"])
+    if row["marvel_timepoint"]:
+        return _label_or_none(MARVEL_TIMEPOINT_LABELS, row["marvel_timepoint"])
+    return None
+
+
+def _study_identifier(row):
+    if row["study_id"] is None:
+        return None
+    return {"id": row["study_id"], "name": row["study_id__name"]}
+
+
+def _float_or_none(column):
+    def build(row):
+        value = row[column]
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    return build
+
+
+def _bool_or_none(column):
+    def build(row):
+        value = row[column]
+        return None if value is None else bool(value)
+
+    return build
+
+
+def _column(column):
+    def build(row):
+        return row[column]
+
+    return build
+
+
+# Output field -> (values() columns it reads, builder), in SampleV3Serializer.Meta.fields order.
+SAMPLE_ROW_FIELDS = {
+    "id": (("id",), _column("id")),
+    "sample_id": (("sample_id",), _column("sample_id")),
+    "study_name": (("study_name",), _column("study_name")),
+    "study_name_label": (("study_name",), lambda row: _display(STUDY_NAME_LABELS, row["study_name"])),
+    "study_identifier": (("study_id", "study_id__name"), _study_identifier),
+    "sample_location": (("sample_location",), _column("sample_location")),
+    "sample_sublocation": (("sample_sublocation",), _column("sample_sublocation")),
+    "sample_type": (("sample_type",), _column("sample_type")),
+    "sample_type_label": (("sample_type",), lambda row: _display(SAMPLE_TYPE_LABELS, row["sample_type"])),
+    "sample_datetime": (
+        ("sample_datetime",),
+        lambda row: _datetime_field.to_representation(row["sample_datetime"]),
+    ),
+    "timepoint_label": (("music_timepoint", "marvel_timepoint"), _timepoint_label),
+    "study_group_label": (
+        ("study_id", "study_id__study_group"),
+        _study_label(STUDY_GROUP_LABELS, "study_id__study_group"),
+    ),
+    "age": (("study_id__age",), _column("study_id__age")),
+    "sex_label": (("study_id", "study_id__sex"), _study_label(SEX_LABELS, "study_id__sex")),
+    "study_center_label": (
+        ("study_id", "study_id__study_center"),
+        _study_label(STUDY_CENTER_LABELS, "study_id__study_center"),
+    ),
+    "crp": (("crp",), _float_or_none("crp")),
+    "calprotectin": (("calprotectin",), _float_or_none("calprotectin")),
+    "endoscopic_mucosal_healing_at_3_6_months": (
+        ("endoscopic_mucosal_healing_at_3_6_months",),
+        _bool_or_none("endoscopic_mucosal_healing_at_3_6_months"),
+    ),
+    "endoscopic_mucosal_healing_at_12_months": (
+        ("endoscopic_mucosal_healing_at_12_months",),
+        _bool_or_none("endoscopic_mucosal_healing_at_12_months"),
+    ),
+    "genotype_data_available": (
+        ("study_id__genotype_data_available",),
+        _column("study_id__genotype_data_available"),
+    ),
+    "sample_comments": (("sample_comments",), _column("sample_comments")),
+    "is_used": (("is_used",), _column("is_used")),
+}
+
+
+class SampleV3RowSerializer:
+    """
+    Produces the SampleV3Serializer list payload from ``values()`` rows without instantiating models.
+
+    ``fields`` restricts the output (see SparseFieldsetMixin); ``columns`` lists what to pass to ``values()``.
+    The querysets must carry the clinical annotations whenever a clinical field is selected.
+    """
+
+    def __init__(self, fields=None):
+        names = [name for name in SAMPLE_ROW_FIELDS if fields is None or name in fields]
+        self.builders = [(name, SAMPLE_ROW_FIELDS[name][1]) for name in names]
+        self.columns = list(dict.fromkeys(column for name in names for column in SAMPLE_ROW_FIELDS[name][0]))
+
+    def serialize(self, rows):
+        builders = self.builders
+        return [{name: build(row) for name, build in builders} for row in rows]
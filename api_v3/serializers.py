@@ -1,22 +1,44 @@
 from typing import Any, Dict, Optional
 
-from django.contrib.auth import get_user_model
+from django.db.models.functions import Upper
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
+from simple_history.utils import bulk_create_with_history
 
 from app.models import (
     BasicScienceBox,
     BasicScienceSampleType,
+    DatabaseMaintenanceRun,
     DataStore,
     Experiment,
     Sample,
     StudyIdentifier,
     TissueType,
 )
-from core.utils.history import historical_changes
+from core.autocomplete import index_samples, study_id_index
+from core.clinical import link_samples_to_clinical_data
+from core.pivots import pivot_entry, update_pivot_cells
+from core.rollups import rollup_key, update_rollups
+from core.search import reindex_samples
+from core.services.samples import SAMPLE_BATCH_SIZE
+from core.utils.history import diff_history_records
+from core.versions import bump_data_version
 from datasets.models import Dataset, DatasetAccessHistory
 
 
+class SparseFieldsetSerializerMixin:
+    """
+    Keeps only the fields named in the ``sparse_fields`` context entry (see api_v3.mixins.SparseFieldsetMixin).
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get("sparse_fields")
+        if selected is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in selected}
+
+
 class ExperimentBoxSummarySerializer(serializers.ModelSerializer):
     """
     Minimal box summary for experiment listings.
@@ -27,7 +49,7 @@ class ExperimentBoxSummarySerializer(serializers.ModelSerializer):
         fields = ["id", "box_id"]
 
 
-class ExperimentV3Serializer(serializers.ModelSerializer):
+class ExperimentV3Serializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the v3 API returning experiment details aligned with the Django template.
     """
@@ -180,83 +202,17 @@ class ExperimentDetailV3Serializer(ExperimentV3Serializer):
             return username
         return str(user)
 
-    @staticmethod
-    def _format_field_label(field_name: str) -> str:
-        return field_name.replace("_", " ").title()
-
-    def _resolve_history_user_value(self, value):
-        if value in (None, ""):
-            return None
-        if hasattr(value, "email") or hasattr(value, "username"):
-            return self._format_history_user(value)
-        try:
-            user_id = int(value)
-        except (TypeError, ValueError):
-            return str(value)
-        user_cache = getattr(self, "_history_user_cache", None)
-        if user_cache is None:
-            user_cache = {}
-            setattr(self, "_history_user_cache", user_cache)
-        if user_id in user_cache:
-            return user_cache[user_id]
-        User = get_user_model()
-        user = User.objects.filter(pk=user_id).first()
-        resolved = self._format_history_user(user) if user else str(value)
-        user_cache[user_id] = resolved
-        return resolved
-
     def get_last_modified_by_email(self, obj: Experiment):
         return self._format_history_user(getattr(obj, "last_modified_by", None))
 
     def get_history(self, obj: Experiment) -> Dict[str, Any]:
-        history_qs = obj.history.all()
-        changes = historical_changes(history_qs) or []
-
-        entries = []
-        for delta in changes:
-            new_record = delta.new_record
-            resolved_user = self._format_history_user(getattr(new_record, "history_user", None))
-            entry_changes = []
-            for change in delta.changes:
-                change_old = change.old
-                change_new = change.new
-                if change.field in ("created_by", "last_modified_by"):
-                    change_old = self._resolve_history_user_value(change.old)
-                    change_new = self._resolve_history_user_value(change.new)
-                entry_changes.append(
-                    {
-                        "field": change.field,
-                        "label": self._format_field_label(change.field),
-                        "old": change_old if change_old not in ("", None) else None,
-                        "new": change_new if change_new not in ("", None) else None,
-                    }
-                )
-            entries.append(
-                {
-                    "timestamp": getattr(new_record, "history_date", obj.last_modified),
-                    "user": resolved_user,
-                    "summary": None,
-                    "changes": entry_changes,
-                }
-            )
-
-        entries.append(
-            {
-                "timestamp": obj.created,
-                "user": self._format_history_user(obj.created_by),
-                "summary": "Record created",
-                "changes": [],
-            }
-        )
-
         history_payload = {
             "created": obj.created,
             "created_by": self._format_history_user(obj.created_by),
             "last_modified": obj.last_modified,
             "last_modified_by": self._format_history_user(obj.last_modified_by),
-            "entries": entries,
+            **build_history_summary(obj),
         }
-
         serializer = SampleHistorySerializer(history_payload)
         return serializer.data
 
@@ -326,7 +282,7 @@ class BasicScienceBoxUpdateV3Serializer(serializers.ModelSerializer):
         ]
 
 
-class BasicScienceBoxV3Serializer(serializers.ModelSerializer):
+class BasicScienceBoxV3Serializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the v3 API returning box details aligned with the Django template.
     """
@@ -428,88 +384,22 @@ class BasicScienceBoxDetailV3Serializer(BasicScienceBoxV3Serializer):
             return username
         return str(user)
 
-    @staticmethod
-    def _format_field_label(field_name: str) -> str:
-        return field_name.replace("_", " ").title()
-
-    def _resolve_history_user_value(self, value):
-        if value in (None, ""):
-            return None
-        if hasattr(value, "email") or hasattr(value, "username"):
-            return self._format_history_user(value)
-        try:
-            user_id = int(value)
-        except (TypeError, ValueError):
-            return str(value)
-        user_cache = getattr(self, "_history_user_cache", None)
-        if user_cache is None:
-            user_cache = {}
-            setattr(self, "_history_user_cache", user_cache)
-        if user_id in user_cache:
-            return user_cache[user_id]
-        User = get_user_model()
-        user = User.objects.filter(pk=user_id).first()
-        resolved = self._format_history_user(user) if user else str(value)
-        user_cache[user_id] = resolved
-        return resolved
-
     def get_last_modified_by_email(self, obj: BasicScienceBox):
         return self._format_history_user(getattr(obj, "last_modified_by", None))
 
     def get_history(self, obj: BasicScienceBox) -> Dict[str, Any]:
-        history_qs = obj.history.all()
-        changes = historical_changes(history_qs) or []
-
-        entries = []
-        for delta in changes:
-            new_record = delta.new_record
-            resolved_user = self._format_history_user(getattr(new_record, "history_user", None))
-            entry_changes = []
-            for change in delta.changes:
-                change_old = change.old
-                change_new = change.new
-                if change.field in ("created_by", "last_modified_by"):
-                    change_old = self._resolve_history_user_value(change.old)
-                    change_new = self._resolve_history_user_value(change.new)
-                entry_changes.append(
-                    {
-                        "field": change.field,
-                        "label": self._format_field_label(change.field),
-                        "old": change_old if change_old not in ("", None) else None,
-                        "new": change_new if change_new not in ("", None) else None,
-                    }
-                )
-            entries.append(
-                {
-                    "timestamp": getattr(new_record, "history_date", obj.last_modified),
-                    "user": resolved_user,
-                    "summary": None,
-                    "changes": entry_changes,
-                }
-            )
-
-        entries.append(
-            {
-                "timestamp": obj.created,
-                "user": obj.created_by,
-                "summary": "Record created",
-                "changes": [],
-            }
-        )
-
         history_payload = {
             "created": obj.created,
             "created_by": self._format_history_user(obj.created_by),
             "last_modified": obj.last_modified,
             "last_modified_by": self._format_history_user(obj.last_modified_by),
-            "entries": entries,
+            **build_history_summary(obj),
         }
-
         serializer = SampleHistorySerializer(history_payload)
         return serializer.data
 
 
-class SampleV3Serializer(serializers.ModelSerializer):
+class SampleV3Serializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the v3 API returning essential sample details aligned with the Django template.
     """
@@ -686,22 +576,6 @@ class SampleV3DetailSerializer(serializers.ModelSerializer):
     def _format_choice_display(display_value):
         return display_value if display_value not in (None, "") else None
 
-    @staticmethod
-    def _format_history_user(user):
-        if user is None:
-            return None
-        email = getattr(user, "email", None)
-        if isinstance(email, str) and email:
-            return email
-        username = getattr(user, "username", None)
-        if isinstance(username, str) and username:
-            return username
-        return str(user)
-
-    @staticmethod
-    def _format_field_label(field_name: str) -> str:
-        return field_name.replace("_", " ").title()
-
     def get_music_timepoint_label(self, obj: Sample):
         return self._format_choice_display(obj.get_music_timepoint_display())
 
@@ -735,49 +609,13 @@ class SampleV3DetailSerializer(serializers.ModelSerializer):
         return int(time_delta.total_seconds() / 60)
 
     def get_history(self, obj: Sample) -> Dict[str, Any]:
-        history_qs = obj.history.all()
-        changes = historical_changes(history_qs) or []
-
-        entries = []
-        for delta in changes:
-            new_record = delta.new_record
-            resolved_user = self._format_history_user(getattr(new_record, "history_user", None))
-            entry_changes = []
-            for change in delta.changes:
-                entry_changes.append(
-                    {
-                        "field": change.field,
-                        "label": self._format_field_label(change.field),
-                        "old": change.old if change.old not in ("", None) else None,
-                        "new": change.new if change.new not in ("", None) else None,
-                    }
-                )
-            entries.append(
-                {
-                    "timestamp": getattr(new_record, "history_date", obj.last_modified),
-                    "user": resolved_user,
-                    "summary": None,
-                    "changes": entry_changes,
-                }
-            )
-
-        entries.append(
-            {
-                "timestamp": obj.created,
-                "user": obj.created_by,
-                "summary": "Record created",
-                "changes": [],
-            }
-        )
-
         history_payload = {
             "created": obj.created,
             "created_by": obj.created_by,
             "last_modified": obj.last_modified,
             "last_modified_by": obj.last_modified_by,
-            "entries": entries,
+            **build_history_summary(obj),
         }
-
         serializer = SampleHistorySerializer(history_payload)
         return serializer.data
 
@@ -845,6 +683,77 @@ class SampleV3UpdateSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class MultipleSampleV3ListSerializer(serializers.ListSerializer):
+    """
+    List serializer that validates and creates a batch of scanned samples with set-based queries.
+    """
+
+    MAX_SAMPLES = 500
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("max_length", self.MAX_SAMPLES)
+        super().__init__(*args, **kwargs)
+        # Uniqueness is checked once for the whole batch below rather than with one iexact query per row.
+        self.child.fields["sample_id"].validators = []
+
+    def to_internal_value(self, data):
+        validated = super().to_internal_value(data)
+        sample_ids = [item["sample_id"] for item in validated]
+
+        existing = set()
+        for start in range(0, len(sample_ids), SAMPLE_BATCH_SIZE):
+            chunk = sample_ids[start : start + SAMPLE_BATCH_SIZE]
+            existing.update(
+                Sample.objects.annotate(sample_id_upper=Upper("sample_id"))
+                .filter(sample_id_upper__in=chunk)
+                .values_list("sample_id_upper", flat=True)
+            )
+
+        seen = set()
+        errors = []
+        for sample_id in sample_ids:
+            if sample_id in existing:
+                errors.append({"sample_id": ["sample with this sample id already exists."]})
+            elif sample_id in seen:
+                errors.append({"sample_id": ["Duplicate sample id in this batch."]})
+            else:
+                errors.append({})
+            seen.add(sample_id)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated
+
+    def create(self, validated_data):
+        request = self.context.get("request")
+        user = getattr(request, "user", None)
+        history_user = user if getattr(user, "is_authenticated", False) else None
+
+        names = {item["study_id"].upper() for item in validated_data if item.get("study_id")}
+        study_identifiers = StudyIdentifier.objects.in_bulk(names, field_name="name")
+        missing = [StudyIdentifier(name=name) for name in sorted(names - set(study_identifiers))]
+        if missing:
+            bulk_create_with_history(missing, StudyIdentifier, batch_size=SAMPLE_BATCH_SIZE, default_user=history_user)
+            study_identifiers = StudyIdentifier.objects.in_bulk(names, field_name="name")
+
+        samples = []
+        for item in validated_data:
+            study_id = item.pop("study_id", None)
+            samples.append(Sample(study_id=study_identifiers[study_id.upper()] if study_id else None, **item))
+        samples = bulk_create_with_history(samples, Sample, batch_size=SAMPLE_BATCH_SIZE, default_user=history_user)
+
+        # bulk_create bypasses the model signals that maintain the clinical link, search and autocomplete indexes,
+        # analytics rollup, overview pivot and data versions.
+        sample_pks = [sample.pk for sample in samples]
+        link_samples_to_clinical_data(Sample.objects.filter(pk__in=sample_pks))
+        reindex_samples(sample_pks)
+        index_samples(samples)
+        update_rollups(added=[rollup_key(sample) for sample in samples])
+        update_pivot_cells(added=[pivot_entry(sample) for sample in samples])
+        study_id_index.add(*(study_identifier.name for study_identifier in missing))
+        bump_data_version(Sample, StudyIdentifier)
+        return samples
+
+
 class MultipleSampleV3Serializer(serializers.ModelSerializer):
     """
     Serializer for adding multiple samples via the v3 QR scan workflow.
@@ -880,6 +789,7 @@ class MultipleSampleV3Serializer(serializers.ModelSerializer):
             "freeze_thaw_count",
         ]
         lookup_field = "sample_id"
+        list_serializer_class = MultipleSampleV3ListSerializer
 
     def validate(self, data):
         if data["study_name"] in ("music", "mini_music") and not data.get("music_timepoint"):
@@ -932,6 +842,53 @@ class SampleIsUsedV3Serializer(serializers.ModelSerializer):
         lookup_field = "sample_id"
 
 
+class SampleBatchScanV3Serializer(serializers.Serializer):
+    """
+    Serializer for applying one location or used-state change to a batch of scanned samples.
+    """
+
+    # One freezer rack is at most a few hundred tubes; larger payloads are almost certainly mistakes.
+    MAX_SAMPLE_IDS = 1000
+    CHANGE_FIELDS = ("sample_location", "sample_sublocation", "is_used")
+
+    sample_ids = serializers.ListField(
+        child=serializers.CharField(trim_whitespace=True), allow_empty=False, max_length=MAX_SAMPLE_IDS
+    )
+    sample_location = serializers.CharField(required=False, max_length=200)
+    sample_sublocation = serializers.CharField(required=False, allow_null=True, allow_blank=True, max_length=200)
+    is_used = serializers.BooleanField(required=False)
+
+    def validate(self, data):
+        if not any(field in data for field in self.CHANGE_FIELDS):
+            raise serializers.ValidationError(
+                "Provide at least one of sample_location, sample_sublocation or is_used."
+            )
+        return data
+
+    def get_changes(self):
+        return {field: self.validated_data[field] for field in self.CHANGE_FIELDS if field in self.validated_data}
+
+
+class SampleBatchScanResultSerializer(serializers.Serializer):
+    """
+    Serializes the per-sample outcome of a batch scan.
+    """
+
+    sample_id = serializers.CharField()
+    status = serializers.ChoiceField(choices=["updated", "unchanged", "not_found"])
+
+
+class SampleBatchScanResponseSerializer(serializers.Serializer):
+    """
+    Wraps batch scan results with per-status counts.
+    """
+
+    updated = serializers.IntegerField()
+    unchanged = serializers.IntegerField()
+    not_found = serializers.IntegerField()
+    results = SampleBatchScanResultSerializer(many=True)
+
+
 class SampleHistoryChangeSerializer(serializers.Serializer):
     """
     Serializes individual field-level history changes for audit panels.
@@ -954,16 +911,83 @@ class SampleHistoryEntrySerializer(serializers.Serializer):
     changes = SampleHistoryChangeSerializer(many=True)
 
 
-class SampleHistorySerializer(serializers.Serializer):
+class HistorySummaryV3Serializer(serializers.Serializer):
+    """
+    Summarises an audit trail for detail payloads; the entries themselves come from the history sub-resource.
+    """
+
+    count = serializers.IntegerField()
+    last_change = SampleHistoryEntrySerializer(allow_null=True)
+
+
+class SampleHistorySerializer(HistorySummaryV3Serializer):
     """
-    Wraps history metadata alongside the chronological entries list.
+    Adds the creation and last modification metadata to the history summary.
     """
 
     created = serializers.DateTimeField()
     created_by = serializers.CharField(allow_null=True)
     last_modified = serializers.DateTimeField()
     last_modified_by = serializers.CharField(allow_null=True)
-    entries = SampleHistoryEntrySerializer(many=True)
+
+
+HISTORY_TYPE_SUMMARIES = {"+": "Record created", "-": "Record deleted"}
+
+
+def format_history_value(value):
+    """
+    Render a history value for the audit panels, showing users by email or username.
+    """
+    if value in (None, ""):
+        return None
+    email = getattr(value, "email", None)
+    if isinstance(email, str) and email:
+        return email
+    username = getattr(value, "username", None)
+    if isinstance(username, str) and username:
+        return username
+    return value
+
+
+def build_history_entries(records, predecessor=None):
+    """
+    Turn history records (newest first) into timeline entries.
+
+    ``predecessor`` is the record just older than the last one, so that record's changes can be shown too;
+    a record with nothing older is rendered by its history type (e.g. "Record created").
+    """
+    chain = [*records, predecessor] if predecessor is not None else list(records)
+    deltas = {delta.new_record.pk: delta for delta in diff_history_records(chain)}
+    entries = []
+    for record in records:
+        delta = deltas.get(record.pk)
+        entries.append(
+            {
+                "timestamp": record.history_date,
+                "user": format_history_value(record.history_user),
+                "summary": None if delta else HISTORY_TYPE_SUMMARIES.get(record.history_type),
+                "changes": [
+                    {
+                        "field": change.field,
+                        "label": change.field.replace("_", " ").title(),
+                        "old": format_history_value(change.old),
+                        "new": format_history_value(change.new),
+                    }
+                    for change in (delta.changes if delta else [])
+                ],
+            }
+        )
+    return entries
+
+
+def build_history_summary(obj):
+    """
+    Return the history count and latest entry of ``obj`` with a constant number of queries.
+    """
+    history = obj.history.order_by("-history_date", "-history_id")
+    latest = list(history[:2])
+    entries = build_history_entries(latest[:1], latest[1] if len(latest) > 1 else None)
+    return {"count": history.count(), "last_change": entries[0] if entries else None}
 
 
 class DatasetListV3Serializer(serializers.ModelSerializer):
@@ -1038,7 +1062,7 @@ class StudyIdentifierFileSummaryV3Serializer(serializers.ModelSerializer):
         fields = ["id", "file_name"]
 
 
-class StudyIdentifierV3Serializer(serializers.ModelSerializer):
+class StudyIdentifierV3Serializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for study ID listings in the v3 API.
     """
@@ -1101,29 +1125,9 @@ class StudyIdentifierV3Serializer(serializers.ModelSerializer):
         return value.upper()
 
 
-class StudyIdentifierHistoryChangeSerializer(serializers.Serializer):
-    """
-    Serializes a single field change from the history delta.
-    """
-
-    field = serializers.CharField()
-    old = serializers.JSONField(allow_null=True)
-    new = serializers.JSONField(allow_null=True)
-
-
-class StudyIdentifierHistoryEntrySerializer(serializers.Serializer):
-    """
-    Serializes a single historical snapshot of a study identifier.
-    """
-
-    history_date = serializers.DateTimeField()
-    history_user = serializers.CharField(allow_null=True)
-    changes = StudyIdentifierHistoryChangeSerializer(many=True)
-
-
 class StudyIdentifierDetailV3Serializer(StudyIdentifierV3Serializer):
     """
-    Extends the study ID serializer with history metadata for detail views.
+    Extends the study ID serializer with a history summary for detail views.
     """
 
     history = serializers.SerializerMethodField()
@@ -1132,34 +1136,20 @@ class StudyIdentifierDetailV3Serializer(StudyIdentifierV3Serializer):
         fields = StudyIdentifierV3Serializer.Meta.fields + ["history"]
 
     def get_history(self, obj: StudyIdentifier):
-        history_qs = obj.history.order_by("-history_date")
-        deltas = historical_changes(history_qs)
-        entries = []
-        for delta in deltas or []:
-            history_record = getattr(delta, "new_record", None)
-            entries.append(
-                {
-                    "history_date": getattr(history_record, "history_date", None),
-                    "history_user": self._format_history_user(getattr(history_record, "history_user", None)),
-                    "changes": [
-                        {
-                            "field": change.field,
-                            "old": change.old,
-                            "new": change.new,
-                        }
-                        for change in getattr(delta, "changes", [])
-                    ],
-                }
-            )
-        serializer = StudyIdentifierHistoryEntrySerializer(entries, many=True)
-        return serializer.data
+        return HistorySummaryV3Serializer(build_history_summary(obj)).data
 
-    @staticmethod
-    def _format_history_user(value: Any) -> Optional[str]:
-        if value in (None, ""):
-            return None
-        if hasattr(value, "email") and getattr(value, "email"):
-            return getattr(value, "email")
-        if hasattr(value, "username") and getattr(value, "username"):
-            return getattr(value, "username")
-        return str(value)
+
+class DatabaseMaintenanceRunV3Serializer(serializers.ModelSerializer):
+    class Meta:
+        model = DatabaseMaintenanceRun
+        fields = [
+            "id",
+            "started",
+            "duration",
+            "steps",
+            "page_size",
+            "page_count",
+            "freelist_count",
+            "wal_bytes",
+            "tables",
+        ]
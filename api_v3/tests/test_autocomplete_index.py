@@ -0,0 +1,120 @@
+# api_v3/tests/test_autocomplete_index.py
+# Tests the in-memory autocomplete indexes behind the v3 and legacy location/study ID suggestion endpoints.
+# Exists to guarantee ranking, result caps and incremental refresh without per-keystroke table scans.
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from app.factories import SampleFactory, StudyIdentifierFactory
+from core import autocomplete
+from core.autocomplete import INDEX_REBUILD_INTERVAL, MAX_SUGGESTION_LIMIT, AutocompleteIndex, location_index
+from users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _client():
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    return client
+
+
+def test_prefix_matches_rank_before_substring_matches():
+    client = _client()
+    for location in ["Main Freezer", "Freezer B", "freezer a", "Cold Room"]:
+        SampleFactory(sample_location=location)
+
+    response = client.get(reverse("v3-sample-location-autocomplete"), {"term": "FREEZER"})
+
+    assert response.status_code == 200
+    assert response.json() == ["freezer a", "Freezer B", "Main Freezer"]
+
+
+def test_results_are_capped_by_limit():
+    client = _client()
+    for index in range(5):
+        SampleFactory(sample_location=f"Shelf {index}")
+    url = reverse("v3-sample-location-autocomplete")
+
+    assert client.get(url, {"term": "shelf", "limit": 2}).json() == ["Shelf 0", "Shelf 1"]
+    assert len(location_index.search("", limit=MAX_SUGGESTION_LIMIT + 50)) <= MAX_SUGGESTION_LIMIT
+
+
+def test_new_values_are_indexed_without_a_rebuild():
+    client = _client()
+    SampleFactory(sample_location="Rack 1")
+    url = reverse("v3-sample-location-autocomplete")
+    assert client.get(url, {"term": "rack"}).json() == ["Rack 1"]
+
+    SampleFactory(sample_location="Rack 2")
+
+    with CaptureQueriesContext(connection) as queries:
+        assert client.get(url, {"term": "rack"}).json() == ["Rack 1", "Rack 2"]
+    assert not [query for query in queries if "DISTINCT" in query["sql"]]
+
+
+def test_study_id_and_sublocation_suggestions():
+    client = _client()
+    StudyIdentifierFactory(name="GID-777-P")
+    SampleFactory(sample_sublocation="Box 12")
+
+    study_ids = client.get(reverse("v3-study-id-autocomplete"), {"term": "777"}).json()
+    sublocations = client.get(reverse("v3-sample-sublocation-autocomplete"), {"term": "box"}).json()
+
+    assert study_ids == ["GID-777-P"]
+    assert sublocations == ["Box 12"]
+
+
+def test_batch_scan_adds_new_locations(django_capture_on_commit_callbacks):
+    client = _client()
+    SampleFactory(sample_id="AUTO-1", sample_location="Bench")
+    location_index.sync()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post(
+            reverse("v3-samples-batch-scan"),
+            {"sample_ids": ["AUTO-1"], "sample_location": "Ultra Freezer"},
+            format="json",
+        )
+
+    assert client.get(reverse("v3-sample-location-autocomplete"), {"term": "ultra"}).json() == ["Ultra Freezer"]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(autocomplete.time, "time", lambda: now[0])
+    return now
+
+
+def test_adds_do_not_postpone_the_rebuild(clock):
+    table = ["Freezer A", "Freezer B"]
+    index = AutocompleteIndex("test-rebuild-deadline", lambda: list(table))
+    assert index.search() == ["Freezer A", "Freezer B"]
+
+    table.remove("Freezer B")
+    for step in range(5):
+        clock[0] += INDEX_REBUILD_INTERVAL / 6
+        index.add(f"Freezer C{step}")
+    assert "Freezer B" in index.search()
+
+    clock[0] += INDEX_REBUILD_INTERVAL / 6
+    assert index.search() == ["Freezer A"]
+
+
+def test_concurrent_adds_from_the_same_revision_are_merged(clock):
+    # Two workers' copies of one index, both loaded at the same revision.
+    first = AutocompleteIndex("test-concurrent-add", lambda: ["Freezer A"])
+    second = AutocompleteIndex("test-concurrent-add", lambda: ["Freezer A"])
+    first.rebuild()
+    second.sync()
+    base, rebuild_at = first._revision, clock[0] + INDEX_REBUILD_INTERVAL
+
+    assert first._publish(["Freezer A", "Freezer B"], rebuild_at, base=base)
+    assert not second._publish(["Freezer A", "Freezer C"], rebuild_at, base=base)
+
+    second.add("Freezer C")
+    assert first.search() == ["Freezer A", "Freezer B", "Freezer C"]
@@ -0,0 +1,138 @@
+# api_v3/tests/test_conditional_get.py
+# Tests ETag / Last-Modified revalidation on the v3 list and detail endpoints.
+# Exists to guarantee unchanged payloads return 304 cheaply while any relevant write invalidates the validator.
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from app.factories import BasicScienceBoxFactory, SampleFactory, StudyIdentifierFactory
+from app.models import ClinicalData
+from datasets.factories import DatasetFactory
+from datasets.models import DatasetAccessHistory
+from users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _client(user=None):
+    client = APIClient()
+    client.force_authenticate(user=user or UserFactory())
+    return client
+
+
+def _revalidate(client, url, response, **params):
+    return client.get(url, params, HTTP_IF_NONE_MATCH=response["ETag"])
+
+
+def test_sample_list_returns_304_for_matching_etag():
+    client = _client()
+    SampleFactory()
+    url = reverse("v3-samples-list")
+
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first["ETag"]
+    assert first["Last-Modified"]
+
+    with CaptureQueriesContext(connection) as queries:
+        second = _revalidate(client, url, first)
+
+    assert second.status_code == 304
+    assert second["ETag"] == first["ETag"]
+    # One aggregate over the filtered scope; no page, count or annotation queries.
+    assert len(queries) == 1
+
+
+def test_sample_list_etag_changes_after_write():
+    client = _client()
+    sample = SampleFactory(sample_location="Shelf A")
+    url = reverse("v3-samples-list")
+    first = client.get(url)
+
+    sample.sample_location = "Shelf B"
+    sample.save()
+
+    assert _revalidate(client, url, first).status_code == 200
+
+
+def test_sample_list_etag_changes_when_clinical_data_changes():
+    client = _client()
+    study = StudyIdentifierFactory(study_name="gidamps")
+    sample = SampleFactory(study_id=study)
+    url = reverse("v3-samples-list")
+    first = client.get(url)
+
+    ClinicalData.objects.create(study_id=study, sample_date=sample.sample_datetime.date(), crp=3.0)
+
+    assert _revalidate(client, url, first).status_code == 200
+
+
+def test_etag_depends_on_query_parameters():
+    client = _client()
+    SampleFactory()
+    url = reverse("v3-samples-list")
+    first = client.get(url)
+
+    response = client.get(url, {"ordering": "sample_id"}, HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert response.status_code == 200
+
+
+def test_sample_detail_supports_if_modified_since():
+    client = _client()
+    sample = SampleFactory()
+    url = reverse("v3-samples-detail", kwargs={"sample_id": sample.sample_id})
+    first = client.get(url)
+
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+
+    assert response.status_code == 304
+
+
+def test_bulk_scan_invalidates_sample_list():
+    client = _client()
+    SampleFactory(sample_id="COND-1", is_used=False)
+    url = reverse("v3-samples-list")
+    first = client.get(url, {"include_used": "true"})
+
+    client.post(reverse("v3-samples-batch-scan"), {"sample_ids": ["COND-1"], "is_used": True}, format="json")
+
+    assert _revalidate(client, url, first, include_used="true").status_code == 200
+
+
+def test_box_list_invalidated_by_experiment_membership_change():
+    client = _client()
+    box = BasicScienceBoxFactory()
+    url = reverse("v3-boxes-list")
+    first = client.get(url)
+
+    box.experiments.clear()
+
+    assert _revalidate(client, url, first).status_code == 200
+
+
+def test_study_id_list_returns_304():
+    client = _client()
+    StudyIdentifierFactory()
+    url = reverse("v3-study-ids-list")
+    first = client.get(url)
+
+    assert _revalidate(client, url, first).status_code == 304
+
+
+def test_dataset_retrieve_records_access_even_when_not_modified():
+    user = UserFactory()
+    user.user_permissions.add(Permission.objects.get(codename="view_dataset"))
+    client = _client(user)
+    dataset = DatasetFactory()
+    url = reverse("v3-datasets-detail", kwargs={"name": dataset.name})
+    first = client.get(url)
+
+    second = _revalidate(client, url, first)
+
+    assert second.status_code == 304
+    assert DatasetAccessHistory.objects.filter(dataset=dataset).count() == 2
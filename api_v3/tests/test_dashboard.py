@@ -0,0 +1,96 @@
+# api_v3/tests/test_dashboard.py
+# Tests the combined v3 dashboard endpoint: payload contents, query budget and cache invalidation.
+# Exists to guarantee the home page figures arrive in one cached round trip and never go stale.
+
+import pytest
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from app.factories import BasicScienceBoxFactory, ExperimentFactory, SampleFactory
+from datasets.factories import DatasetFactory
+from datasets.models import DatasetAnalytics, DataSourceStatusCheck
+from users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _client(user=None):
+    client = APIClient()
+    client.force_authenticate(user=user or UserFactory())
+    return client
+
+
+def test_dashboard_returns_headline_figures():
+    user = UserFactory()
+    SampleFactory(is_used=False, last_modified_by=user.email)
+    SampleFactory(is_used=True)
+    BasicScienceBoxFactory(is_used=False)
+    BasicScienceBoxFactory(is_used=True)
+    ExperimentFactory(is_deleted=True)
+    DatasetAnalytics.objects.create(name="gidamps_participants_by_center", data={"Edinburgh": 3})
+
+    payload = _client(user).get(reverse("v3-dashboard")).json()
+
+    assert payload["samples"] == {"total": 2, "active": 1, "used": 1}
+    assert payload["study_ids"] == {"total": 2}
+    assert payload["boxes"] == {"total": 2, "active": 1}
+    assert payload["experiments"]["deleted"] == 1
+    assert payload["gidamps"]["gidamps_participants_by_center"] == {"Edinburgh": 3}
+    assert payload["gidamps"]["gidamps_montreal_classification"] is None
+    assert [row["is_used"] for row in payload["recent_samples"]] == [False]
+    assert payload["datasets"] is None
+
+
+def test_dashboard_dataset_status_requires_permission():
+    user = UserFactory()
+    user.user_permissions.add(Permission.objects.get(codename="view_dataset"))
+    DatasetFactory()
+    DataSourceStatusCheck.objects.create(data_source="api", response_status=500)
+    DataSourceStatusCheck.objects.create(data_source="api", response_status=200)
+    DataSourceStatusCheck.objects.create(data_source="s3", response_status=200)
+
+    datasets = _client(user).get(reverse("v3-dashboard")).json()["datasets"]
+
+    assert datasets["total"] == 1
+    assert [(check["data_source"], check["response_status"]) for check in datasets["status_checks"]] == [
+        ("api", 200),
+        ("s3", 200),
+    ]
+
+
+def test_dashboard_reads_gidamps_analytics_in_one_query():
+    with CaptureQueriesContext(connection) as queries:
+        _client().get(reverse("v3-dashboard"))
+
+    analytics_queries = [query for query in queries if "datasets_datasetanalytics" in query["sql"]]
+    assert len(analytics_queries) == 1
+    assert " IN (" in analytics_queries[0]["sql"]
+
+
+def test_dashboard_is_served_from_cache_until_data_changes():
+    client = _client()
+    url = reverse("v3-dashboard")
+    first = client.get(url)
+
+    with CaptureQueriesContext(connection) as queries:
+        second = client.get(url)
+    assert second.json() == first.json()
+    assert len(queries) == 0
+
+    SampleFactory(is_used=False)
+    assert client.get(url).json()["samples"]["total"] == first.json()["samples"]["total"] + 1
+
+    DatasetAnalytics.objects.create(name="gidamps_montreal_classification", data={"L1": 2})
+    assert client.get(url).json()["gidamps"]["gidamps_montreal_classification"] == {"L1": 2}
+
+
+def test_dashboard_cache_is_per_user():
+    author = UserFactory()
+    SampleFactory(last_modified_by=author.email)
+    url = reverse("v3-dashboard")
+
+    assert len(_client(author).get(url).json()["recent_samples"]) == 1
+    assert _client().get(url).json()["recent_samples"] == []
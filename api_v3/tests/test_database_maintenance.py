@@ -0,0 +1,56 @@
+# api_v3/tests/test_database_maintenance.py
+# Tests the staff-only database maintenance endpoint: access control, latest run and size history.
+# Exists so the bloat figures recorded by dbmaintain stay reachable by staff and hidden from everyone else.
+
+import datetime
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from app.models import DatabaseMaintenanceRun
+from users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _client(user=None):
+    client = APIClient()
+    client.force_authenticate(user=user or UserFactory())
+    return client
+
+
+def _run(days_ago, wal_bytes):
+    return DatabaseMaintenanceRun.objects.create(
+        started=timezone.now() - datetime.timedelta(days=days_ago),
+        duration=1.5,
+        steps=[{"step": "analyze", "status": "ok", "seconds": 1.2}],
+        page_size=4096,
+        page_count=1000 + days_ago,
+        freelist_count=days_ago,
+        wal_bytes=wal_bytes,
+        tables=[{"name": "app_sample", "rows": 10, "bytes": 8192, "index_bytes": 4096}],
+    )
+
+
+def test_database_maintenance_is_staff_only():
+    assert _client().get(reverse("v3-management-database")).status_code == 403
+
+
+def test_database_maintenance_reports_latest_run_and_history():
+    for days_ago in (3, 2, 1):
+        _run(days_ago, wal_bytes=days_ago * 1000)
+
+    payload = _client(UserFactory(is_staff=True)).get(reverse("v3-management-database"), {"limit": 2}).json()
+
+    assert payload["latest"]["wal_bytes"] == 1000
+    assert payload["latest"]["tables"][0]["name"] == "app_sample"
+    assert payload["latest"]["steps"][0]["status"] == "ok"
+    assert [row["wal_bytes"] for row in payload["history"]] == [1000, 2000]
+    assert set(payload["history"][0]) == {"started", "page_size", "page_count", "freelist_count", "wal_bytes"}
+
+
+def test_database_maintenance_without_runs():
+    payload = _client(UserFactory(is_staff=True)).get(reverse("v3-management-database")).json()
+    assert payload == {"latest": None, "history": []}
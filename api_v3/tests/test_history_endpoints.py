@@ -0,0 +1,101 @@
+# api_v3/tests/test_history_endpoints.py
+# Tests the cursor-paginated history sub-resources and the history summary embedded in detail payloads.
+# Exists to keep detail views constant-cost while the full audit trail stays reachable page by page.
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from app.factories import BasicScienceBoxFactory, ExperimentFactory, SampleFactory, StudyIdentifierFactory
+from users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _client():
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    return client
+
+
+def _edit(instance, field, count):
+    for index in range(count):
+        setattr(instance, field, f"edit {index}")
+        instance.save()
+
+
+def test_sample_history_pages_newest_first():
+    client = _client()
+    sample = SampleFactory(sample_id="HIST-1")
+    _edit(sample, "sample_comments", 4)
+    url = reverse("v3-samples-history", args=["HIST-1"])
+
+    first = client.get(url, {"page_size": 3}).json()
+    second = client.get(first["next"]).json()
+
+    assert [entry["changes"][0]["new"] for entry in first["results"]] == ["edit 3", "edit 2", "edit 1"]
+    assert [change["new"] for change in second["results"][0]["changes"]] == ["edit 0"]
+    assert second["results"][-1]["summary"] == "Record created"
+    assert second["next"] is None
+
+
+def test_sample_detail_carries_only_a_summary():
+    client = _client()
+    sample = SampleFactory(sample_id="HIST-2")
+    _edit(sample, "sample_location", 2)
+
+    history = client.get(reverse("v3-samples-detail", args=["HIST-2"])).json()["history"]
+
+    assert "entries" not in history
+    assert history["count"] == 3
+    assert history["last_change"]["changes"] == [
+        {"field": "sample_location", "label": "Sample Location", "old": "edit 0", "new": "edit 1"}
+    ]
+
+
+def test_detail_query_count_does_not_grow_with_history():
+    client = _client()
+    short, long = SampleFactory(sample_id="HIST-3"), SampleFactory(sample_id="HIST-4")
+    _edit(short, "sample_comments", 1)
+    _edit(long, "sample_comments", 25)
+
+    with CaptureQueriesContext(connection) as short_queries:
+        client.get(reverse("v3-samples-detail", args=["HIST-3"]))
+    with CaptureQueriesContext(connection) as long_queries:
+        client.get(reverse("v3-samples-detail", args=["HIST-4"]))
+
+    assert len(long_queries) == len(short_queries)
+
+
+@pytest.mark.parametrize(
+    "factory, basename, field",
+    [
+        (BasicScienceBoxFactory, "v3-boxes", "comments"),
+        (ExperimentFactory, "v3-experiments", "description"),
+        (StudyIdentifierFactory, "v3-study-ids", "name"),
+    ],
+)
+def test_history_sub_resources(factory, basename, field):
+    client = _client()
+    instance = factory()
+    _edit(instance, field, 1)
+
+    body = client.get(reverse(f"{basename}-history", args=[instance.pk])).json()
+
+    assert [entry["changes"][0]["new"] for entry in body["results"][:1]] == ["edit 0"]
+    assert body["results"][-1]["summary"] == "Record created"
+
+
+def test_history_resolves_user_foreign_keys():
+    client = _client()
+    editor = UserFactory(email="editor@example.com")
+    experiment = ExperimentFactory()
+    experiment.last_modified_by = editor
+    experiment.save()
+
+    body = client.get(reverse("v3-experiments-history", args=[experiment.pk])).json()
+
+    change = next(item for item in body["results"][0]["changes"] if item["field"] == "last_modified_by")
+    assert change["new"] == "editor@example.com"
@@ -0,0 +1,115 @@
+# api_v3/tests/test_multiple_samples.py
+# Tests the multiple-samples endpoint for both single-object and list payloads.
+# Exists to guarantee batch registration validates, resolves study IDs and writes history like single creates.
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from app.choices import SampleTypeChoices, StudyNameChoices
+from app.factories import SampleFactory, StudyIdentifierFactory
+from app.models import ClinicalData, Sample, StudyIdentifier
+from core.search import search_samples
+from users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _client():
+    user = UserFactory(email="registrar@example.com")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client, user
+
+
+def _payload(sample_id, study_id="GID-100-P", **overrides):
+    payload = {
+        "study_name": StudyNameChoices.GIDAMPS,
+        "sample_id": sample_id,
+        "sample_location": "Freezer 1",
+        "study_id": study_id,
+        "sample_type": SampleTypeChoices.CFDNA_PLASMA,
+        "sample_datetime": "2024-03-01T10:00:00Z",
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_single_object_payload_still_supported():
+    client, user = _client()
+
+    response = client.post(reverse("v3-multiple-samples-list"), _payload("single-1"), format="json")
+
+    assert response.status_code == 201
+    sample = Sample.objects.get(sample_id="SINGLE-1")
+    assert sample.created_by == user.email
+
+
+def test_list_payload_creates_samples_history_and_study_ids():
+    client, user = _client()
+    existing = StudyIdentifierFactory(name="GID-100-P")
+    payload = [_payload(f"batch-{index}") for index in range(3)] + [_payload("batch-new", study_id="gid-200-p")]
+
+    response = client.post(reverse("v3-multiple-samples-list"), payload, format="json")
+
+    assert response.status_code == 201
+    assert [item["sample_id"] for item in response.json()] == ["BATCH-0", "BATCH-1", "BATCH-2", "BATCH-NEW"]
+    samples = Sample.objects.filter(sample_id__startswith="BATCH-")
+    assert samples.count() == 4
+    assert {sample.study_id.name for sample in samples} == {"GID-100-P", "GID-200-P"}
+    assert samples.filter(study_id=existing).count() == 3
+    assert StudyIdentifier.objects.get(name="GID-200-P").history.count() == 1
+    for sample in samples:
+        assert sample.created_by == user.email
+        history = sample.history.get()
+        assert history.history_type == "+"
+        assert history.history_user == user
+
+
+def test_list_payload_links_clinical_data_and_indexes_search():
+    client, _ = _client()
+    study = StudyIdentifierFactory(name="GID-300-P", study_name="gidamps")
+    clinical = ClinicalData.objects.create(study_id=study, sample_date="2024-03-01")
+
+    client.post(
+        reverse("v3-multiple-samples-list"),
+        [_payload("LINKED-1", study_id="GID-300-P", sample_location="Nitrogen Dewar")],
+        format="json",
+    )
+
+    sample = Sample.objects.get(sample_id="LINKED-1")
+    assert sample.clinical_data_id == clinical.pk
+    assert list(search_samples(Sample.objects.all(), "nitrogen").values_list("sample_id", flat=True)) == ["LINKED-1"]
+
+
+def test_list_payload_reports_existing_and_duplicate_ids_per_item():
+    client, _ = _client()
+    SampleFactory(sample_id="TAKEN-1")
+
+    response = client.post(
+        reverse("v3-multiple-samples-list"),
+        [_payload("taken-1"), _payload("FRESH-1"), _payload("fresh-1")],
+        format="json",
+    )
+
+    assert response.status_code == 400
+    errors = response.json()
+    assert "sample_id" in errors[0]
+    assert errors[1] == {}
+    assert "sample_id" in errors[2]
+    assert not Sample.objects.filter(sample_id="FRESH-1").exists()
+
+
+def test_list_payload_query_count_does_not_grow_with_batch_size():
+    client, _ = _client()
+    StudyIdentifierFactory(name="GID-100-P")
+    url = reverse("v3-multiple-samples-list")
+
+    with CaptureQueriesContext(connection) as small:
+        client.post(url, [_payload(f"SMALL-{index}") for index in range(2)], format="json")
+    with CaptureQueriesContext(connection) as large:
+        client.post(url, [_payload(f"LARGE-{index}") for index in range(12)], format="json")
+
+    assert len(large) == len(small)
@@ -0,0 +1,78 @@
+# api_v3/tests/test_options_cache.py
+# Tests the versioned caching of the v3 form and filter option endpoints.
+# Exists to guarantee cached option payloads are reused until an experiment or type table changes.
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from app.factories import BasicScienceSampleTypeFactory, ExperimentFactory
+from app.models import TissueType
+from users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _client():
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    return client
+
+
+@pytest.mark.parametrize(
+    "url_name",
+    [
+        "v3-boxes-options",
+        "v3-boxes-filter-options",
+        "v3-experiments-options",
+        "v3-experiments-filter-options",
+        "v3-sample-filter-options",
+    ],
+)
+def test_options_are_cached_with_etag_and_max_age(url_name):
+    client = _client()
+    url = reverse(url_name)
+    first = client.get(url)
+
+    with CaptureQueriesContext(connection) as queries:
+        second = client.get(url)
+        not_modified = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert first.status_code == 200
+    assert "max-age=" in first["Cache-Control"]
+    assert "private" in first["Cache-Control"]
+    assert second.json() == first.json()
+    assert not_modified.status_code == 304
+    # Only the authenticated user lookups remain; the option payload itself is never rebuilt.
+    assert not any("app_experiment" in query["sql"] or "app_tissuetype" in query["sql"] for query in queries)
+
+
+def test_new_experiment_invalidates_box_options():
+    client = _client()
+    url = reverse("v3-boxes-options")
+    first = client.get(url)
+
+    experiment = ExperimentFactory(name="EXP-NEW")
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+    assert response.status_code == 200
+    assert experiment.id in [option["id"] for option in response.json()["experiments"]]
+
+
+def test_type_changes_invalidate_experiment_options():
+    client = _client()
+    url = reverse("v3-experiments-filter-options")
+    sample_type = BasicScienceSampleTypeFactory(label="Original")
+    first = client.get(url)
+
+    sample_type.label = "Renamed"
+    sample_type.save()
+    renamed = client.get(url).json()
+    TissueType.objects.create(name="custom_tissue", label="Custom Tissue")
+    with_tissue = client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+
+    assert "Renamed" in [option["label"] for option in renamed["sample_types"]]
+    assert with_tissue.status_code == 200
+    assert "Custom Tissue" in [option["label"] for option in with_tissue.json()["tissue_types"]]
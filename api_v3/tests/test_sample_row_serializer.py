@@ -0,0 +1,96 @@
+# api_v3/tests/test_sample_row_serializer.py
+# Checks that the values()-based sample list serializer matches SampleV3Serializer field for field.
+# Exists so the fast list path can never drift from the JSON contract the frontend was built against.
+
+import datetime
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api_v3.row_serializers import SampleV3RowSerializer
+from api_v3.serializers import SampleV3Serializer
+from app.factories import SampleFactory, StudyIdentifierFactory
+from app.models import ClinicalData, Sample
+from core.clinical import get_samples_with_clinical_data
+from users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _client():
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    return client
+
+
+def _make_samples():
+    sampled_at = timezone.make_aware(datetime.datetime(2024, 3, 5, 9, 30))
+    music = StudyIdentifierFactory(
+        name="MUS-1", study_name="music", study_group="cd", sex="female", study_center="glasgow", age=41
+    )
+    gidamps = StudyIdentifierFactory(name="GID-1-P", study_name="gidamps", genotype_data_available=True)
+    ClinicalData.objects.create(
+        study_id=music, music_timepoint="baseline", crp=4.5, endoscopic_mucosal_healing_at_12_months=True
+    )
+    ClinicalData.objects.create(study_id=gidamps, sample_date=sampled_at.date(), calprotectin=120)
+    SampleFactory(
+        sample_id="ROW-MUSIC",
+        study_id=music,
+        study_name="music",
+        music_timepoint="baseline",
+        sample_datetime=sampled_at,
+        sample_comments="first draw",
+    )
+    SampleFactory(sample_id="ROW-GID", study_id=gidamps, study_name="gidamps", sample_datetime=sampled_at)
+    SampleFactory(sample_id="ROW-MARVEL", study_name="marvel", marvel_timepoint="12_weeks", sample_sublocation="")
+    SampleFactory(sample_id="ROW-ORPHAN", study_id=None, sample_type="legacy_code", is_used=True)
+
+
+def _queryset():
+    return get_samples_with_clinical_data(Sample.objects.select_related("study_id")).order_by("sample_id")
+
+
+def test_row_serializer_matches_model_serializer():
+    _make_samples()
+    row_serializer = SampleV3RowSerializer()
+
+    expected = SampleV3Serializer(_queryset(), many=True).data
+    actual = row_serializer.serialize(_queryset().values(*row_serializer.columns))
+
+    assert [dict(item) for item in expected] == actual
+    assert list(actual[0]) == SampleV3Serializer.Meta.fields
+    by_id = {row["sample_id"]: row for row in actual}
+    assert (by_id["ROW-MUSIC"]["crp"], by_id["ROW-MUSIC"]["timepoint_label"]) == (4.5, "Baseline")
+    assert by_id["ROW-GID"]["calprotectin"] == 120.0
+    assert by_id["ROW-ORPHAN"]["study_identifier"] is None
+
+
+def test_row_serializer_respects_sparse_fields():
+    _make_samples()
+    row_serializer = SampleV3RowSerializer(fields={"id", "sample_id", "crp"})
+
+    rows = row_serializer.serialize(_queryset().values(*row_serializer.columns))
+
+    assert row_serializer.columns == ["id", "sample_id", "crp"]
+    assert rows[0] == {"id": rows[0]["id"], "sample_id": "ROW-GID", "crp": None}
+
+
+def test_list_endpoint_serves_the_same_payload():
+    _make_samples()
+    expected = {item["sample_id"]: dict(item) for item in SampleV3Serializer(_queryset(), many=True).data}
+
+    results = _client().get("/api/v3/samples/", {"include_used": "true"}).json()["results"]
+
+    assert {item["sample_id"]: item for item in results} == expected
+
+
+def test_cursor_pages_walk_values_rows():
+    for index in range(5):
+        SampleFactory(sample_id=f"CUR-{index}", is_used=False)
+    client = _client()
+
+    first = client.get("/api/v3/samples/", {"pagination": "cursor", "page_size": 3, "ordering": "sample_id"}).json()
+    second = client.get(first["next"]).json()
+
+    assert [row["sample_id"] for row in first["results"] + second["results"]] == [f"CUR-{i}" for i in range(5)]
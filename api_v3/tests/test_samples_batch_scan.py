@@ -0,0 +1,124 @@
+# api_v3/tests/test_samples_batch_scan.py
+# Tests the batch scan endpoint that moves or marks used many scanned samples in one request.
+# Exists to guarantee per-sample outcomes, history rows and search index updates match single PATCH scans.
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from app.factories import SampleFactory
+from app.models import Sample
+from core.autocomplete import location_index
+from core.search import search_samples
+from core.services.samples import SampleBatchScanService
+from core.versions import get_data_versions
+from users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _client():
+    user = UserFactory(email="scanner@example.com")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client, user
+
+
+def test_batch_scan_reports_per_sample_status():
+    client, _ = _client()
+    SampleFactory(sample_id="SCAN-1", sample_location="Freezer A")
+    SampleFactory(sample_id="SCAN-2", sample_location="Freezer B")
+
+    response = client.post(
+        reverse("v3-samples-batch-scan"),
+        {"sample_ids": ["SCAN-1", "SCAN-2", "SCAN-404", "SCAN-1"], "sample_location": "Freezer B"},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["results"] == [
+        {"sample_id": "SCAN-1", "status": "updated"},
+        {"sample_id": "SCAN-2", "status": "unchanged"},
+        {"sample_id": "SCAN-404", "status": "not_found"},
+    ]
+    assert (body["updated"], body["unchanged"], body["not_found"]) == (1, 1, 1)
+    assert Sample.objects.get(sample_id="SCAN-1").sample_location == "Freezer B"
+
+
+def test_batch_scan_writes_history_and_audit_fields():
+    client, user = _client()
+    sample = SampleFactory(sample_id="SCAN-3", is_used=False, last_modified_by="someone@example.com")
+    previous_modified = Sample.objects.get(pk=sample.pk).last_modified
+
+    client.post(reverse("v3-samples-batch-scan"), {"sample_ids": ["SCAN-3"], "is_used": True}, format="json")
+
+    sample.refresh_from_db()
+    latest = sample.history.latest()
+    assert sample.is_used is True
+    assert sample.last_modified_by == user.email
+    assert sample.last_modified > previous_modified
+    assert latest.history_type == "~"
+    assert latest.is_used is True
+    assert latest.history_user == user
+
+
+def test_batch_scan_updates_search_index():
+    client, _ = _client()
+    SampleFactory(sample_id="SCAN-4", sample_location="Old Shelf")
+
+    client.post(
+        reverse("v3-samples-batch-scan"),
+        {"sample_ids": ["SCAN-4"], "sample_location": "Cryo Tank", "sample_sublocation": "Rack 7"},
+        format="json",
+    )
+
+    found = search_samples(Sample.objects.all(), "cryo tank").values_list("sample_id", flat=True)
+    assert list(found) == ["SCAN-4"]
+
+
+def test_rolled_back_scan_leaves_autocomplete_and_data_version_alone(django_capture_on_commit_callbacks):
+    SampleFactory(sample_id="SCAN-1", sample_location="Freezer A")
+    location_index.rebuild()
+    version = get_data_versions(Sample)
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        with pytest.raises(RuntimeError), transaction.atomic():
+            SampleBatchScanService.apply(["SCAN-1"], {"sample_location": "Ghost Freezer"})
+            raise RuntimeError("rolled back")
+
+    assert callbacks == []
+    assert location_index.search("ghost") == []
+    assert get_data_versions(Sample) == version
+
+
+def test_batch_scan_query_count_does_not_grow_with_batch_size():
+    client, _ = _client()
+    for index in range(10):
+        SampleFactory(sample_id=f"RACK-{index}", is_used=False)
+    url = reverse("v3-samples-batch-scan")
+
+    with CaptureQueriesContext(connection) as small:
+        client.post(url, {"sample_ids": ["RACK-0", "RACK-1"], "is_used": True}, format="json")
+    with CaptureQueriesContext(connection) as large:
+        client.post(url, {"sample_ids": [f"RACK-{index}" for index in range(2, 10)], "is_used": True}, format="json")
+
+    assert len(large) == len(small)
+
+
+def test_batch_scan_requires_a_change():
+    client, _ = _client()
+
+    response = client.post(reverse("v3-samples-batch-scan"), {"sample_ids": ["SCAN-1"]}, format="json")
+
+    assert response.status_code == 400
+
+
+def test_batch_scan_requires_authentication():
+    response = APIClient().post(
+        reverse("v3-samples-batch-scan"), {"sample_ids": ["SCAN-1"], "is_used": True}, format="json"
+    )
+
+    assert response.status_code == 401
@@ -0,0 +1,187 @@
+# api_v3/tests/test_samples_cursor_pagination.py
+# Exercises the opt-in keyset pagination mode on the v3 samples list and search endpoints.
+# Exists to guarantee cursors walk every row exactly once in both directions without OFFSET paging.
+
+import base64
+import datetime
+import json
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from app.factories import SampleFactory
+from users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _client():
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    return client
+
+
+def _make_samples(count, shared_datetime=None):
+    base = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+    samples = []
+    for index in range(count):
+        sample_datetime = shared_datetime or base + datetime.timedelta(hours=index)
+        samples.append(SampleFactory(sample_datetime=sample_datetime, sample_sublocation=None))
+    return samples
+
+
+def _walk(client, url, params):
+    seen = []
+    response = client.get(url, params)
+    while True:
+        assert response.status_code == 200
+        body = response.json()
+        seen.extend(item["sample_id"] for item in body["results"])
+        if not body["next"]:
+            return seen, body
+        response = client.get(body["next"])
+
+
+def test_cursor_mode_returns_opaque_links_without_count():
+    client = _client()
+    _make_samples(5)
+
+    response = client.get(reverse("v3-samples-list"), {"pagination": "cursor", "page_size": 2})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert "count" not in body
+    assert body["previous"] is None
+    assert "cursor=" in body["next"]
+    assert len(body["results"]) == 2
+
+
+def test_cursor_mode_includes_count_on_request():
+    client = _client()
+    _make_samples(3)
+
+    response = client.get(reverse("v3-samples-list"), {"pagination": "cursor", "include_count": "true"})
+
+    assert response.json()["count"] == 3
+
+
+def test_cursor_walk_matches_default_ordering():
+    client = _client()
+    samples = _make_samples(7)
+
+    seen, _ = _walk(client, reverse("v3-samples-list"), {"pagination": "cursor", "page_size": 3})
+
+    expected = [sample.sample_id for sample in sorted(samples, key=lambda s: s.sample_datetime, reverse=True)]
+    assert seen == expected
+
+
+def test_cursor_walk_breaks_ties_on_id():
+    client = _client()
+    shared = datetime.datetime(2024, 6, 1, tzinfo=datetime.timezone.utc)
+    samples = _make_samples(5, shared_datetime=shared)
+
+    seen, _ = _walk(client, reverse("v3-samples-list"), {"pagination": "cursor", "page_size": 2})
+
+    assert sorted(seen) == sorted(sample.sample_id for sample in samples)
+    assert len(seen) == len(set(seen))
+
+
+def test_cursor_previous_link_returns_prior_page():
+    client = _client()
+    _make_samples(6)
+    url = reverse("v3-samples-list")
+
+    first = client.get(url, {"pagination": "cursor", "page_size": 2}).json()
+    second = client.get(first["next"]).json()
+    back = client.get(second["previous"]).json()
+
+    assert [item["sample_id"] for item in back["results"]] == [item["sample_id"] for item in first["results"]]
+
+
+def test_cursor_respects_nullable_ordering_field():
+    client = _client()
+    samples = _make_samples(4)
+    samples[0].sample_sublocation = "B1"
+    samples[0].save()
+    samples[1].sample_sublocation = "A1"
+    samples[1].save()
+
+    seen, _ = _walk(
+        client,
+        reverse("v3-samples-list"),
+        {"pagination": "cursor", "page_size": 1, "ordering": "sample_sublocation"},
+    )
+
+    assert len(seen) == 4
+    assert seen[-2:] == [samples[1].sample_id, samples[0].sample_id]
+
+
+def test_cursor_mode_on_search_endpoint():
+    client = _client()
+    for index in range(3):
+        SampleFactory(sample_id=f"CURSOR-{index}")
+    SampleFactory(sample_id="OTHER-1")
+
+    seen, _ = _walk(client, reverse("v3-samples-search"), {"query": "CURSOR", "pagination": "cursor", "page_size": 2})
+
+    assert sorted(seen) == ["CURSOR-0", "CURSOR-1", "CURSOR-2"]
+
+
+def test_invalid_cursor_returns_404():
+    client = _client()
+
+    response = client.get(reverse("v3-samples-list"), {"cursor": "not-a-cursor"})
+
+    assert response.status_code == 404
+
+
+def _cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+@pytest.mark.parametrize(
+    "params, payload",
+    [
+        ({}, {"o": "-sample_datetime", "k": "garbage", "i": 1}),
+        ({}, {"o": "-sample_datetime", "k": {"nested": 1}, "i": 1}),
+        ({}, {"o": "-sample_datetime", "k": None, "i": 1}),
+        ({}, {"k": "2024-01-01T00:00:00+00:00", "i": 1}),
+        ({"ordering": "sample_id"}, {"o": "sample_datetime", "k": "2024-01-01T00:00:00+00:00", "i": 1}),
+    ],
+    ids=["tampered-key", "non-scalar-key", "null-key", "no-ordering", "ordering-mismatch"],
+)
+def test_unusable_cursor_returns_404(params, payload):
+    _make_samples(2)
+
+    response = _client().get(reverse("v3-samples-list"), {**params, "cursor": _cursor(payload)})
+
+    assert response.status_code == 404
+
+
+def test_null_key_on_coalesced_ordering_seeks_from_empty_string():
+    samples = _make_samples(2)
+    params = {"ordering": "sample_sublocation", "cursor": _cursor({"o": "sample_sublocation", "k": None, "i": 0})}
+
+    body = _client().get(reverse("v3-samples-list"), params).json()
+
+    assert [item["sample_id"] for item in body["results"]] == [sample.sample_id for sample in samples]
+
+
+def test_next_link_is_rejected_under_another_ordering():
+    client = _client()
+    _make_samples(3)
+    url = reverse("v3-samples-list")
+    next_link = client.get(url, {"pagination": "cursor", "page_size": 1, "ordering": "sample_datetime"}).json()["next"]
+
+    assert client.get(next_link).status_code == 200
+    assert client.get(next_link.replace("ordering=sample_datetime", "ordering=sample_id")).status_code == 404
+
+
+def test_page_number_mode_is_default():
+    client = _client()
+    _make_samples(2)
+
+    body = client.get(reverse("v3-samples-list")).json()
+
+    assert body["count"] == 2
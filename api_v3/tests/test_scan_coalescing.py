@@ -0,0 +1,215 @@
+# api_v3/tests/test_scan_coalescing.py
+# Tests the single-sample scan endpoints with and without the group-commit coalescer.
+# Exists to guarantee coalesced scans write the same rows and history as direct ones and fail independently.
+
+import threading
+from concurrent import futures
+from concurrent.futures import Future
+
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from app.factories import SampleFactory
+from app.models import Sample
+from core.services import coalescer as coalescer_module
+from core.services.coalescer import COALESCE_RETRY_AFTER, QueuedScan, SampleScanCoalescer
+from core.services.samples import SampleBatchScanService
+from users.factories import UserFactory
+
+
+def _client(user=None):
+    client = APIClient()
+    client.force_authenticate(user=user or UserFactory())
+    return client
+
+
+@pytest.mark.django_db
+def test_direct_scan_update_writes_sample_and_history():
+    user = UserFactory(email="bench@example.com")
+    SampleFactory(sample_id="SCAN-1", sample_location="Freezer A")
+
+    response = _client(user).patch(
+        reverse("v3-sample-location-detail", kwargs={"sample_id": "SCAN-1"}),
+        {"sample_location": "Freezer B"},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    sample = Sample.objects.get(sample_id="SCAN-1")
+    assert sample.sample_location == "Freezer B"
+    assert sample.last_modified_by == "bench@example.com"
+    assert sample.history.first().sample_location == "Freezer B"
+
+
+@pytest.mark.django_db
+def test_apply_groups_changes_and_resolves_each_request():
+    first_user, second_user = UserFactory(email="one@example.com"), UserFactory(email="two@example.com")
+    for sample_id in ("SCAN-1", "SCAN-2", "SCAN-3"):
+        SampleFactory(sample_id=sample_id, sample_location="Freezer A", is_used=False)
+    batch = [
+        QueuedScan("SCAN-1", {"sample_location": "Freezer B"}, first_user, first_user.email, Future()),
+        QueuedScan("SCAN-2", {"sample_location": "Freezer B"}, first_user, first_user.email, Future()),
+        QueuedScan("SCAN-3", {"is_used": True}, second_user, second_user.email, Future()),
+        QueuedScan("SCAN-404", {"is_used": True}, second_user, second_user.email, Future()),
+    ]
+
+    SampleScanCoalescer(window=0).apply(batch)
+
+    assert [entry.future.result() for entry in batch] == ["updated", "updated", "updated", "not_found"]
+    assert Sample.objects.get(sample_id="SCAN-2").sample_location == "Freezer B"
+    used = Sample.objects.get(sample_id="SCAN-3")
+    assert used.is_used is True
+    assert used.history.first().history_user == second_user
+
+
+@pytest.mark.django_db
+def test_repeated_scans_of_one_sample_apply_in_submission_order():
+    user = UserFactory()
+    sample = SampleFactory(sample_id="SCAN-1", sample_location="Freezer A")
+    batch = [
+        QueuedScan("SCAN-1", {"sample_location": location}, user, user.email, Future())
+        for location in ("Freezer B", "Freezer C", "Freezer B", "Freezer B")
+    ]
+
+    SampleScanCoalescer(window=0).apply(batch)
+
+    assert [entry.future.result() for entry in batch] == ["updated", "updated", "updated", "unchanged"]
+    sample.refresh_from_db()
+    assert sample.sample_location == "Freezer B"
+    assert [record.sample_location for record in sample.history.order_by("history_id")] == [
+        "Freezer A",
+        "Freezer B",
+        "Freezer C",
+        "Freezer B",
+    ]
+
+
+@pytest.mark.django_db
+def test_failing_group_only_fails_its_own_requests(monkeypatch):
+    user = UserFactory()
+    SampleFactory(sample_id="SCAN-1", sample_location="Freezer A")
+    SampleFactory(sample_id="SCAN-2", is_used=False)
+    original_apply = SampleBatchScanService.apply
+
+    def apply(sample_ids, changes, **kwargs):
+        if "is_used" in changes:
+            raise RuntimeError("boom")
+        return original_apply(sample_ids, changes, **kwargs)
+
+    monkeypatch.setattr(SampleBatchScanService, "apply", staticmethod(apply))
+    good = QueuedScan("SCAN-1", {"sample_location": "Freezer B"}, user, user.email, Future())
+    bad = QueuedScan("SCAN-2", {"is_used": True}, user, user.email, Future())
+
+    SampleScanCoalescer(window=0).apply([good, bad])
+
+    assert good.future.result() == "updated"
+    with pytest.raises(RuntimeError):
+        bad.future.result()
+    assert Sample.objects.get(sample_id="SCAN-1").sample_location == "Freezer B"
+    assert Sample.objects.get(sample_id="SCAN-2").is_used is False
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(SAMPLE_SCAN_COALESCING=True, SAMPLE_SCAN_COALESCE_WINDOW_MS=200)
+def test_concurrent_scans_share_one_batch(monkeypatch):
+    monkeypatch.setattr(coalescer_module, "_coalescer", None)
+    batch_sizes = []
+    original_apply = SampleScanCoalescer.apply
+
+    def apply(self, batch):
+        batch_sizes.append(len(batch))
+        return original_apply(self, batch)
+
+    monkeypatch.setattr(SampleScanCoalescer, "apply", apply)
+    user = UserFactory()
+    sample_ids = [f"SCAN-{index}" for index in range(4)]
+    for sample_id in sample_ids:
+        SampleFactory(sample_id=sample_id, is_used=False)
+    responses = {}
+
+    def scan(sample_id):
+        responses[sample_id] = _client(user).patch(
+            reverse("v3-samples-used-detail", kwargs={"sample_id": sample_id}), {"is_used": True}, format="json"
+        )
+
+    threads = [threading.Thread(target=scan, args=(sample_id,)) for sample_id in sample_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert {sample_id: response.status_code for sample_id, response in responses.items()} == dict.fromkeys(
+        sample_ids, 200
+    )
+    assert responses["SCAN-0"].json() == {"sample_id": "SCAN-0", "is_used": True}
+    assert sum(batch_sizes) == 4 and len(batch_sizes) < 4
+    assert Sample.objects.filter(sample_id__in=sample_ids, is_used=True).count() == 4
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(SAMPLE_SCAN_COALESCING=True, SAMPLE_SCAN_COALESCE_WINDOW_MS=0)
+def test_coalesced_scan_of_deleted_sample_is_not_found(monkeypatch):
+    monkeypatch.setattr(coalescer_module, "_coalescer", None)
+    SampleFactory(sample_id="SCAN-1", sample_location="Freezer A")
+    monkeypatch.setattr(
+        SampleBatchScanService,
+        "apply",
+        staticmethod(lambda sample_ids, changes, **kwargs: [{"sample_id": "SCAN-1", "status": "not_found"}]),
+    )
+
+    response = _client().patch(
+        reverse("v3-sample-location-detail", kwargs={"sample_id": "SCAN-1"}),
+        {"sample_location": "Freezer B"},
+        format="json",
+    )
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+@override_settings(SAMPLE_SCAN_COALESCING=True)
+def test_timed_out_coalesced_scan_is_retryable(monkeypatch):
+    monkeypatch.setattr(coalescer_module, "_coalescer", None)
+    SampleFactory(sample_id="SCAN-1", sample_location="Freezer A")
+
+    def submit(self, *args, **kwargs):
+        raise futures.TimeoutError()
+
+    monkeypatch.setattr(SampleScanCoalescer, "submit", submit)
+
+    response = _client().patch(
+        reverse("v3-sample-location-detail", kwargs={"sample_id": "SCAN-1"}),
+        {"sample_location": "Freezer B"},
+        format="json",
+    )
+
+    assert response.status_code == 503
+    assert response["Retry-After"] == str(COALESCE_RETRY_AFTER)
+
+
+@pytest.mark.django_db
+@override_settings(SAMPLE_SCAN_COALESCING=True)
+def test_backed_up_coalescer_falls_back_to_a_direct_update(monkeypatch):
+    monkeypatch.setattr(coalescer_module, "_coalescer", None)
+    SampleFactory(sample_id="SCAN-1", sample_location="Freezer A")
+    monkeypatch.setattr(SampleScanCoalescer, "backed_up", lambda self: True)
+    monkeypatch.setattr(SampleScanCoalescer, "submit", lambda self, *args, **kwargs: pytest.fail("queued"))
+
+    response = _client().patch(
+        reverse("v3-sample-location-detail", kwargs={"sample_id": "SCAN-1"}),
+        {"sample_location": "Freezer B"},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert Sample.objects.get(sample_id="SCAN-1").sample_location == "Freezer B"
+
+
+def test_backed_up_once_a_full_batch_is_waiting():
+    coalescer = SampleScanCoalescer(window=0, max_batch=2)
+    coalescer._queue.put(object())
+    assert not coalescer.backed_up()
+    coalescer._queue.put(object())
+    assert coalescer.backed_up()
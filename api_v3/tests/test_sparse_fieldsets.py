@@ -0,0 +1,117 @@
+# api_v3/tests/test_sparse_fieldsets.py
+# Tests the fields= and omit= parameters on the v3 list endpoints.
+# Exists to check that unrequested columns are dropped from both the payload and the queries that build it.
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from app.factories import BasicScienceBoxFactory, ExperimentFactory, SampleFactory, StudyIdentifierFactory
+from users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _client():
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    return client
+
+
+def _sql(queries):
+    return "\n".join(query["sql"] for query in queries)
+
+
+def test_sample_fields_limit_payload_and_skip_joins():
+    client = _client()
+    SampleFactory(sample_id="SPARSE-1", is_used=False)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/api/v3/samples/", {"fields": "sample_id,sample_location"})
+
+    assert response.status_code == 200
+    assert set(response.json()["results"][0]) == {"id", "sample_id", "sample_location"}
+    assert "app_clinicaldata" not in _sql(queries)
+    assert "app_studyidentifier" not in _sql(queries)
+
+
+def test_sample_omit_clinical_fields_keeps_study_join():
+    client = _client()
+    SampleFactory(is_used=False)
+    omitted = "crp,calprotectin,endoscopic_mucosal_healing_at_3_6_months,endoscopic_mucosal_healing_at_12_months"
+
+    with CaptureQueriesContext(connection) as queries:
+        row = client.get("/api/v3/samples/", {"omit": omitted}).json()["results"][0]
+
+    assert "crp" not in row and "calprotectin" not in row
+    assert row["study_identifier"] is not None
+    assert "app_clinicaldata" not in _sql(queries)
+
+
+def test_sample_full_payload_is_unchanged_without_parameters():
+    client = _client()
+    SampleFactory(is_used=False)
+
+    row = client.get("/api/v3/samples/").json()["results"][0]
+
+    assert {"crp", "study_identifier", "genotype_data_available", "sample_comments"} <= set(row)
+
+
+def test_sample_search_honours_fields():
+    client = _client()
+    SampleFactory(sample_id="FIND-ME", is_used=False)
+
+    response = client.get("/api/v3/samples/search/", {"query": "FIND-ME", "fields": "sample_id"})
+
+    assert response.json()["results"] == [{"id": response.json()["results"][0]["id"], "sample_id": "FIND-ME"}]
+
+
+def test_unknown_field_is_rejected():
+    response = _client().get("/api/v3/samples/", {"fields": "sample_id,nope"})
+
+    assert response.status_code == 400
+    assert "fields" in response.json()
+
+
+def test_box_fields_skip_experiment_prefetch():
+    client = _client()
+    BasicScienceBoxFactory(box_id="BOX-SPARSE", is_used=False)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/api/v3/boxes/", {"fields": "box_id,location"})
+
+    assert set(response.json()["results"][0]) == {"id", "box_id", "location"}
+    assert "app_experiment" not in _sql(queries)
+
+
+def test_experiment_omit_boxes_skips_prefetch():
+    client = _client()
+    ExperimentFactory(is_deleted=False)
+
+    with CaptureQueriesContext(connection) as queries:
+        row = client.get("/api/v3/experiments/", {"omit": "boxes"}).json()["results"][0]
+
+    assert "boxes" not in row and "sample_types" in row
+    assert "app_basicsciencebox_experiments" not in _sql(queries)
+
+
+def test_study_id_fields_skip_count_annotations():
+    client = _client()
+    StudyIdentifierFactory(name="GID-SPARSE-P")
+
+    with CaptureQueriesContext(connection) as queries:
+        row = client.get("/api/v3/study-ids/", {"fields": "name"}).json()["results"][0]
+
+    assert row == {"id": row["id"], "name": "GID-SPARSE-P"}
+    assert "app_sample" not in _sql(queries)
+
+
+def test_unknown_omitted_field_is_ignored():
+    client = _client()
+    SampleFactory(is_used=False)
+
+    response = client.get("/api/v3/samples/", {"omit": "actions,crp"})
+
+    assert response.status_code == 200
+    assert "crp" not in response.json()["results"][0]
@@ -1,6 +1,6 @@
 # api_v3/tests/test_study_ids.py
 # Exercises the study identifier detail/update endpoints consumed by the Next.js study ID modals.
-# Exists to lock in the history payload and uppercase update behavior the frontend relies on.
+# Exists to lock in the history summary and uppercase update behavior the frontend relies on.
 
 import pytest
 from django.urls import reverse
@@ -12,7 +12,7 @@ from users.factories import UserFactory
 pytestmark = pytest.mark.django_db
 
 
-def test_study_id_detail_includes_history_entries():
+def test_study_id_detail_includes_history_summary():
     user = UserFactory()
     client = APIClient()
     client.force_authenticate(user=user)
@@ -29,10 +29,10 @@ def test_study_id_detail_includes_history_entries():
     assert response.status_code == 200
     body = response.json()
     assert body["id"] == study.id
-    assert isinstance(body.get("history"), list)
-    assert any(
-        change.get("field") == "study_group" for entry in body["history"] for change in entry.get("changes", [])
-    )
+    assert body["history"]["count"] == 3
+    assert body["history"]["last_change"]["changes"] == [
+        {"field": "study_group", "label": "Study Group", "old": "uc", "new": "cd"}
+    ]
 
 
 def test_study_id_patch_uppercases_name_and_preserves_choices():
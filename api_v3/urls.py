@@ -13,6 +13,8 @@ from api_v3.views import (
     CurrentUserRecentSamplesView,
     CurrentUserTokenViewSet,
     CurrentUserView,
+    DashboardView,
+    DatabaseMaintenanceView,
     DatasetOverviewView,
     DatasetV3ViewSet,
     ExperimentExportView,
@@ -24,11 +26,14 @@ from api_v3.views import (
     PasswordChangeView,
     PasswordResetConfirmView,
     PasswordResetRequestView,
+    SampleAnalyticsView,
+    SampleBatchScanView,
     SampleIsUsedV3ViewSet,
     SampleExportView,
     SampleLocationV3ViewSet,
     SampleLocationAutocompleteView,
     SampleSublocationAutocompleteView,
+    SampleTypePivotView,
     SampleFilterOptionsView,
     SampleV3ViewSet,
     StaffUserViewSet,
@@ -64,6 +69,7 @@ urlpatterns = [
         name="v3-current-user-token-refresh",
     ),
     path("users/me/recent-samples/", CurrentUserRecentSamplesView.as_view(), name="v3-current-user-recent-samples"),
+    path("dashboard/", DashboardView.as_view(), name="v3-dashboard"),
     path("datasets/overview/", DatasetOverviewView.as_view(), name="v3-datasets-overview"),
     path(
         "samples/autocomplete/locations/",
@@ -86,11 +92,15 @@ urlpatterns = [
     path("experiments/export/", ExperimentExportView.as_view(), name="v3-experiments-export"),
     path("experiments/filters/", ExperimentFilterOptionsView.as_view(), name="v3-experiments-filter-options"),
     path("experiments/options/", ExperimentOptionsView.as_view(), name="v3-experiments-options"),
+    path("samples/analytics/", SampleAnalyticsView.as_view(), name="v3-samples-analytics"),
+    path("samples/batch-scan/", SampleBatchScanView.as_view(), name="v3-samples-batch-scan"),
     path("samples/export/", SampleExportView.as_view(), name="v3-samples-export"),
     path("samples/filters/", SampleFilterOptionsView.as_view(), name="v3-sample-filter-options"),
+    path("samples/pivot/<str:study_name>/", SampleTypePivotView.as_view(), name="v3-samples-pivot"),
     path("users/password-reset/", PasswordResetRequestView.as_view(), name="v3-password-reset"),
     path("users/password-reset/confirm/", PasswordResetConfirmView.as_view(), name="v3-password-reset-confirm"),
     path("management/user-emails/", ManagementUserEmailsView.as_view(), name="v3-management-user-emails"),
+    path("management/database/", DatabaseMaintenanceView.as_view(), name="v3-management-database"),
     path("auth/login/", V3TokenObtainPairView.as_view(), name="v3-token-obtain-pair"),
     path("auth/refresh/", V3TokenRefreshView.as_view(), name="v3-token-refresh"),
     path("auth/blacklist/", V3TokenBlacklistView.as_view(), name="v3-token-blacklist"),
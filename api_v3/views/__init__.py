@@ -14,6 +14,9 @@ from api_v3.views.boxes import (  # noqa: F401
     BasicScienceBoxOptionsView,
     BasicScienceBoxV3ViewSet,
 )
+from api_v3.views.dashboard import (  # noqa: F401
+    DashboardView,
+)
 from api_v3.views.datasets import (  # noqa: F401
     DatasetOverviewView,
     DatasetV3ViewSet,
@@ -24,14 +27,20 @@ from api_v3.views.experiments import (  # noqa: F401
     ExperimentOptionsView,
     ExperimentV3ViewSet,
 )
+from api_v3.views.maintenance import (  # noqa: F401
+    DatabaseMaintenanceView,
+)
 from api_v3.views.samples import (  # noqa: F401
     MultipleSampleV3ViewSet,
+    SampleAnalyticsView,
+    SampleBatchScanView,
     SampleExportView,
     SampleIsUsedV3ViewSet,
     SampleFilterOptionsView,
     SampleLocationV3ViewSet,
     SampleLocationAutocompleteView,
     SampleSublocationAutocompleteView,
+    SampleTypePivotView,
     SampleV3ViewSet,
     StudyIdAutocompleteView,
 )
@@ -12,6 +12,13 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from api_v3.mixins import (
+    CachedCountMixin,
+    ConditionalGetMixin,
+    HistoryMixin,
+    SparseFieldsetMixin,
+    VersionedCacheMixin,
+)
 from api_v3.serializers import (
     BasicScienceBoxCreateV3Serializer,
     BasicScienceBoxDetailV3Serializer,
@@ -29,16 +36,36 @@ from app.choices import (
 from app.filters import BasicScienceBoxV3Filter
 from app.models import BasicScienceBox, BasicScienceSampleType, Experiment, TissueType
 from app.pagination import SamplePageNumberPagination
-from core.utils.export import export_csv
+from core.utils.export import stream_csv
 
 EXPERIMENT_PREFETCH = Prefetch(
     "experiments",
     queryset=Experiment.objects.prefetch_related("sample_types", "tissue_types"),
 )
 
+# List fields computed from the box's experiments, which the viewset only prefetches when one is requested.
+BOX_EXPERIMENT_FIELDS = (
+    "experiments",
+    "basic_science_groups_display",
+    "species_display",
+    "sample_type_labels",
+    "tissue_type_labels",
+)
+# Nested experiment prefetches and user joins, each paired with the list fields that read them.
+BOX_EXPERIMENT_PREFETCH_FIELDS = (
+    ("sample_types", ("sample_type_labels",)),
+    ("tissue_types", ("tissue_type_labels",)),
+)
+BOX_RELATED_FIELDS = (
+    ("created_by", ("created_by_email",)),
+    ("last_modified_by", ("last_modified_by_email",)),
+)
+
 
 @extend_schema(tags=["v3"])
-class BasicScienceBoxV3ViewSet(viewsets.ModelViewSet):
+class BasicScienceBoxV3ViewSet(
+    ConditionalGetMixin, CachedCountMixin, SparseFieldsetMixin, HistoryMixin, viewsets.ModelViewSet
+):
     """
     API for the v3 frontend that exposes key box details and creation.
     """
@@ -51,13 +78,19 @@ class BasicScienceBoxV3ViewSet(viewsets.ModelViewSet):
     ordering_fields = ["created", "box_id", "location", "box_type", "id"]
     ordering = ["-created"]
     pagination_class = SamplePageNumberPagination
+    conditional_models = (BasicScienceBox, Experiment, BasicScienceSampleType, TissueType)
+    count_models = conditional_models
 
     def get_queryset(self):
-        base_queryset = (
-            BasicScienceBox.objects.prefetch_related(EXPERIMENT_PREFETCH)
-            .select_related("created_by", "last_modified_by")
-            .order_by("-created")
-        )
+        base_queryset = BasicScienceBox.objects.order_by("-created")
+        if self.wants_fields(*BOX_EXPERIMENT_FIELDS):
+            nested = [lookup for lookup, fields in BOX_EXPERIMENT_PREFETCH_FIELDS if self.wants_fields(*fields)]
+            base_queryset = base_queryset.prefetch_related(
+                Prefetch("experiments", queryset=Experiment.objects.prefetch_related(*nested))
+            )
+        related = [lookup for lookup, fields in BOX_RELATED_FIELDS if self.wants_fields(*fields)]
+        if related:
+            base_queryset = base_queryset.select_related(*related)
         action = getattr(self, "action", None)
 
         if action in ("list", "search"):
@@ -124,18 +157,19 @@ class BasicScienceBoxV3ViewSet(viewsets.ModelViewSet):
 
 
 @extend_schema(tags=["v3"])
-class BasicScienceBoxOptionsView(APIView):
+class BasicScienceBoxOptionsView(VersionedCacheMixin, APIView):
     """
     Provides choice metadata required to populate the basic science box form.
     """
 
     permission_classes = [IsAuthenticated]
+    cache_models = (Experiment,)
 
     @staticmethod
     def _format_choices(choices):
         return [{"value": value, "label": label} for value, label in choices]
 
-    def get(self, request):
+    def build_payload(self, request):
         experiments = Experiment.objects.filter(is_deleted=False).order_by("name")
         experiment_options = [
             {
@@ -153,16 +187,17 @@ class BasicScienceBoxOptionsView(APIView):
             "depth_options": self._format_choices(DepthChoices.choices),
             "experiments": experiment_options,
         }
-        return Response(payload)
+        return payload
 
 
 @extend_schema(tags=["v3"])
-class BasicScienceBoxFilterOptionsView(APIView):
+class BasicScienceBoxFilterOptionsView(VersionedCacheMixin, APIView):
     """
     Return dropdown-ready filter options for the boxes dashboard.
     """
 
     permission_classes = [IsAuthenticated]
+    cache_models = (Experiment, BasicScienceSampleType, TissueType)
 
     @staticmethod
     def _choice_options(choices):
@@ -172,7 +207,7 @@ class BasicScienceBoxFilterOptionsView(APIView):
     def _model_options(queryset, label_attr="name"):
         return [{"value": str(item.id), "label": getattr(item, label_attr)} for item in queryset]
 
-    def get(self, request):
+    def build_payload(self, request):
         boolean_options = [
             {"value": "true", "label": "Yes"},
             {"value": "false", "label": "No"},
@@ -180,26 +215,24 @@ class BasicScienceBoxFilterOptionsView(APIView):
         experiments = Experiment.objects.filter(is_deleted=False).order_by("name")
         sample_types = BasicScienceSampleType.objects.order_by("name")
         tissue_types = TissueType.objects.order_by("name")
-        return Response(
-            {
-                "basic_science_group": self._choice_options(BasicScienceGroupChoices.choices),
-                "box_type": self._choice_options(BasicScienceBoxTypeChoices.choices),
-                "location": self._choice_options(FreezerLocationChoices.choices),
-                "row": self._choice_options(RowChoices.choices),
-                "column": self._choice_options(ColumnChoices.choices),
-                "depth": self._choice_options(DepthChoices.choices),
-                "experiments": [
-                    {
-                        "value": str(experiment.id),
-                        "label": f"{experiment.name} ({experiment.get_basic_science_group_display()})",
-                    }
-                    for experiment in experiments
-                ],
-                "sample_types": self._model_options(sample_types),
-                "tissue_types": self._model_options(tissue_types),
-                "boolean": boolean_options,
-            }
-        )
+        return {
+            "basic_science_group": self._choice_options(BasicScienceGroupChoices.choices),
+            "box_type": self._choice_options(BasicScienceBoxTypeChoices.choices),
+            "location": self._choice_options(FreezerLocationChoices.choices),
+            "row": self._choice_options(RowChoices.choices),
+            "column": self._choice_options(ColumnChoices.choices),
+            "depth": self._choice_options(DepthChoices.choices),
+            "experiments": [
+                {
+                    "value": str(experiment.id),
+                    "label": f"{experiment.name} ({experiment.get_basic_science_group_display()})",
+                }
+                for experiment in experiments
+            ],
+            "sample_types": self._model_options(sample_types),
+            "tissue_types": self._model_options(tissue_types),
+            "boolean": boolean_options,
+        }
 
 
 @extend_schema(tags=["v3"])
@@ -239,4 +272,4 @@ class BasicScienceBoxExportView(APIView):
         queryset = BasicScienceBoxV3Filter(request.query_params, queryset=base_queryset).qs
         queryset = OrderingFilter().filter_queryset(request, queryset, self)
 
-        return export_csv(queryset, file_prefix="gtrac", file_name="basic_science_boxes")
+        return stream_csv(queryset, file_prefix="gtrac", file_name="basic_science_boxes")
@@ -0,0 +1,96 @@
+# api_v3/views/dashboard.py
+# Provides the v3 dashboard endpoint returning every headline figure for the home page in one payload.
+# Exists so the frontend pays one round trip, and the server one cached aggregate pass, for the whole dashboard.
+
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from api_v3.mixins import VersionedCacheMixin
+from api_v3.row_serializers import SampleV3RowSerializer
+from app.models import BasicScienceBox, Experiment, Sample, SampleRollup, StudyIdentifier
+from datasets.models import Dataset, DatasetAnalytics, DataSourceStatusCheck
+from datasets.utils import GIDAMPS_ANALYTICS_NAMES, get_dataset_analytics
+
+DASHBOARD_RECENT_SAMPLES = 5
+DASHBOARD_RECENT_SAMPLE_FIELDS = (
+    "id",
+    "sample_id",
+    "study_name_label",
+    "study_identifier",
+    "sample_location",
+    "sample_type_label",
+    "sample_datetime",
+    "is_used",
+)
+
+
+@extend_schema(tags=["v3"])
+class DashboardView(VersionedCacheMixin, APIView):
+    """
+    Return headline counts, GI-DAMPs analytics, data source status and the user's recent samples.
+
+    Each section is a single query (counts use filtered aggregates), and the payload is cached per user until
+    one of ``cache_models`` changes.
+    """
+
+    permission_classes = [IsAuthenticated]
+    cache_models = (
+        Sample,
+        StudyIdentifier,
+        BasicScienceBox,
+        Experiment,
+        Dataset,
+        DatasetAnalytics,
+        DataSourceStatusCheck,
+    )
+
+    def get_payload_cache_key(self):
+        # Recent samples and the dataset section depend on who is asking.
+        return f"{super().get_payload_cache_key()}:{self.request.user.pk}"
+
+    def build_payload(self, request):
+        return {
+            "samples": self.sample_counts(),
+            "study_ids": StudyIdentifier.objects.order_by().aggregate(total=Count("pk")),
+            "boxes": BasicScienceBox.objects.order_by().aggregate(
+                total=Count("pk"), active=Count("pk", filter=Q(is_used=False))
+            ),
+            "experiments": Experiment.objects.order_by().aggregate(
+                total=Count("pk", filter=Q(is_deleted=False)), deleted=Count("pk", filter=Q(is_deleted=True))
+            ),
+            "datasets": self.dataset_status() if request.user.has_perm("datasets.view_dataset") else None,
+            "gidamps": get_dataset_analytics(GIDAMPS_ANALYTICS_NAMES),
+            "recent_samples": self.recent_samples(request.user),
+        }
+
+    def sample_counts(self):
+        # Read from the analytics rollup (core.rollups) rather than counting the sample table.
+        return SampleRollup.objects.order_by().aggregate(
+            total=Sum("sample_count", default=0),
+            active=Sum("sample_count", filter=Q(is_used=False), default=0),
+            used=Sum("sample_count", filter=Q(is_used=True), default=0),
+        )
+
+    def dataset_status(self):
+        latest_check = (
+            DataSourceStatusCheck.objects.filter(data_source=OuterRef("data_source"))
+            .order_by("-checked_at", "-pk")
+            .values("pk")[:1]
+        )
+        checks = (
+            DataSourceStatusCheck.objects.filter(pk=Subquery(latest_check))
+            .order_by("data_source")
+            .values("data_source", "response_status", "checked_at")
+        )
+        return {"total": Dataset.objects.count(), "status_checks": list(checks)}
+
+    def recent_samples(self, user):
+        serializer = SampleV3RowSerializer(fields=DASHBOARD_RECENT_SAMPLE_FIELDS)
+        rows = (
+            Sample.objects.filter(last_modified_by=user.email)
+            .order_by("-last_modified")
+            .values(*serializer.columns)[:DASHBOARD_RECENT_SAMPLES]
+        )
+        return serializer.serialize(rows)
@@ -11,7 +11,10 @@ from rest_framework.decorators import action
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 
+from api_v3.mixins import ConditionalGetMixin
 from api_v3.serializers import DatasetAccessHistoryV3Serializer, DatasetListV3Serializer
+from core.snapshots import tolerates_staleness
+from core.transactions import write_transaction
 from datasets.models import DataSourceStatusCheck, Dataset, DatasetAccessHistory, DatasetAccessTypeChoices
 from datasets.permissions import CustomDjangoModelPermission
 from datasets.utils import export_json_field
@@ -19,7 +22,7 @@ from datasets.utils import export_json_field
 User = get_user_model()
 
 
-class DatasetV3ViewSet(viewsets.ReadOnlyModelViewSet):
+class DatasetV3ViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for listing dataset metadata and returning dataset JSON payloads.
     """
@@ -29,16 +32,29 @@ class DatasetV3ViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [CustomDjangoModelPermission]
     lookup_field = "name"
 
+    def get_conditional_models(self):
+        # Listings show access counts; a dataset payload depends on the dataset row alone.
+        if self.action == "retrieve":
+            return (Dataset,)
+        return (Dataset, DatasetAccessHistory)
+
+    def get_conditional_queryset(self):
+        return Dataset.objects.all()
+
+    @write_transaction
     def retrieve(self, request, *args, **kwargs):
         dataset = self.get_object()
+        # Revalidated reads are still recorded as accesses.
         DatasetAccessHistory.objects.create(
             dataset=dataset,
             user=request.user,
             access_type=DatasetAccessTypeChoices.JSON,
         )
-        return Response(dataset.json)
+        return self.conditional_get(lambda request: Response(dataset.json), request)
 
     @action(detail=True, methods=["get"], url_path="export-csv")
+    @write_transaction
+    @tolerates_staleness
     def export_csv(self, request, name=None):
         dataset = self.get_object()
         DatasetAccessHistory.objects.create(
@@ -12,6 +12,13 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from api_v3.mixins import (
+    CachedCountMixin,
+    ConditionalGetMixin,
+    HistoryMixin,
+    SparseFieldsetMixin,
+    VersionedCacheMixin,
+)
 from api_v3.serializers import (
     ExperimentCreateV3Serializer,
     ExperimentDetailV3Serializer,
@@ -20,13 +27,28 @@ from api_v3.serializers import (
 )
 from app.choices import BasicScienceGroupChoices, SpeciesChoices
 from app.filters import ExperimentFilter
-from app.models import BasicScienceSampleType, Experiment, TissueType
+from app.models import BasicScienceBox, BasicScienceSampleType, Experiment, TissueType
 from app.pagination import SamplePageNumberPagination
-from core.utils.export import export_csv
+from core.utils.export import stream_csv
+
+# Many-to-many prefetches and user joins, each paired with the list fields that read them.
+EXPERIMENT_PREFETCH_FIELDS = (
+    ("sample_types", ("sample_types", "sample_type_labels")),
+    ("tissue_types", ("tissue_types", "tissue_type_labels")),
+    ("boxes", ("boxes",)),
+)
+EXPERIMENT_RELATED_FIELDS = (
+    ("created_by", ("created_by_email",)),
+    ("last_modified_by", ("last_modified_by_email",)),
+)
 
 
 @extend_schema(tags=["v3"])
 class ExperimentV3ViewSet(
+    ConditionalGetMixin,
+    CachedCountMixin,
+    SparseFieldsetMixin,
+    HistoryMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     mixins.ListModelMixin,
@@ -46,13 +68,17 @@ class ExperimentV3ViewSet(
     ordering_fields = ["created", "date", "name", "basic_science_group", "id"]
     ordering = ["-created"]
     pagination_class = SamplePageNumberPagination
+    conditional_models = (Experiment, BasicScienceBox, BasicScienceSampleType, TissueType)
+    count_models = conditional_models
 
     def get_queryset(self):
-        base_queryset = (
-            Experiment.objects.prefetch_related("sample_types", "tissue_types", "boxes")
-            .select_related("created_by", "last_modified_by")
-            .order_by("-created")
-        )
+        prefetches = [lookup for lookup, fields in EXPERIMENT_PREFETCH_FIELDS if self.wants_fields(*fields)]
+        related = [lookup for lookup, fields in EXPERIMENT_RELATED_FIELDS if self.wants_fields(*fields)]
+        base_queryset = Experiment.objects.order_by("-created")
+        if prefetches:
+            base_queryset = base_queryset.prefetch_related(*prefetches)
+        if related:
+            base_queryset = base_queryset.select_related(*related)
         action = getattr(self, "action", None)
 
         if action in ("list", "search"):
@@ -141,16 +167,17 @@ class ExperimentExportView(APIView):
         queryset = ExperimentFilter(request.query_params, queryset=base_queryset).qs
         queryset = OrderingFilter().filter_queryset(request, queryset, self)
 
-        return export_csv(queryset, file_prefix="gtrac", file_name="experiments")
+        return stream_csv(queryset, file_prefix="gtrac", file_name="experiments")
 
 
 @extend_schema(tags=["v3"])
-class ExperimentOptionsView(APIView):
+class ExperimentOptionsView(VersionedCacheMixin, APIView):
     """
     Provides choice metadata required to populate the experiment form.
     """
 
     permission_classes = [IsAuthenticated]
+    cache_models = (BasicScienceSampleType, TissueType)
 
     @staticmethod
     def _format_choices(choices):
@@ -164,7 +191,7 @@ class ExperimentOptionsView(APIView):
             options.append({"value": str(item.id), "label": label})
         return options
 
-    def get(self, request):
+    def build_payload(self, request):
         sample_types = BasicScienceSampleType.objects.order_by("name")
         tissue_types = TissueType.objects.order_by("name")
         payload = {
@@ -173,16 +200,17 @@ class ExperimentOptionsView(APIView):
             "sample_types": self._model_options(sample_types, label_attr="label"),
             "tissue_types": self._model_options(tissue_types, label_attr="label"),
         }
-        return Response(payload)
+        return payload
 
 
 @extend_schema(tags=["v3"])
-class ExperimentFilterOptionsView(APIView):
+class ExperimentFilterOptionsView(VersionedCacheMixin, APIView):
     """
     Return dropdown-ready filter options for the experiments dashboard.
     """
 
     permission_classes = [IsAuthenticated]
+    cache_models = (BasicScienceSampleType, TissueType)
 
     @staticmethod
     def _choice_options(choices):
@@ -196,19 +224,17 @@ class ExperimentFilterOptionsView(APIView):
             options.append({"value": str(item.id), "label": label})
         return options
 
-    def get(self, request):
+    def build_payload(self, request):
         boolean_options = [
             {"value": "true", "label": "Yes"},
             {"value": "false", "label": "No"},
         ]
         sample_types = BasicScienceSampleType.objects.order_by("name")
         tissue_types = TissueType.objects.order_by("name")
-        return Response(
-            {
-                "basic_science_group": self._choice_options(BasicScienceGroupChoices.choices),
-                "species": self._choice_options(SpeciesChoices.choices),
-                "sample_types": self._model_options(sample_types, label_attr="label"),
-                "tissue_types": self._model_options(tissue_types, label_attr="label"),
-                "boolean": boolean_options,
-            }
-        )
+        return {
+            "basic_science_group": self._choice_options(BasicScienceGroupChoices.choices),
+            "species": self._choice_options(SpeciesChoices.choices),
+            "sample_types": self._model_options(sample_types, label_attr="label"),
+            "tissue_types": self._model_options(tissue_types, label_attr="label"),
+            "boolean": boolean_options,
+        }
@@ -0,0 +1,41 @@
+# api_v3/views/maintenance.py
+# Provides the staff-only v3 endpoint reporting SQLite maintenance runs and database size statistics.
+# Exists so WAL growth, free pages and table bloat recorded by dbmaintain can be watched without shell access.
+
+from drf_spectacular.utils import extend_schema
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api_v3.serializers import DatabaseMaintenanceRunV3Serializer
+from app.models import DatabaseMaintenanceRun
+
+MAINTENANCE_HISTORY_DEFAULT = 30
+MAINTENANCE_HISTORY_MAX = 365
+MAINTENANCE_HISTORY_FIELDS = ("started", "page_size", "page_count", "freelist_count", "wal_bytes")
+
+
+@extend_schema(tags=["v3"])
+class DatabaseMaintenanceView(APIView):
+    """
+    Return the latest maintenance run in full and the size figures of the last ``limit`` runs, newest first.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get("limit", MAINTENANCE_HISTORY_DEFAULT))
+        except ValueError:
+            raise ValidationError({"limit": ["Must be an integer."]})
+        limit = max(1, min(limit, MAINTENANCE_HISTORY_MAX))
+
+        runs = DatabaseMaintenanceRun.objects.order_by("-started")
+        latest = runs.first()
+        return Response(
+            {
+                "latest": DatabaseMaintenanceRunV3Serializer(latest).data if latest else None,
+                "history": list(runs.values(*MAINTENANCE_HISTORY_FIELDS)[:limit]),
+            }
+        )
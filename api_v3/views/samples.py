@@ -2,18 +2,30 @@
 # Hosts the v3 sample API endpoints used by the Next.js frontend, including list/detail and CRUD with audit stamping.
 # Exists to decouple the API surface from legacy template views while keeping feature parity for samples.
 
-from django.db.models import Q
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
 from rest_framework import mixins, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotAcceptable, NotFound, ValidationError
 from rest_framework.filters import OrderingFilter
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from api_v3.mixins import (
+    CachedCountMixin,
+    CoalescedScanUpdateMixin,
+    ConditionalGetMixin,
+    HistoryMixin,
+    SparseFieldsetMixin,
+    VersionedCacheMixin,
+)
+from api_v3.row_serializers import SampleV3RowSerializer
 from api_v3.serializers import (
     MultipleSampleV3Serializer,
+    SampleBatchScanResponseSerializer,
+    SampleBatchScanV3Serializer,
     SampleIsUsedV3Serializer,
     SampleLocationV3Serializer,
     SampleV3DetailSerializer,
@@ -32,14 +44,31 @@ from app.choices import (
     StudyNameChoices,
 )
 from app.filters import SampleV3Filter
-from app.models import Sample, StudyIdentifier
-from app.pagination import SamplePageNumberPagination
-from core.clinical import get_samples_with_clinical_data
-from core.utils.export import export_csv
+from app.models import ClinicalData, Sample, StudyIdentifier
+from app.pagination import SampleKeysetPagination, SamplePageNumberPagination
+from core.autocomplete import location_index, parse_limit, study_id_index, sublocation_index
+from core.clinical import CLINICAL_MUSIC_ONLY_FIELDS, CLINICAL_VALUE_FIELDS, get_samples_with_clinical_data
+from core.pivots import STUDY_ID_PATTERNS, sample_type_pivot
+from core.rollups import sample_analytics
+from core.search import search_samples
+from core.services.samples import SCAN_STATUSES, SampleBatchScanService
+from core.snapshots import tolerates_staleness
+from core.utils.export import render_pivot_to_csv_response, render_pivot_to_parquet_response, stream_csv
+
+# List fields read from the sample's study identifier (select_related) and from the clinical annotations.
+SAMPLE_STUDY_IDENTIFIER_FIELDS = (
+    "study_identifier",
+    "study_group_label",
+    "age",
+    "sex_label",
+    "study_center_label",
+    "genotype_data_available",
+)
+SAMPLE_CLINICAL_FIELDS = CLINICAL_VALUE_FIELDS + CLINICAL_MUSIC_ONLY_FIELDS
 
 
 @extend_schema(tags=["v3"])
-class SampleV3ViewSet(viewsets.ModelViewSet):
+class SampleV3ViewSet(ConditionalGetMixin, CachedCountMixin, SparseFieldsetMixin, HistoryMixin, viewsets.ModelViewSet):
     """
     API for the v3 frontend that exposes key sample details.
     """
@@ -62,9 +91,31 @@ class SampleV3ViewSet(viewsets.ModelViewSet):
     ]
     ordering = ["-sample_datetime"]
     pagination_class = SamplePageNumberPagination
+    keyset_pagination_class = SampleKeysetPagination
+    conditional_models = (Sample, StudyIdentifier, ClinicalData)
+    count_models = conditional_models
 
-    def get_queryset(self):
-        base_queryset = Sample.objects.select_related("study_id").order_by("-sample_datetime")
+    def _use_keyset_pagination(self) -> bool:
+        """
+        Keyset pagination is opt-in via ``pagination=cursor`` (or any request already carrying a cursor).
+        """
+        request = getattr(self, "request", None)
+        if request is None:
+            return False
+        params = request.query_params
+        return params.get("pagination") == "cursor" or "cursor" in params
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator") and self._use_keyset_pagination():
+            self._paginator = self.keyset_pagination_class()
+        return super().paginator
+
+    def get_base_queryset(self):
+        """
+        Returns the sample scope for the current action without the clinical annotations or joins.
+        """
+        base_queryset = Sample.objects.order_by("-sample_datetime")
         action = getattr(self, "action", None)
 
         if action in ("list", "search"):
@@ -77,7 +128,41 @@ class SampleV3ViewSet(viewsets.ModelViewSet):
             if not include_used and not has_is_used_filter:
                 base_queryset = base_queryset.filter(is_used=False)
 
-        return get_samples_with_clinical_data(base_queryset)
+        return base_queryset
+
+    def get_queryset(self):
+        queryset = self.get_base_queryset()
+        if self.wants_fields(*SAMPLE_STUDY_IDENTIFIER_FIELDS):
+            queryset = queryset.select_related("study_id")
+        if self.wants_fields(*SAMPLE_CLINICAL_FIELDS):
+            queryset = get_samples_with_clinical_data(queryset)
+        return queryset
+
+    def get_conditional_queryset(self):
+        return self.get_base_queryset()
+
+    def get_count_queryset(self):
+        return self.get_base_queryset()
+
+    def get_row_serializer(self):
+        return SampleV3RowSerializer(fields=self.get_sparse_fields())
+
+    def rows_response(self, queryset, count_queryset=None):
+        """
+        Paginate and serialize ``queryset`` as values() rows; the fast path behind list and search.
+        """
+        row_serializer = self.get_row_serializer()
+        rows = queryset.values(*row_serializer.columns)
+        page = self.paginate_queryset(rows, count_queryset=count_queryset)
+        if page is not None:
+            return self.get_paginated_response(row_serializer.serialize(page))
+        return Response(row_serializer.serialize(rows))
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_get(self._list_rows, request, *args, **kwargs)
+
+    def _list_rows(self, request, *args, **kwargs):
+        return self.rows_response(self.filter_queryset(self.get_queryset()))
 
     def get_serializer_class(self):
         if self.action == "retrieve":
@@ -116,28 +201,17 @@ class SampleV3ViewSet(viewsets.ModelViewSet):
     def search(self, request):
         query_string = request.query_params.get("query", "").strip()
         queryset = self.get_queryset()
+        count_queryset = self.get_count_queryset()
 
         if query_string:
-            queryset = queryset.filter(
-                Q(sample_id__icontains=query_string)
-                | Q(study_id__name__icontains=query_string)
-                | Q(sample_location__icontains=query_string)
-                | Q(sample_sublocation__icontains=query_string)
-                | Q(sample_type__icontains=query_string)
-                | Q(sample_comments__icontains=query_string)
-            )
-
-        queryset = self.filter_queryset(queryset)
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+            queryset = search_samples(queryset, query_string)
+            count_queryset = search_samples(count_queryset, query_string)
 
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        return self.rows_response(self.filter_queryset(queryset), self.filter_queryset(count_queryset))
 
 
 @extend_schema(tags=["v3"])
+@tolerates_staleness
 class SampleExportView(APIView):
     """
     Export filtered samples as CSV to avoid paginated client aggregation.
@@ -166,23 +240,16 @@ class SampleExportView(APIView):
         queryset = get_samples_with_clinical_data(base_queryset)
         query_string = request.query_params.get("query", "").strip()
         if query_string:
-            queryset = queryset.filter(
-                Q(sample_id__icontains=query_string)
-                | Q(study_id__name__icontains=query_string)
-                | Q(sample_location__icontains=query_string)
-                | Q(sample_sublocation__icontains=query_string)
-                | Q(sample_type__icontains=query_string)
-                | Q(sample_comments__icontains=query_string)
-            )
+            queryset = search_samples(queryset, query_string)
 
         queryset = SampleV3Filter(request.query_params, queryset=queryset).qs
         queryset = OrderingFilter().filter_queryset(request, queryset, self)
 
-        return export_csv(queryset, file_prefix="samples", file_name="export")
+        return stream_csv(queryset, file_prefix="samples", file_name="export")
 
 
 @extend_schema(tags=["v3"])
-class SampleLocationV3ViewSet(mixins.UpdateModelMixin, viewsets.GenericViewSet):
+class SampleLocationV3ViewSet(CoalescedScanUpdateMixin, mixins.UpdateModelMixin, viewsets.GenericViewSet):
     """
     Update sample locations via QR scan workflows.
     """
@@ -210,7 +277,7 @@ class SampleLocationV3ViewSet(mixins.UpdateModelMixin, viewsets.GenericViewSet):
 
 
 @extend_schema(tags=["v3"])
-class SampleIsUsedV3ViewSet(mixins.UpdateModelMixin, viewsets.GenericViewSet):
+class SampleIsUsedV3ViewSet(CoalescedScanUpdateMixin, mixins.UpdateModelMixin, viewsets.GenericViewSet):
     """
     Mark samples as used via QR scan workflows.
     """
@@ -237,10 +304,47 @@ class SampleIsUsedV3ViewSet(mixins.UpdateModelMixin, viewsets.GenericViewSet):
         serializer.save(last_modified_by=self._current_user_identifier())
 
 
+class SampleBatchScanView(APIView):
+    """
+    Apply one location or used-state change to a batch of scanned samples in a single request.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def _current_user_identifier(self) -> str:
+        user = getattr(self.request, "user", None)
+        if not user:
+            return ""
+        email = getattr(user, "email", "")
+        if email:
+            return email
+        if hasattr(user, "get_username"):
+            username = user.get_username()
+            if username:
+                return username
+        return str(user)
+
+    @extend_schema(tags=["v3"], request=SampleBatchScanV3Serializer, responses=SampleBatchScanResponseSerializer)
+    def post(self, request):
+        serializer = SampleBatchScanV3Serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        results = SampleBatchScanService.apply(
+            serializer.validated_data["sample_ids"],
+            serializer.get_changes(),
+            user=request.user,
+            user_identifier=self._current_user_identifier(),
+        )
+        counts = dict.fromkeys(SCAN_STATUSES, 0)
+        for result in results:
+            counts[result["status"]] += 1
+        return Response({**counts, "results": results})
+
+
 @extend_schema(tags=["v3"])
 class MultipleSampleV3ViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
     """
-    Create samples via the bulk QR scan workflow.
+    Create samples via the bulk QR scan workflow, one object or a list of objects per request.
     """
 
     queryset = Sample.objects.all()
@@ -260,6 +364,12 @@ class MultipleSampleV3ViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
                 return username
         return str(user)
 
+    def get_serializer(self, *args, **kwargs):
+        # A list payload registers a whole batch of aliquots in one request.
+        if isinstance(kwargs.get("data"), list):
+            kwargs["many"] = True
+        return super().get_serializer(*args, **kwargs)
+
     def perform_create(self, serializer):
         user_identifier = self._current_user_identifier()
         serializer.save(created_by=user_identifier, last_modified_by=user_identifier)
@@ -274,17 +384,8 @@ class SampleLocationAutocompleteView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        term = request.query_params.get("term")
-        if term:
-            queryset = (
-                Sample.objects.filter(sample_location__icontains=term)
-                .order_by()
-                .values_list("sample_location", flat=True)
-                .distinct()
-            )
-        else:
-            queryset = Sample.objects.all().order_by().values_list("sample_location", flat=True).distinct()
-        return Response([value for value in queryset if value])
+        limit = parse_limit(request.query_params.get("limit"))
+        return Response(location_index.search(request.query_params.get("term"), limit))
 
 
 @extend_schema(tags=["v3"])
@@ -296,17 +397,8 @@ class SampleSublocationAutocompleteView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        term = request.query_params.get("term")
-        if term:
-            queryset = (
-                Sample.objects.filter(sample_sublocation__icontains=term)
-                .order_by()
-                .values_list("sample_sublocation", flat=True)
-                .distinct()
-            )
-        else:
-            queryset = Sample.objects.all().order_by().values_list("sample_sublocation", flat=True).distinct()
-        return Response([value for value in queryset if value])
+        limit = parse_limit(request.query_params.get("limit"))
+        return Response(sublocation_index.search(request.query_params.get("term"), limit))
 
 
 @extend_schema(tags=["v3"])
@@ -318,42 +410,87 @@ class StudyIdAutocompleteView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        term = request.query_params.get("term")
-        if term:
-            queryset = StudyIdentifier.objects.filter(name__icontains=term).values_list("name", flat=True)
-        else:
-            queryset = StudyIdentifier.objects.all().values_list("name", flat=True)
-        return Response([value for value in queryset if value])
+        limit = parse_limit(request.query_params.get("limit"))
+        return Response(study_id_index.search(request.query_params.get("term"), limit))
 
 
 @extend_schema(tags=["v3"])
-class SampleFilterOptionsView(APIView):
+class SampleFilterOptionsView(VersionedCacheMixin, APIView):
     """
     Return dropdown-ready filter options for the samples dashboard.
     """
 
     permission_classes = [IsAuthenticated]
+    # Built from code-level choices only, so it can only change with a deploy.
+    cache_max_age = 24 * 60 * 60
 
     @staticmethod
     def _choice_options(choices):
         return [{"value": value, "label": label} for value, label in choices]
 
-    def get(self, request):
+    def build_payload(self, request):
         boolean_options = [
             {"value": "true", "label": "Yes"},
             {"value": "false", "label": "No"},
         ]
-        return Response(
-            {
-                "study_name": self._choice_options(StudyNameChoices.choices),
-                "sample_type": self._choice_options(SampleTypeChoices.choices),
-                "study_group": self._choice_options(StudyGroupChoices.choices),
-                "study_center": self._choice_options(StudyCenterChoices.choices),
-                "sex": self._choice_options(SexChoices.choices),
-                "music_timepoint": self._choice_options(MusicTimepointChoices.choices),
-                "marvel_timepoint": self._choice_options(MarvelTimepointChoices.choices),
-                "biopsy_location": self._choice_options(BiopsyLocationChoices.choices),
-                "biopsy_inflamed_status": self._choice_options(BiopsyInflamedStatusChoices.choices),
-                "boolean": boolean_options,
-            }
-        )
+        return {
+            "study_name": self._choice_options(StudyNameChoices.choices),
+            "sample_type": self._choice_options(SampleTypeChoices.choices),
+            "study_group": self._choice_options(StudyGroupChoices.choices),
+            "study_center": self._choice_options(StudyCenterChoices.choices),
+            "sex": self._choice_options(SexChoices.choices),
+            "music_timepoint": self._choice_options(MusicTimepointChoices.choices),
+            "marvel_timepoint": self._choice_options(MarvelTimepointChoices.choices),
+            "biopsy_location": self._choice_options(BiopsyLocationChoices.choices),
+            "biopsy_inflamed_status": self._choice_options(BiopsyInflamedStatusChoices.choices),
+            "boolean": boolean_options,
+        }
+
+
+@extend_schema(tags=["v3"])
+class SampleAnalyticsView(VersionedCacheMixin, APIView):
+    """
+    Return sample totals and breakdowns by month, type, study and location from the analytics rollup.
+    """
+
+    permission_classes = [IsAuthenticated]
+    cache_models = (Sample,)
+
+    def get_payload_cache_key(self):
+        # The by-month window moves on at each month boundary even when no sample changes.
+        return f"{super().get_payload_cache_key()}:{timezone.now():%Y-%m}"
+
+    def build_payload(self, request):
+        return sample_analytics()
+
+
+@extend_schema(tags=["v3"])
+@tolerates_staleness
+class SampleTypePivotView(APIView):
+    """
+    Return a study's sample type pivot (study ID and sample date rows, sample type columns, sample ID cells)
+    from the materialized cells maintained by core.pivots.
+
+    ``output`` picks the representation: ``json`` (default, lists of sample IDs), ``csv`` (IDs joined by commas,
+    as on the analytics page) or ``parquet`` (list columns; needs pyarrow).
+    """
+
+    permission_classes = [IsAuthenticated]
+    outputs = ("json", "csv", "parquet")
+
+    def get(self, request, study_name):
+        if study_name not in STUDY_ID_PATTERNS:
+            raise NotFound(f"No sample type pivot for study '{study_name}'.")
+        output = request.query_params.get("output", "json").lower()
+        if output not in self.outputs:
+            raise ValidationError({"output": [f"Choose one of: {', '.join(self.outputs)}."]})
+
+        sample_types, rows = sample_type_pivot(study_name)
+        if output == "csv":
+            return render_pivot_to_csv_response(sample_types, rows, study_name=study_name)
+        if output == "parquet":
+            try:
+                return render_pivot_to_parquet_response(sample_types, rows, study_name=study_name)
+            except ImportError:
+                raise NotAcceptable("Parquet output requires pyarrow to be installed.")
+        return Response({"study_name": study_name, "sample_types": sample_types, "results": rows})
@@ -10,6 +10,7 @@ from rest_framework.filters import OrderingFilter
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from api_v3.mixins import CachedCountMixin, ConditionalGetMixin, HistoryMixin, SparseFieldsetMixin
 from api_v3.serializers import (
     StudyIdentifierDetailV3Serializer,
     StudyIdentifierFileSummaryV3Serializer,
@@ -22,6 +23,10 @@ from app.pagination import StudyIdPageNumberPagination
 
 @extend_schema(tags=["v3"])
 class StudyIdentifierV3ViewSet(
+    ConditionalGetMixin,
+    CachedCountMixin,
+    SparseFieldsetMixin,
+    HistoryMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -47,16 +52,23 @@ class StudyIdentifierV3ViewSet(
     ]
     ordering = ["name"]
     pagination_class = StudyIdPageNumberPagination
+    conditional_models = (StudyIdentifier, Sample, DataStore)
+    count_models = (StudyIdentifier,)
 
     def get_queryset(self):
-        return (
-            StudyIdentifier.objects.annotate(
-                sample_count=Count("samples", distinct=True),
-                file_count=Count("files", distinct=True),
-            )
-            .order_by("name")
-            .all()
-        )
+        annotations = {}
+        if self.wants_fields("sample_count"):
+            annotations["sample_count"] = Count("samples", distinct=True)
+        if self.wants_fields("file_count"):
+            annotations["file_count"] = Count("files", distinct=True)
+        return StudyIdentifier.objects.annotate(**annotations).order_by("name").all()
+
+    def get_conditional_queryset(self):
+        # The sample and file counts are covered by the Sample and DataStore data versions.
+        return StudyIdentifier.objects.all()
+
+    def get_count_queryset(self):
+        return StudyIdentifier.objects.all()
 
     def destroy(self, request, *args, **kwargs):
         user = getattr(request, "user", None)
@@ -74,12 +86,15 @@ class StudyIdentifierV3ViewSet(
     def search(self, request):
         query_string = request.query_params.get("query", "").strip()
         queryset = self.get_queryset()
+        count_queryset = self.get_count_queryset()
 
         if query_string:
-            queryset = queryset.filter(Q(name__icontains=query_string) | Q(study_name__icontains=query_string))
+            matches = Q(name__icontains=query_string) | Q(study_name__icontains=query_string)
+            queryset = queryset.filter(matches)
+            count_queryset = count_queryset.filter(matches)
 
         queryset = self.filter_queryset(queryset)
-        page = self.paginate_queryset(queryset)
+        page = self.paginate_queryset(queryset, count_queryset=self.filter_queryset(count_queryset))
         if page is not None:
             serializer = self.get_serializer(page, many=True)
             return self.get_paginated_response(serializer.data)
@@ -22,6 +22,7 @@ from rest_framework.views import APIView
 
 from api_v3.serializers import SampleV3Serializer
 from app.models import Sample
+from core.transactions import read_only_transaction
 from users.choices import JobTitleChoices, PrimaryOrganisationChoices
 from users.utils import generate_random_password, send_welcome_email
 
@@ -89,6 +90,7 @@ class PasswordResetRequestView(APIView):
     throttle_classes = [UserRateThrottle, AnonRateThrottle]
 
     @extend_schema(tags=["v3"], description="Send password reset email for the supplied address.")
+    @read_only_transaction
     def post(self, request):
         serializer = PasswordResetRequestSerializer(data=request.data)
         if not serializer.is_valid():
@@ -1,5 +1,4 @@
 import django_filters
-from django.db import models
 from django_filters.widgets import RangeWidget
 
 from app.choices import (
@@ -56,41 +55,12 @@ class SampleFilter(django_filters.FilterSet):
     )
 
     def filter_endoscopic_mucosal_healing_at_3_6_months(self, queryset, name, value):
-        # GI-DAMPs: by study_id + sample_date
-        gidamps = queryset.filter(
-            study_name__iexact="gidamps",
-            study_id__clinical_data__sample_date=models.F("sample_datetime__date"),
-            study_id__clinical_data__endoscopic_mucosal_healing_at_3_6_months=value,
-        )
-        # MUSIC: by study_id + music_timepoint
-        music = queryset.filter(
-            study_name__in=["music", "mini_music"],
-            study_id__clinical_data__music_timepoint=models.F("music_timepoint"),
-            study_id__clinical_data__endoscopic_mucosal_healing_at_3_6_months=value,
-        )
-        # Others: fallback to study_id + sample_date
-        others = queryset.exclude(study_name__in=["gidamps", "music", "mini_music"]).filter(
-            study_id__clinical_data__sample_date=models.F("sample_datetime__date"),
-            study_id__clinical_data__endoscopic_mucosal_healing_at_3_6_months=value,
-        )
-        return gidamps | music | others
+        # Uses the persisted study-specific clinical data link (see core.clinical)
+        return queryset.filter(clinical_data__endoscopic_mucosal_healing_at_3_6_months=value)
 
     def filter_endoscopic_mucosal_healing_at_12_months(self, queryset, name, value):
-        gidamps = queryset.filter(
-            study_name__iexact="gidamps",
-            study_id__clinical_data__sample_date=models.F("sample_datetime__date"),
-            study_id__clinical_data__endoscopic_mucosal_healing_at_12_months=value,
-        )
-        music = queryset.filter(
-            study_name__in=["music", "mini_music"],
-            study_id__clinical_data__music_timepoint=models.F("music_timepoint"),
-            study_id__clinical_data__endoscopic_mucosal_healing_at_12_months=value,
-        )
-        others = queryset.exclude(study_name__in=["gidamps", "music", "mini_music"]).filter(
-            study_id__clinical_data__sample_date=models.F("sample_datetime__date"),
-            study_id__clinical_data__endoscopic_mucosal_healing_at_12_months=value,
-        )
-        return gidamps | music | others
+        # Uses the persisted study-specific clinical data link (see core.clinical)
+        return queryset.filter(clinical_data__endoscopic_mucosal_healing_at_12_months=value)
 
     class Meta:
         model = Sample
@@ -159,38 +129,12 @@ class SampleV3Filter(django_filters.FilterSet):
     )
 
     def filter_endoscopic_mucosal_healing_at_3_6_months(self, queryset, name, value):
-        gidamps = queryset.filter(
-            study_name__iexact="gidamps",
-            study_id__clinical_data__sample_date=models.F("sample_datetime__date"),
-            study_id__clinical_data__endoscopic_mucosal_healing_at_3_6_months=value,
-        )
-        music = queryset.filter(
-            study_name__in=["music", "mini_music"],
-            study_id__clinical_data__music_timepoint=models.F("music_timepoint"),
-            study_id__clinical_data__endoscopic_mucosal_healing_at_3_6_months=value,
-        )
-        others = queryset.exclude(study_name__in=["gidamps", "music", "mini_music"]).filter(
-            study_id__clinical_data__sample_date=models.F("sample_datetime__date"),
-            study_id__clinical_data__endoscopic_mucosal_healing_at_3_6_months=value,
-        )
-        return gidamps | music | others
+        # Uses the persisted study-specific clinical data link (see core.clinical)
+        return queryset.filter(clinical_data__endoscopic_mucosal_healing_at_3_6_months=value)
 
     def filter_endoscopic_mucosal_healing_at_12_months(self, queryset, name, value):
-        gidamps = queryset.filter(
-            study_name__iexact="gidamps",
-            study_id__clinical_data__sample_date=models.F("sample_datetime__date"),
-            study_id__clinical_data__endoscopic_mucosal_healing_at_12_months=value,
-        )
-        music = queryset.filter(
-            study_name__in=["music", "mini_music"],
-            study_id__clinical_data__music_timepoint=models.F("music_timepoint"),
-            study_id__clinical_data__endoscopic_mucosal_healing_at_12_months=value,
-        )
-        others = queryset.exclude(study_name__in=["gidamps", "music", "mini_music"]).filter(
-            study_id__clinical_data__sample_date=models.F("sample_datetime__date"),
-            study_id__clinical_data__endoscopic_mucosal_healing_at_12_months=value,
-        )
-        return gidamps | music | others
+        # Uses the persisted study-specific clinical data link (see core.clinical)
+        return queryset.filter(clinical_data__endoscopic_mucosal_healing_at_12_months=value)
 
     class Meta:
         model = Sample
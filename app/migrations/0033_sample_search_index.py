@@ -0,0 +1,41 @@
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    from core.search import SEARCH_COLUMNS, SEARCH_TABLE, create_search_index
+
+    if not create_search_index(schema_editor.connection):
+        return
+    Sample = apps.get_model("app", "Sample")
+    rows = Sample.objects.values_list(
+        "pk",
+        "sample_id",
+        "study_id__name",
+        "sample_location",
+        "sample_sublocation",
+        "sample_type",
+        "sample_comments",
+    )
+    placeholders = ", ".join(["%s"] * (len(SEARCH_COLUMNS) + 1))
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) VALUES ({placeholders})",
+            [[pk, *[value or "" for value in values]] for pk, *values in rows.iterator(chunk_size=2000)],
+        )
+
+
+def drop_index(apps, schema_editor):
+    from core.search import drop_search_index
+
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("app", "0032_basicsciencebox_basic_science_group_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
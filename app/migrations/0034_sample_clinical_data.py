@@ -0,0 +1,27 @@
+# Generated by Django 5.2.9 on 2026-10-17 21:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_clinical_data_links(apps, schema_editor):
+    from core.clinical import link_samples_to_clinical_data
+
+    Sample = apps.get_model('app', 'Sample')
+    link_samples_to_clinical_data(Sample.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0033_sample_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sample',
+            name='clinical_data',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='samples', to='app.clinicaldata'),
+        ),
+        migrations.RunPython(backfill_clinical_data_links, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-17 21:51
+
+from django.db import migrations, models
+
+
+def build_sample_rollups(apps, schema_editor):
+    from core.rollups import rebuild_sample_rollups
+
+    rebuild_sample_rollups(apps.get_model('app', 'Sample'), apps.get_model('app', 'SampleRollup'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0034_sample_clinical_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SampleRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('study_name', models.CharField(choices=[('gidamps', 'GI-DAMPs'), ('music', 'MUSIC'), ('mini_music', 'Mini-MUSIC'), ('marvel', 'MARVEL'), ('fate_cd', 'FATE-CD'), ('none', 'None')], max_length=200)),
+                ('sample_type', models.CharField(choices=[('standard_edta', 'Standard EDTA tube'), ('edta_plasma', 'EDTA plasma child aliquot'), ('cfdna_tube', 'PaxGene cfDNA tube'), ('cfdna_plasma', 'PaxGene cfDNA plasma'), ('cfdna_extracted', 'Extracted cfDNA'), ('paxgene_rna', 'PaxGene RNA tube'), ('rna_plasma', 'PaxGene RNA child aliquot'), ('standard_gel', 'Standard gel tube'), ('serum', 'Serum'), ('biopsy_formalin', 'Formalin biopsy'), ('biopsy_rnalater', 'RNAlater biopsy'), ('paraffin_block', 'Paraffin block'), ('stool_standard', 'Standard stool'), ('stool_calprotectin', 'Calprotectin'), ('stool_qfit', 'qFIT'), ('stool_omnigut', 'OmniGut'), ('stool_supernatant', 'Stool supernatant'), ('saliva', 'Saliva'), ('other', 'Other - please specify in comments')], max_length=200)),
+                ('sample_location', models.CharField(max_length=200)),
+                ('is_used', models.BooleanField()),
+                ('sample_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('month', 'study_name', 'sample_type', 'sample_location', 'is_used'), name='unique_sample_rollup_bucket')],
+            },
+        ),
+        migrations.RunPython(build_sample_rollups, migrations.RunPython.noop),
+    ]
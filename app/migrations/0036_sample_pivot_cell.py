@@ -0,0 +1,35 @@
+# Generated by Django 5.2.9 on 2026-10-17 22:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_sample_pivot(apps, schema_editor):
+    from core.pivots import rebuild_sample_pivot
+
+    rebuild_sample_pivot(apps.get_model('app', 'Sample'), apps.get_model('app', 'SamplePivotCell'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0035_sample_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SamplePivotCell',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('study_name', models.CharField(choices=[('gidamps', 'GI-DAMPs'), ('music', 'MUSIC'), ('mini_music', 'Mini-MUSIC'), ('marvel', 'MARVEL'), ('fate_cd', 'FATE-CD'), ('none', 'None')], max_length=200)),
+                ('sample_date', models.DateField()),
+                ('sample_type', models.CharField(choices=[('standard_edta', 'Standard EDTA tube'), ('edta_plasma', 'EDTA plasma child aliquot'), ('cfdna_tube', 'PaxGene cfDNA tube'), ('cfdna_plasma', 'PaxGene cfDNA plasma'), ('cfdna_extracted', 'Extracted cfDNA'), ('paxgene_rna', 'PaxGene RNA tube'), ('rna_plasma', 'PaxGene RNA child aliquot'), ('standard_gel', 'Standard gel tube'), ('serum', 'Serum'), ('biopsy_formalin', 'Formalin biopsy'), ('biopsy_rnalater', 'RNAlater biopsy'), ('paraffin_block', 'Paraffin block'), ('stool_standard', 'Standard stool'), ('stool_calprotectin', 'Calprotectin'), ('stool_qfit', 'qFIT'), ('stool_omnigut', 'OmniGut'), ('stool_supernatant', 'Stool supernatant'), ('saliva', 'Saliva'), ('other', 'Other - please specify in comments')], max_length=200)),
+                ('sample_ids', models.JSONField(default=list)),
+                ('study_identifier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pivot_cells', to='app.studyidentifier')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('study_name', 'study_identifier', 'sample_date', 'sample_type'), name='unique_sample_pivot_cell')],
+            },
+        ),
+        migrations.RunPython(build_sample_pivot, migrations.RunPython.noop),
+    ]
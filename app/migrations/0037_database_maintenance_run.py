@@ -0,0 +1,30 @@
+# Generated by Django 5.2.9 on 2026-10-17 22:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0036_sample_pivot_cell'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatabaseMaintenanceRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started', models.DateTimeField(db_index=True)),
+                ('duration', models.FloatField(help_text='Seconds the run took.')),
+                ('steps', models.JSONField(default=list, help_text='Name, status, seconds and details of every step run.')),
+                ('page_size', models.IntegerField(blank=True, null=True)),
+                ('page_count', models.BigIntegerField(blank=True, null=True)),
+                ('freelist_count', models.BigIntegerField(blank=True, null=True)),
+                ('wal_bytes', models.BigIntegerField(blank=True, null=True)),
+                ('tables', models.JSONField(default=list, help_text='Row and byte estimates per table, largest first.')),
+            ],
+            options={
+                'get_latest_by': 'started',
+            },
+        ),
+    ]
@@ -9,15 +9,20 @@ from .clinical import (
     ClinicalData,
     DataStore,
     Sample,
+    SamplePivotCell,
+    SampleRollup,
     StudyIdentifier,
     file_generate_name,
     file_upload_path,
 )
+from .maintenance import DatabaseMaintenanceRun
 
 __all__ = [
     # Clinical models
     "StudyIdentifier",
     "Sample",
+    "SamplePivotCell",
+    "SampleRollup",
     "DataStore",
     "ClinicalData",
     "file_upload_path",
@@ -27,4 +32,6 @@ __all__ = [
     "BasicScienceSampleType",
     "TissueType",
     "BasicScienceBox",
+    # Maintenance models
+    "DatabaseMaintenanceRun",
 ]
@@ -97,7 +97,17 @@ class Sample(models.Model):
     last_modified = models.DateTimeField(auto_now=True)
     last_modified_by = models.CharField(max_length=200)
 
-    history = HistoricalRecords()
+    # Denormalised link to the matching clinical record, maintained by core.clinical (never edited by hand).
+    clinical_data = models.ForeignKey(
+        "ClinicalData",
+        on_delete=models.SET_NULL,
+        related_name="samples",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+
+    history = HistoricalRecords(excluded_fields=["clinical_data"])
 
     def clean(self):
         self.sample_id = self.sample_id.upper()
@@ -112,6 +122,59 @@ class Sample(models.Model):
         ordering = ["-created"]
 
 
+class SampleRollup(models.Model):
+    """
+    Sample counts per (month, study, type, location, used) bucket, maintained incrementally by core.rollups.
+
+    Analytics read these buckets instead of scanning the sample table; ``rebuild_sample_rollups`` recomputes them.
+    """
+
+    month = models.DateField()
+    study_name = models.CharField(max_length=200, choices=StudyNameChoices.choices)
+    sample_type = models.CharField(max_length=200, choices=SampleTypeChoices.choices)
+    sample_location = models.CharField(max_length=200)
+    is_used = models.BooleanField()
+    sample_count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.study_name} {self.sample_type} {self.sample_location}: {self.sample_count}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["month", "study_name", "sample_type", "sample_location", "is_used"],
+                name="unique_sample_rollup_bucket",
+            ),
+        ]
+
+
+class SamplePivotCell(models.Model):
+    """
+    Sample IDs per (study, study ID, sample date, sample type) cell of the study overview pivot, maintained
+    incrementally by core.pivots.
+
+    The overview downloads read these cells instead of pivoting every sample; ``rebuild_sample_pivot`` recomputes
+    them.
+    """
+
+    study_name = models.CharField(max_length=200, choices=StudyNameChoices.choices)
+    study_identifier = models.ForeignKey(StudyIdentifier, on_delete=models.CASCADE, related_name="pivot_cells")
+    sample_date = models.DateField()
+    sample_type = models.CharField(max_length=200, choices=SampleTypeChoices.choices)
+    sample_ids = models.JSONField(default=list)
+
+    def __str__(self):
+        return f"{self.study_name} {self.study_identifier_id} {self.sample_date} {self.sample_type}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["study_name", "study_identifier", "sample_date", "sample_type"],
+                name="unique_sample_pivot_cell",
+            ),
+        ]
+
+
 def file_upload_path(instance, filename):
     """
     Returns the path for Azure uploads
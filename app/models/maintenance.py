@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class DatabaseMaintenanceRun(models.Model):
+    """
+    One run of the SQLite maintenance steps (core.maintenance) and the database size statistics recorded after it.
+
+    Kept as a history so WAL growth, free pages and table sizes can be followed over time.
+    """
+
+    started = models.DateTimeField(db_index=True)
+    duration = models.FloatField(help_text="Seconds the run took.")
+    steps = models.JSONField(default=list, help_text="Name, status, seconds and details of every step run.")
+    page_size = models.IntegerField(null=True, blank=True)
+    page_count = models.BigIntegerField(null=True, blank=True)
+    freelist_count = models.BigIntegerField(null=True, blank=True)
+    wal_bytes = models.BigIntegerField(null=True, blank=True)
+    tables = models.JSONField(default=list, help_text="Row and byte estimates per table, largest first.")
+
+    def __str__(self):
+        return f"Database maintenance at {self.started:%Y-%m-%d %H:%M:%S}"
+
+    class Meta:
+        get_latest_by = "started"
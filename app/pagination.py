@@ -2,11 +2,42 @@
 # Defines DRF pagination classes tailored for sample endpoints consumed by the Next.js frontend.
 # Ensures API responses stay capped at an agreed page size so the frontend can page predictably.
 
+import base64
+import binascii
+import datetime
+import json
+from collections import OrderedDict
+
 from django.conf import settings
-from rest_framework.pagination import PageNumberPagination
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from core.counts import CachedCountPaginator, cached_count
+
 
+class CachedCountPageNumberPagination(PageNumberPagination):
+    """
+    Page-number pagination whose total comes from the count cache (core.counts) instead of a COUNT per request.
 
-class SamplePageNumberPagination(PageNumberPagination):
+    Views may set ``count_queryset`` (an un-annotated queryset with the same rows) and ``count_models`` (every
+    model its filters read) before paginating; see ``api_v3.mixins.CachedCountMixin``.
+    """
+
+    count_queryset = None
+    count_models = ()
+
+    def django_paginator_class(self, object_list, per_page):
+        return CachedCountPaginator(
+            object_list, per_page, count_queryset=self.count_queryset, count_models=self.count_models
+        )
+
+
+class SamplePageNumberPagination(CachedCountPageNumberPagination):
     """
     Page-number pagination limited to the configured sample page size.
     """
@@ -16,7 +47,7 @@ class SamplePageNumberPagination(PageNumberPagination):
     max_page_size = page_size
 
 
-class StudyIdPageNumberPagination(PageNumberPagination):
+class StudyIdPageNumberPagination(CachedCountPageNumberPagination):
     """
     Page-number pagination limited to the configured study ID page size.
     """
@@ -24,3 +55,218 @@ class StudyIdPageNumberPagination(PageNumberPagination):
     page_size = getattr(settings, "STUDY_ID_PAGINATION_SIZE", 20)
     page_size_query_param = "page_size"
     max_page_size = page_size
+
+
+class SampleKeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination ordered by one of the view's ordering fields with the primary key as the tie-breaker.
+
+    Each page is fetched with a ``WHERE (key, pk) < (last_key, last_pk)`` seek rather than an OFFSET scan,
+    so deep pages cost the same as the first one. Counts are only computed when ``include_count=true``
+    and come from the count cache.
+    """
+
+    page_size = getattr(settings, "SAMPLE_PAGINATION_SIZE", 50)
+    page_size_query_param = "page_size"
+    max_page_size = page_size
+    cursor_query_param = "cursor"
+    count_query_param = "include_count"
+    ordering_param = "ordering"
+    invalid_cursor_message = "Invalid cursor"
+    key_alias = "_keyset_key"
+    count_queryset = None
+    count_models = ()
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering_field, self.descending = self.get_ordering(request, view)
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) == "true":
+            count_queryset = self.count_queryset if self.count_queryset is not None else queryset
+            self.count = cached_count(count_queryset, self.count_models)
+        self.key_field, self.key_coalesced = self._key_field(queryset.model)
+        queryset = queryset.annotate(**{self.key_alias: self._key_expression()})
+        self.pk_name = queryset.model._meta.pk.attname
+
+        position = self.decode_cursor(request)
+        reverse = bool(position and position["reverse"])
+        # Walking backwards flips both the comparison and the ordering; the page is reversed again below.
+        descending = self.descending != reverse
+        direction = "-" if descending else ""
+        queryset = queryset.order_by(f"{direction}{self.key_alias}", f"{direction}pk")
+        if position is not None:
+            lookup = "lt" if descending else "gt"
+            queryset = queryset.filter(
+                models.Q(**{f"{self.key_alias}__{lookup}": position["key"]})
+                | models.Q(**{self.key_alias: position["key"], f"pk__{lookup}": position["id"]})
+            )
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def get_ordering(self, request, view):
+        """
+        Return the primary ordering field and direction, restricted to the view's ``ordering_fields``.
+        """
+        allowed = set(getattr(view, "ordering_fields", None) or [])
+        default_ordering = list(getattr(view, "ordering", None) or ["-id"])
+        terms = [term.strip() for term in request.query_params.get(self.ordering_param, "").split(",")]
+        terms = [term for term in terms if term and term.lstrip("-") in allowed]
+        term = terms[0] if terms else default_ordering[0]
+        return term.lstrip("-"), term.startswith("-")
+
+    @property
+    def ordering_term(self):
+        return f"-{self.ordering_field}" if self.descending else self.ordering_field
+
+    def _key_field(self, model):
+        """
+        Return the model field behind the ordering and whether its NULLs are coalesced to "" in the seek key.
+        """
+        nullable = False
+        field = None
+        for part in self.ordering_field.split("__"):
+            field = model._meta.get_field(part)
+            nullable = nullable or field.null
+            if field.is_relation:
+                model = field.related_model
+        return field, nullable and isinstance(field, (models.CharField, models.TextField))
+
+    def _key_expression(self):
+        # Nullable text columns (e.g. sublocation, or a study ID behind a nullable FK) are coalesced so that
+        # the seek predicate never has to compare against NULL.
+        if self.key_coalesced:
+            return Coalesce(models.F(self.ordering_field), models.Value(""), output_field=self.key_field.__class__())
+        return models.F(self.ordering_field)
+
+    def decode_cursor(self, request):
+        """
+        Return the position encoded in the request's cursor, or None on the first page.
+
+        Raises NotFound for cursors that do not decode, were minted under another ordering, or hold a key the
+        ordering field cannot take.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+            if payload["o"] != self.ordering_term:
+                raise ValueError("Cursor ordering does not match the requested ordering.")
+            return {"key": self._cursor_key(payload["k"]), "id": int(payload["i"]), "reverse": bool(payload.get("r"))}
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _cursor_key(self, key):
+        if key is None:
+            # Coalesced keys are never NULL; other ordering fields cannot seek past one.
+            if not self.key_coalesced:
+                raise ValueError("Cursor key is null.")
+            return ""
+        if isinstance(key, (dict, list)):
+            raise TypeError("Cursor key is not a scalar.")
+        return self.key_field.to_python(key)
+
+    def encode_cursor(self, item, reverse=False):
+        # Items are model instances, or dicts when the view paginates a values() queryset.
+        if isinstance(item, dict):
+            key, pk = item[self.key_alias], item[self.pk_name]
+        else:
+            key, pk = getattr(item, self.key_alias), item.pk
+        if isinstance(key, (datetime.datetime, datetime.date)):
+            key = key.isoformat()
+        payload = {"o": self.ordering_term, "k": key, "i": pk}
+        if reverse:
+            payload["r"] = True
+        encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode("ascii"))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict(
+            [
+                ("next", self.get_next_link()),
+                ("previous", self.get_previous_link()),
+            ]
+        )
+        if self.count is not None:
+            payload["count"] = self.count
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {"type": "integer", "description": f"Only present when {self.count_query_param}=true."},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque cursor returned in the next/previous links.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to true to include the total count (costs an extra COUNT query).",
+                "schema": {"type": "boolean"},
+            },
+        ]
+
+
+class HistoryKeysetPagination(SampleKeysetPagination):
+    """
+    Keyset pagination over one object's history rows, newest first, for the v3 history sub-resources.
+    """
+
+    page_size = getattr(settings, "HISTORY_PAGINATION_SIZE", 50)
+    max_page_size = 200
+
+    def get_ordering(self, request, view):
+        return "history_date", True
@@ -0,0 +1,72 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from app.factories import SampleFactory
+from app.models import Sample
+from core.search import search_samples
+from core.services.samples import SampleArchiveService
+
+pytestmark = pytest.mark.django_db
+
+
+def test_archive_all_view_moves_used_samples(auto_login_user):
+    client, user = auto_login_user()
+    used = SampleFactory(sample_id="USED-1", is_used=True, sample_location="Freezer A", sample_sublocation="Rack 1")
+    unused = SampleFactory(sample_id="LIVE-1", is_used=False, sample_location="Freezer A")
+
+    response = client.get(reverse("used_samples_archive_all"))
+
+    assert response.status_code == 302
+    used.refresh_from_db()
+    unused.refresh_from_db()
+    assert (used.sample_location, used.sample_sublocation) == ("used", "")
+    assert used.last_modified_by == user.email
+    assert unused.sample_location == "Freezer A"
+    latest = used.history.latest()
+    assert latest.history_type == "~"
+    assert latest.history_user == user
+
+
+def test_archive_reports_progress_per_chunk():
+    for index in range(5):
+        SampleFactory(sample_id=f"USED-{index}", is_used=True, sample_location="Bench")
+    progress = []
+
+    archived = SampleArchiveService.archive_used(chunk_size=2, progress=lambda done, total: progress.append(done))
+
+    assert archived == 5
+    assert progress == [2, 4, 5]
+    assert not SampleArchiveService.pending_queryset().exists()
+
+
+def test_archive_query_count_depends_on_chunks_not_rows():
+    for index in range(4):
+        SampleFactory(sample_id=f"FEW-{index}", is_used=True, sample_location="Bench")
+    with CaptureQueriesContext(connection) as few:
+        SampleArchiveService.archive_used(chunk_size=50)
+
+    for index in range(20):
+        SampleFactory(sample_id=f"MANY-{index}", is_used=True, sample_location="Bench")
+    with CaptureQueriesContext(connection) as many:
+        SampleArchiveService.archive_used(chunk_size=50)
+
+    assert len(many) == len(few)
+
+
+def test_archive_updates_search_index():
+    SampleFactory(sample_id="USED-SEARCH", is_used=True, sample_location="Cryo Tank")
+
+    SampleArchiveService.archive_used()
+
+    assert not search_samples(Sample.objects.all(), "cryo tank").exists()
+
+
+def test_archive_command(capsys):
+    SampleFactory(is_used=True, sample_location="Bench")
+
+    call_command("archive_used_samples", "--chunk-size", "10")
+
+    assert "Archived 1 used samples." in capsys.readouterr().out
@@ -1,3 +1,6 @@
+import csv
+import io
+
 import pytest
 from django.urls import reverse
 
@@ -16,6 +19,17 @@ def test_export_csv_view(auto_login_user):
     assert "attachment" in response["Content-Disposition"]
 
 
+def test_export_csv_view_streams_rows(auto_login_user):
+    client, _ = auto_login_user()
+    SampleFactory(sample_id="VIEW-1")
+
+    response = client.get(reverse("export_csv", kwargs={"study_name": "all"}))
+
+    assert response.streaming
+    content = b"".join(response.streaming_content).decode("utf-8")
+    assert any("VIEW-1" in row for row in csv.reader(io.StringIO(content)))
+
+
 def test_filter_view(auto_login_user):
     client, _ = auto_login_user()
     SampleFactory(study_id=StudyIdentifierFactory(name="GID-123-P"))
@@ -0,0 +1,108 @@
+import gzip
+import json
+import sqlite3
+from contextlib import closing
+
+import pytest
+from django.core.files.storage import FileSystemStorage
+from django.core.management import CommandError, call_command
+
+from core.backups import DELTA_BACKUP, FULL_BACKUP, backup_database, latest_manifest, restore_backup
+
+
+def _create_database(path, rows):
+    with closing(sqlite3.connect(path, isolation_level=None)) as database:
+        database.execute("PRAGMA journal_mode = WAL")
+        database.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, payload TEXT)")
+        database.executemany(
+            "INSERT INTO item (payload) VALUES (?)", ((f"row-{index}" * 20,) for index in range(rows))
+        )
+
+
+def _rows(path):
+    with closing(sqlite3.connect(path)) as database:
+        return database.execute("SELECT id, payload FROM item ORDER BY id").fetchall()
+
+
+@pytest.fixture
+def live_database(tmp_path):
+    path = tmp_path / "live.sqlite3"
+    _create_database(path, 3000)
+    return path
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return FileSystemStorage(location=tmp_path / "backups")
+
+
+def test_full_backup_round_trips_with_checksums(live_database, storage, tmp_path):
+    manifest = backup_database(live_database, storage, pages=64, pause=0)
+
+    assert manifest["kind"] == FULL_BACKUP
+    assert manifest["written_pages"] == manifest["page_count"]
+    assert manifest["file_size"] < manifest["page_count"] * manifest["page_size"]
+    with storage.open(f"manifests/{manifest['name']}.json") as stored:
+        assert json.load(stored) == manifest
+    with storage.open(manifest["file"]) as stored, gzip.open(stored) as blob:
+        assert len(blob.read()) == manifest["page_count"] * manifest["page_size"]
+
+    restore_backup(storage, manifest["name"], tmp_path / "restored.sqlite3")
+    assert _rows(tmp_path / "restored.sqlite3") == _rows(live_database)
+
+
+def test_delta_backups_upload_changed_pages_only(live_database, storage, tmp_path):
+    full = backup_database(live_database, storage, delta=True)
+    with closing(sqlite3.connect(live_database, isolation_level=None)) as database:
+        database.execute("UPDATE item SET payload = 'changed' WHERE id = 10")
+        database.executemany("INSERT INTO item (payload) VALUES (?)", (("new" * 50,) for _ in range(200)))
+    delta = backup_database(live_database, storage, delta=True)
+
+    assert full["kind"] == FULL_BACKUP
+    assert (delta["kind"], delta["base"], delta["chain_length"]) == (DELTA_BACKUP, full["name"], 1)
+    assert 0 < delta["written_pages"] < delta["page_count"] / 2
+    assert latest_manifest(storage) == delta
+
+    restore_backup(storage, delta["name"], tmp_path / "restored.sqlite3")
+    assert _rows(tmp_path / "restored.sqlite3") == _rows(live_database)
+    # Older backups in the chain stay restorable.
+    restore_backup(storage, full["name"], tmp_path / "restored-full.sqlite3")
+    assert len(_rows(tmp_path / "restored-full.sqlite3")) == 3000
+
+
+def test_delta_chain_is_bounded(live_database, storage):
+    kinds = [backup_database(live_database, storage, delta=True, max_chain=2)["kind"] for _ in range(4)]
+    assert kinds == [FULL_BACKUP, DELTA_BACKUP, DELTA_BACKUP, FULL_BACKUP]
+
+
+def test_restore_rejects_a_corrupted_backup(live_database, storage, tmp_path):
+    manifest = backup_database(live_database, storage)
+    with open(storage.path(manifest["file"]), "r+b") as stored:
+        stored.seek(100)
+        stored.write(b"corrupted")
+
+    with pytest.raises(ValueError, match="Checksum mismatch"):
+        restore_backup(storage, manifest["name"], tmp_path / "restored.sqlite3")
+    assert not (tmp_path / "restored.sqlite3").exists()
+
+
+def test_restore_command_restores_the_latest_backup(live_database, storage, tmp_path, settings):
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "dbbackups": {
+            "BACKEND": "django.core.files.storage.FileSystemStorage",
+            "OPTIONS": {"location": storage.location},
+        },
+    }
+    backup_database(live_database, storage)
+    target = tmp_path / "restored.sqlite3"
+
+    call_command("restore_db_backup", str(target))
+    assert _rows(target) == _rows(live_database)
+    with pytest.raises(CommandError, match="--force"):
+        call_command("restore_db_backup", str(target))
+
+
+def test_backup_command_needs_a_file_database():
+    with pytest.raises(CommandError, match="file-based SQLite"):
+        call_command("backup_db")
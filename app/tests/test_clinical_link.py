@@ -0,0 +1,149 @@
+import datetime
+
+import pandas as pd
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from app.factories import SampleFactory, StudyIdentifierFactory
+from app.models import ClinicalData, Sample
+from core.clinical import get_samples_with_clinical_data
+from core.services.imports import ClinicalDataImportService
+
+pytestmark = pytest.mark.django_db
+
+SAMPLE_DATETIME = datetime.datetime(2024, 3, 1, 10, 0, tzinfo=datetime.timezone.utc)
+
+
+def _link(sample):
+    return Sample.objects.values_list("clinical_data_id", flat=True).get(pk=sample.pk)
+
+
+def test_gidamps_sample_links_by_date_on_save():
+    study = StudyIdentifierFactory(study_name="gidamps")
+    clinical = ClinicalData.objects.create(study_id=study, sample_date=SAMPLE_DATETIME.date(), crp=4.2)
+
+    sample = SampleFactory(study_id=study, sample_datetime=SAMPLE_DATETIME)
+
+    assert _link(sample) == clinical.pk
+
+
+def test_music_sample_links_by_timepoint_only():
+    study = StudyIdentifierFactory(study_name="music")
+    ClinicalData.objects.create(study_id=study, sample_date=SAMPLE_DATETIME.date())
+    baseline = ClinicalData.objects.create(study_id=study, music_timepoint="baseline")
+
+    dated = SampleFactory(study_id=study, sample_datetime=SAMPLE_DATETIME, music_timepoint=None)
+    timed = SampleFactory(study_id=study, sample_datetime=SAMPLE_DATETIME, music_timepoint="baseline")
+
+    assert _link(dated) is None
+    assert _link(timed) == baseline.pk
+
+
+def test_changing_timepoint_relinks_sample():
+    study = StudyIdentifierFactory(study_name="mini_music")
+    baseline = ClinicalData.objects.create(study_id=study, music_timepoint="baseline")
+    later = ClinicalData.objects.create(study_id=study, music_timepoint="3_months")
+    sample = SampleFactory(study_id=study, music_timepoint="baseline")
+    assert _link(sample) == baseline.pk
+
+    sample.music_timepoint = "3_months"
+    sample.save(update_fields=["music_timepoint"])
+
+    assert _link(sample) == later.pk
+
+
+def test_clinical_data_create_and_delete_relink_existing_samples():
+    study = StudyIdentifierFactory(study_name="gidamps")
+    sample = SampleFactory(study_id=study, sample_datetime=SAMPLE_DATETIME)
+    assert _link(sample) is None
+
+    clinical = ClinicalData.objects.create(study_id=study, sample_date=SAMPLE_DATETIME.date())
+    assert _link(sample) == clinical.pk
+
+    clinical.delete()
+    assert _link(sample) is None
+
+
+def test_moving_clinical_data_to_another_study_relinks_both_studies():
+    old_study = StudyIdentifierFactory(study_name="gidamps")
+    new_study = StudyIdentifierFactory(study_name="gidamps")
+    old_sample = SampleFactory(study_id=old_study, sample_datetime=SAMPLE_DATETIME)
+    new_sample = SampleFactory(study_id=new_study, sample_datetime=SAMPLE_DATETIME)
+    clinical = ClinicalData.objects.create(study_id=old_study, sample_date=SAMPLE_DATETIME.date())
+    assert _link(old_sample) == clinical.pk
+
+    clinical.study_id = new_study
+    clinical.save()
+
+    assert _link(old_sample) is None
+    assert _link(new_sample) == clinical.pk
+
+
+def test_link_changes_do_not_create_history_rows():
+    study = StudyIdentifierFactory(study_name="gidamps")
+    sample = SampleFactory(study_id=study, sample_datetime=SAMPLE_DATETIME)
+    history_count = sample.history.count()
+
+    ClinicalData.objects.create(study_id=study, sample_date=SAMPLE_DATETIME.date())
+
+    assert sample.history.count() == history_count
+
+
+def test_import_service_relinks_once_after_all_rows():
+    study = StudyIdentifierFactory(study_name="music")
+    samples = [SampleFactory(study_id=study, music_timepoint=timepoint) for timepoint in ("baseline", "3_months")]
+    df = pd.DataFrame(
+        [
+            {"study_id": study.name, "music_timepoint": "baseline", "crp": 1.0},
+            {"study_id": study.name, "music_timepoint": "3_months", "crp": 2.0},
+        ]
+    )
+
+    result = ClinicalDataImportService.import_from_dataframe(df)
+
+    assert result["created"] == 2
+    crp_by_sample = dict(
+        Sample.objects.filter(pk__in=[s.pk for s in samples]).values_list("music_timepoint", "clinical_data__crp")
+    )
+    assert crp_by_sample == {"baseline": 1.0, "3_months": 2.0}
+
+
+def test_annotation_reads_values_through_link():
+    gidamps = StudyIdentifierFactory(study_name="gidamps")
+    music = StudyIdentifierFactory(study_name="music")
+    ClinicalData.objects.create(
+        study_id=gidamps,
+        sample_date=SAMPLE_DATETIME.date(),
+        crp=5.0,
+        endoscopic_mucosal_healing_at_12_months=True,
+    )
+    ClinicalData.objects.create(
+        study_id=music,
+        music_timepoint="baseline",
+        calprotectin=120.0,
+        endoscopic_mucosal_healing_at_12_months=True,
+    )
+    gidamps_sample = SampleFactory(study_id=gidamps, sample_datetime=SAMPLE_DATETIME)
+    music_sample = SampleFactory(study_id=music, music_timepoint="baseline")
+
+    with CaptureQueriesContext(connection) as queries:
+        rows = {row.pk: row for row in get_samples_with_clinical_data(Sample.objects.all())}
+
+    assert len(queries) == 1
+    assert rows[gidamps_sample.pk].crp == 5.0
+    assert rows[gidamps_sample.pk].endoscopic_mucosal_healing_at_12_months is None
+    assert rows[music_sample.pk].calprotectin == 120.0
+    assert rows[music_sample.pk].endoscopic_mucosal_healing_at_12_months is True
+
+
+def test_link_command_repairs_stale_links():
+    study = StudyIdentifierFactory(study_name="gidamps")
+    clinical = ClinicalData.objects.create(study_id=study, sample_date=SAMPLE_DATETIME.date())
+    sample = SampleFactory(study_id=study, sample_datetime=SAMPLE_DATETIME)
+    Sample.objects.filter(pk=sample.pk).update(clinical_data=None)
+
+    call_command("link_clinical_data")
+
+    assert _link(sample) == clinical.pk
@@ -0,0 +1,91 @@
+import pytest
+from django.db import connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from app.factories import SampleFactory, StudyIdentifierFactory
+from app.models import Sample, StudyIdentifier
+from core.counts import cached_count
+from users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _count_queries(queries):
+    return [query["sql"] for query in queries if "COUNT(" in query["sql"]]
+
+
+def test_cached_count_reuses_result_until_data_changes():
+    SampleFactory(sample_location="Freezer A")
+    queryset = Sample.objects.filter(sample_location="Freezer A")
+    assert cached_count(queryset) == 1
+
+    with CaptureQueriesContext(connection) as queries:
+        assert cached_count(queryset.order_by("-sample_datetime")) == 1
+    assert not _count_queries(queries)
+
+    SampleFactory(sample_location="Freezer A")
+    assert cached_count(queryset) == 2
+
+
+def test_cached_count_is_keyed_by_filters():
+    SampleFactory(sample_location="Freezer A")
+    SampleFactory(sample_location="Freezer B")
+
+    assert cached_count(Sample.objects.filter(sample_location="Freezer A")) == 1
+    assert cached_count(Sample.objects.all()) == 2
+    assert cached_count(Sample.objects.filter(sample_location__in=[])) == 0
+
+
+def test_cached_count_tracks_related_model_versions():
+    study = StudyIdentifierFactory(name="GID-1-P", study_name="gidamps")
+    SampleFactory(study_id=study)
+    queryset = Sample.objects.filter(study_id__study_name="gidamps")
+    assert cached_count(queryset, (StudyIdentifier,)) == 1
+
+    study.study_name = "music"
+    study.save()
+
+    assert cached_count(queryset, (StudyIdentifier,)) == 0
+
+
+def test_v3_sample_list_counts_unannotated_scope_once():
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    SampleFactory(is_used=False)
+
+    with CaptureQueriesContext(connection) as first:
+        assert client.get("/api/v3/samples/").json()["count"] == 1
+    with CaptureQueriesContext(connection) as second:
+        assert client.get("/api/v3/samples/").json()["count"] == 1
+
+    # The ETag aggregate also counts; only the pagination COUNT is cached and free of clinical joins.
+    pagination_counts = [sql for sql in _count_queries(first) if "__count" in sql]
+    assert pagination_counts and "app_clinicaldata" not in pagination_counts[0]
+    assert not [sql for sql in _count_queries(second) if "__count" in sql]
+
+
+def test_index_view_uses_cached_count(client):
+    user = UserFactory()
+    client.force_login(user)
+    SampleFactory(is_used=False)
+
+    client.get("/")
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+
+    assert response.context["sample_count"] == 1
+    assert not [sql for sql in _count_queries(queries) if "__count" in sql]
+
+
+def test_counts_cached_before_commit_are_dropped_once_it_commits(django_capture_on_commit_callbacks, monkeypatch):
+    with django_capture_on_commit_callbacks(execute=True):
+        SampleFactory()
+        # A request on another connection still sees the committed table without the new sample, and caches that
+        # count under the version the save has just bumped.
+        with monkeypatch.context() as patched:
+            patched.setattr(QuerySet, "count", lambda queryset: 0)
+            assert cached_count(Sample.objects.all()) == 0
+
+    assert cached_count(Sample.objects.all()) == 1
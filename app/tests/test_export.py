@@ -0,0 +1,125 @@
+import csv
+import io
+
+import pytest
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test.utils import CaptureQueriesContext
+
+from app.factories import BasicScienceBoxFactory, ExperimentFactory, SampleFactory, StudyIdentifierFactory
+from app.models import BasicScienceBox, Experiment, Sample
+from core.utils.export import export_csv, get_export_fields, stream_csv
+
+pytestmark = pytest.mark.django_db
+
+
+def _read_streamed_csv(response):
+    content = b"".join(response.streaming_content).decode("utf-8")
+    return list(csv.reader(io.StringIO(content)))
+
+
+def test_stream_csv_returns_streaming_attachment():
+    SampleFactory(sample_id="STREAM-1")
+
+    response = stream_csv(Sample.objects.all(), file_prefix="samples", file_name="export")
+
+    assert isinstance(response, StreamingHttpResponse)
+    assert response["Content-Type"] == "text/csv"
+    assert response["Content-Disposition"].startswith('attachment; filename="samples_export_')
+
+
+def test_stream_csv_writes_header_and_rows():
+    study = StudyIdentifierFactory(name="GID-555-P")
+    for index in range(5):
+        SampleFactory(sample_id=f"STREAM-{index}", study_id=study)
+
+    rows = _read_streamed_csv(stream_csv(Sample.objects.order_by("sample_id")))
+
+    header, body = rows[0], rows[1:]
+    assert header == get_export_fields(Sample)
+    assert "clinical_data" not in header
+    assert [row[header.index("sample_id")] for row in body] == [f"STREAM-{index}" for index in range(5)]
+
+
+def test_stream_csv_matches_buffered_export():
+    box = BasicScienceBoxFactory()
+
+    streamed = _read_streamed_csv(stream_csv(BasicScienceBox.objects.filter(pk=box.pk)))
+    buffered = list(csv.reader(io.StringIO(export_csv(BasicScienceBox.objects.filter(pk=box.pk)).content.decode())))
+
+    assert streamed == buffered
+    assert "sample_type_labels_display" in streamed[0]
+
+
+def test_stream_csv_reads_queryset_in_chunks(monkeypatch):
+    SampleFactory()
+    queryset = Sample.objects.all()
+    chunk_sizes = []
+    original_iterator = type(queryset).iterator
+
+    def tracking_iterator(self, chunk_size=None):
+        chunk_sizes.append(chunk_size)
+        return original_iterator(self, chunk_size=chunk_size)
+
+    monkeypatch.setattr(type(queryset), "iterator", tracking_iterator)
+
+    _read_streamed_csv(stream_csv(queryset))
+
+    assert chunk_sizes and all(chunk_sizes)
+
+
+def _export_query_count(queryset):
+    with CaptureQueriesContext(connection) as queries:
+        rows = _read_streamed_csv(stream_csv(queryset))
+    return len(queries), rows
+
+
+def test_box_export_query_count_does_not_grow_with_rows():
+    BasicScienceBoxFactory()
+    few, _ = _export_query_count(BasicScienceBox.objects.all())
+    for _ in range(4):
+        BasicScienceBoxFactory()
+    many, rows = _export_query_count(BasicScienceBox.objects.all())
+
+    assert many == few
+    assert len(rows) == 6
+
+
+def test_experiment_export_query_count_does_not_grow_with_rows():
+    BasicScienceBoxFactory(experiments=[ExperimentFactory()])
+    few, _ = _export_query_count(Experiment.objects.all())
+    BasicScienceBoxFactory(experiments=[ExperimentFactory() for _ in range(3)])
+    many, rows = _export_query_count(Experiment.objects.all())
+
+    assert many == few
+    assert len(rows) == 5
+
+
+def test_box_export_matches_model_properties():
+    boxes = [BasicScienceBoxFactory() for _ in range(3)]
+
+    header, *rows = _read_streamed_csv(stream_csv(BasicScienceBox.objects.all()))
+    by_box_id = {row[header.index("box_id")]: dict(zip(header, row)) for row in rows}
+
+    for box in boxes:
+        exported = by_box_id[box.box_id]
+        assert sorted(exported["sample_type_labels_display"].split(", ")) == sorted(
+            box.sample_type_labels_display.split(", ")
+        )
+        assert sorted(exported["tissue_type_labels_display"].split(", ")) == sorted(
+            box.tissue_type_labels_display.split(", ")
+        )
+        assert exported["basic_science_groups_display"] == box.basic_science_groups_display
+        assert sorted(exported["experiments"].split(", ")) == sorted(str(e) for e in box.experiments.all())
+        assert exported["created_by"] == str(box.created_by)
+
+
+def test_sample_export_renders_foreign_keys_and_history():
+    study = StudyIdentifierFactory(name="GID-901-P")
+    SampleFactory(sample_id="HIST-1", study_id=study)
+
+    header, row = _read_streamed_csv(stream_csv(Sample.objects.filter(sample_id="HIST-1")))
+    history_header, *history_rows = _read_streamed_csv(stream_csv(Sample.history.all()))
+
+    assert row[header.index("study_id")] == str(study)
+    assert history_rows[0][history_header.index("study_id")] == str(study)
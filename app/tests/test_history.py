@@ -0,0 +1,73 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from app.factories import ExperimentFactory, SampleFactory, StudyIdentifierFactory
+from core.utils.history import historical_changes
+from users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _edit_sample(sample, count):
+    for index in range(count):
+        sample.sample_comments = f"edit {index}"
+        sample.save()
+
+
+def test_changes_are_listed_newest_first():
+    sample = SampleFactory(sample_location="Shelf A")
+    sample.sample_location = "Shelf B"
+    sample.save()
+    sample.sample_location = "Shelf C"
+    sample.save()
+
+    changes = historical_changes(sample.history.all())
+
+    assert [(change.changes[0].old, change.changes[0].new) for change in changes] == [
+        ("Shelf B", "Shelf C"),
+        ("Shelf A", "Shelf B"),
+    ]
+
+
+def test_query_count_does_not_grow_with_history_length():
+    short, long = SampleFactory(), SampleFactory()
+    _edit_sample(short, 2)
+    _edit_sample(long, 20)
+
+    with CaptureQueriesContext(connection) as short_queries:
+        historical_changes(short.history.all())
+    with CaptureQueriesContext(connection) as long_queries:
+        changes = historical_changes(long.history.all())
+
+    assert len(changes) == 20
+    assert len(long_queries) == len(short_queries)
+
+
+def test_foreign_keys_and_history_users_are_resolved():
+    first, second = StudyIdentifierFactory(name="GID-1-P"), StudyIdentifierFactory(name="GID-2-P")
+    sample = SampleFactory(study_id=first)
+    sample.study_id = second
+    sample._history_user = UserFactory(email="editor@example.com")
+    sample.save()
+
+    (change,) = historical_changes(sample.history.all())
+
+    study_change = next(item for item in change.changes if item.field == "study_id")
+    assert (study_change.old, study_change.new) == (first, second)
+    assert change.new_record.history_user.email == "editor@example.com"
+
+
+def test_user_foreign_keys_are_resolved_in_one_query():
+    experiment = ExperimentFactory()
+    editors = [UserFactory() for _ in range(3)]
+    for editor in editors:
+        experiment.last_modified_by = editor
+        experiment.save()
+
+    changes = historical_changes(experiment.history.all())
+
+    with CaptureQueriesContext(connection) as queries:
+        resolved = [item.new for change in changes for item in change.changes if item.field == "last_modified_by"]
+    assert [user.email for user in resolved] == [editor.email for editor in reversed(editors)]
+    assert len(queries) == 0
@@ -0,0 +1,136 @@
+import io
+import os
+import sqlite3
+from contextlib import closing
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from app.factories import SampleFactory
+from app.models import DatabaseMaintenanceRun
+from core.maintenance import (
+    BUSY,
+    FAILED,
+    MAINTENANCE_STEPS,
+    OK,
+    SKIPPED,
+    TIMED_OUT,
+    checkpoint,
+    incremental_vacuum,
+    run_maintenance,
+    start_maintenance_scheduler,
+)
+
+SLOW_QUERY = "WITH RECURSIVE counter(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM counter) SELECT COUNT(*) FROM counter"
+
+
+def _fill(database, rows):
+    database.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, payload TEXT)")
+    database.executemany("INSERT INTO item (payload) VALUES (?)", (("x" * 500,) for _ in range(rows)))
+
+
+@pytest.mark.django_db
+def test_run_records_steps_and_table_statistics():
+    SampleFactory.create_batch(3)
+
+    run = run_maintenance()
+
+    assert [(step["step"], step["status"]) for step in run.steps] == [
+        ("analyze", OK),
+        ("optimize", OK),
+        # The in-memory test database has neither incremental auto_vacuum nor a WAL.
+        ("incremental_vacuum", SKIPPED),
+        ("checkpoint", SKIPPED),
+    ]
+    assert run.page_count > 0 and run.page_size > 0 and run.freelist_count >= 0
+    assert run.wal_bytes is None
+    tables = {table["name"]: table for table in run.tables}
+    assert tables["app_sample"]["rows"] == 3
+    assert tables["app_sample"]["bytes"] > 0
+    assert tables["app_sample"]["index_bytes"] > 0
+    assert DatabaseMaintenanceRun.objects.latest() == run
+
+
+@pytest.mark.django_db
+def test_steps_are_interrupted_at_their_budget_and_failures_do_not_stop_the_run(monkeypatch):
+    monkeypatch.setitem(MAINTENANCE_STEPS, "slow", lambda raw, deadline: raw.execute(SLOW_QUERY).fetchone())
+    monkeypatch.setitem(
+        MAINTENANCE_STEPS, "broken", lambda raw, deadline: raw.execute("SELECT * FROM missing_table").fetchone()
+    )
+
+    run = run_maintenance(["slow", "broken", "optimize"], budget=0.05)
+
+    statuses = {step["step"]: step for step in run.steps}
+    assert statuses["slow"]["status"] == TIMED_OUT
+    assert statuses["slow"]["seconds"] < 5
+    assert statuses["broken"]["status"] == FAILED
+    assert "no such table" in statuses["broken"]["error"]
+    assert statuses["optimize"]["status"] == OK
+
+
+def test_checkpoint_truncates_the_wal(tmp_path):
+    path = tmp_path / "wal.sqlite3"
+    with closing(sqlite3.connect(path, isolation_level=None)) as database:
+        database.execute("PRAGMA journal_mode = WAL")
+        database.execute("PRAGMA wal_autocheckpoint = 0")
+        _fill(database, 500)
+        assert os.path.getsize(f"{path}-wal") > 0
+
+        status, details = checkpoint(database, deadline=None)
+
+        assert status == OK
+        assert details["wal_frames"] == 0
+        assert os.path.getsize(f"{path}-wal") == 0
+
+
+def test_checkpoint_reports_busy_while_a_reader_holds_the_wal(tmp_path):
+    path = tmp_path / "wal.sqlite3"
+    with closing(sqlite3.connect(path, isolation_level=None)) as database:
+        database.execute("PRAGMA journal_mode = WAL")
+        _fill(database, 10)
+        with closing(sqlite3.connect(path, isolation_level=None)) as reader:
+            reader.execute("BEGIN")
+            reader.execute("SELECT COUNT(*) FROM item").fetchone()
+            database.execute("PRAGMA busy_timeout = 0")
+            database.execute("INSERT INTO item (payload) VALUES ('late')")
+
+            assert checkpoint(database, deadline=None)[0] == BUSY
+            reader.execute("COMMIT")
+
+
+def test_incremental_vacuum_releases_free_pages(tmp_path):
+    with closing(sqlite3.connect(tmp_path / "vacuum.sqlite3", isolation_level=None)) as database:
+        assert incremental_vacuum(database, deadline=float("inf"))[0] == SKIPPED
+
+        database.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        database.execute("VACUUM")
+        _fill(database, 2000)
+        database.execute("DELETE FROM item")
+        freed = database.execute("PRAGMA freelist_count").fetchone()[0]
+        assert freed > 0
+
+        status, details = incremental_vacuum(database, deadline=float("inf"))
+
+        assert status == OK
+        assert details["freed_pages"] == freed
+        assert database.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+
+@pytest.mark.django_db
+def test_dbmaintain_command_runs_the_chosen_steps():
+    out = io.StringIO()
+    call_command("dbmaintain", "--steps", "analyze,checkpoint", stdout=out)
+
+    assert "analyze: ok" in out.getvalue()
+    assert "checkpoint: skipped" in out.getvalue()
+    assert [step["step"] for step in DatabaseMaintenanceRun.objects.latest().steps] == ["analyze", "checkpoint"]
+
+    call_command("dbmaintain", "--stats-only", stdout=io.StringIO())
+    assert DatabaseMaintenanceRun.objects.latest().steps == []
+
+    with pytest.raises(CommandError, match="vacuum_everything"):
+        call_command("dbmaintain", "--steps", "vacuum_everything")
+
+
+def test_scheduler_is_off_by_default():
+    assert start_maintenance_scheduler() is None
@@ -0,0 +1,197 @@
+import datetime
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from app.factories import SampleFactory, StudyIdentifierFactory
+from app.models import SamplePivotCell
+from core.pivots import rebuild_sample_pivot, sample_type_pivot
+from users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _sample(study_id, sample_id, sample_type="serum", day=1, study_name="music"):
+    return SampleFactory(
+        study_name=study_name,
+        study_id=study_id,
+        sample_id=sample_id,
+        sample_type=sample_type,
+        sample_datetime=datetime.datetime(2024, 3, day, 10, tzinfo=datetime.timezone.utc),
+    )
+
+
+def _music_samples():
+    first = StudyIdentifierFactory(name="MID-02-10", study_name="music")
+    second = StudyIdentifierFactory(name="MID-02-9", study_name="music")
+    third = StudyIdentifierFactory(name="MID-01-5", study_name="music")
+    control = StudyIdentifierFactory(name="NEG-CONTROL", study_name="music")
+    _sample(first, "S-2")
+    _sample(first, "S-1")
+    _sample(first, "S-3", sample_type="saliva")
+    _sample(second, "S-4", day=2)
+    _sample(third, "S-5", day=3)
+    _sample(control, "S-6")
+
+
+def _row(study_id, day, **cells):
+    return {"study_id": study_id, "sample_date": datetime.date(2024, 3, day), **cells}
+
+
+MUSIC_PIVOT = (
+    ["Saliva", "Serum"],
+    [
+        _row("MID-01-5", 3, Saliva=None, Serum=["S-5"]),
+        _row("MID-02-9", 2, Saliva=None, Serum=["S-4"]),
+        _row("MID-02-10", 1, Saliva=["S-3"], Serum=["S-1", "S-2"]),
+    ],
+)
+
+
+def test_music_pivot_groups_by_type_label_and_sorts_by_center_then_numeric_patient_number():
+    _music_samples()
+
+    # NEG-CONTROL does not match the music study ID pattern.
+    assert sample_type_pivot("music") == MUSIC_PIVOT
+
+
+def test_other_pivots_are_sorted_by_study_id_and_date():
+    for name in ("GID-3-A", "GID-12-B", "NEG-1"):
+        study_id = StudyIdentifierFactory(name=name, study_name="gidamps")
+        for index, sample_type in enumerate(("serum", "saliva", "serum")):
+            _sample(study_id, f"{name}-{index}", sample_type=sample_type, day=index + 1, study_name="gidamps")
+
+    assert sample_type_pivot("gidamps") == (
+        ["Saliva", "Serum"],
+        [
+            _row("GID-12-B", 1, Saliva=None, Serum=["GID-12-B-0"]),
+            _row("GID-12-B", 2, Saliva=["GID-12-B-1"], Serum=None),
+            _row("GID-12-B", 3, Saliva=None, Serum=["GID-12-B-2"]),
+            _row("GID-3-A", 1, Saliva=None, Serum=["GID-3-A-0"]),
+            _row("GID-3-A", 2, Saliva=["GID-3-A-1"], Serum=None),
+            _row("GID-3-A", 3, Saliva=None, Serum=["GID-3-A-2"]),
+        ],
+    )
+
+
+def test_pivot_of_study_without_samples_is_empty():
+    assert sample_type_pivot("marvel") == ([], [])
+
+
+def test_sample_types_pivot_view_returns_csv(client, django_user_model):
+    _music_samples()
+    client.force_login(django_user_model.objects.create_user(email="pivot@example.com", password="x"))
+
+    response = client.get(reverse("sample_types_pivot", kwargs={"study_name": "music"}))
+
+    assert response["Content-Type"] == "text/csv"
+    lines = response.content.decode().splitlines()
+    assert lines[0] == "study_id,sample_date,Saliva,Serum"
+    assert lines[1] == "MID-01-5,2024-03-03,None,S-5"
+    assert '"S-1, S-2"' in lines[3]
+
+
+def _cells():
+    return {
+        (cell.study_name, cell.study_identifier_id, cell.sample_date, cell.sample_type): cell.sample_ids
+        for cell in SamplePivotCell.objects.all()
+    }
+
+
+def _assert_matches_rebuild():
+    incremental = _cells()
+    rebuild_sample_pivot()
+    assert incremental == _cells()
+
+
+def test_pivot_cells_follow_sample_creates_edits_and_deletes():
+    study_id = StudyIdentifierFactory(name="MID-01-1", study_name="music")
+    other_study_id = StudyIdentifierFactory(name="MID-01-2", study_name="music")
+    sample = _sample(study_id, "S-1")
+    _sample(study_id, "S-2")
+    assert _cells() == {("music", study_id.pk, datetime.date(2024, 3, 1), "serum"): ["S-1", "S-2"]}
+
+    sample.sample_type = "saliva"
+    sample.save()
+    _assert_matches_rebuild()
+
+    sample.study_id = other_study_id
+    sample.sample_datetime = datetime.datetime(2024, 4, 2, tzinfo=datetime.timezone.utc)
+    sample.save()
+    _assert_matches_rebuild()
+
+    sample.sample_id = "S-1B"
+    sample.save()
+    assert _cells()[("music", other_study_id.pk, datetime.date(2024, 4, 2), "saliva")] == ["S-1B"]
+
+    sample.delete()
+    assert _cells() == {("music", study_id.pk, datetime.date(2024, 3, 1), "serum"): ["S-2"]}
+
+
+def test_pivot_cells_track_samples_gaining_and_losing_a_study_id():
+    study_id = StudyIdentifierFactory(name="MID-01-1", study_name="music")
+    sample = _sample(None, "S-1")
+    assert _cells() == {}
+
+    sample.study_id = study_id
+    sample.save()
+    assert len(_cells()) == 1
+
+    sample.study_id = None
+    sample.save()
+    assert _cells() == {}
+
+
+def test_saves_outside_pivot_fields_leave_cells_alone():
+    sample = _sample(StudyIdentifierFactory(name="MID-01-1", study_name="music"), "S-1")
+
+    sample.sample_location = "Lab C2.25"
+    with CaptureQueriesContext(connection) as queries:
+        sample.save(update_fields=["sample_location"])
+
+    assert not any("app_samplepivotcell" in query["sql"] for query in queries)
+
+
+def test_multiple_sample_create_adds_pivot_cells():
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    payload = [
+        {
+            "study_name": "gidamps",
+            "study_id": "GID-7-P",
+            "sample_id": f"BULK-{index}",
+            "sample_location": "CIR Freezer",
+            "sample_type": "serum",
+            "sample_datetime": "2024-03-01T10:00:00Z",
+        }
+        for index in range(3)
+    ]
+
+    response = client.post(reverse("v3-multiple-samples-list"), payload, format="json")
+
+    assert response.status_code == 201, response.content
+    _assert_matches_rebuild()
+    assert sample_type_pivot("gidamps")[1][0]["Serum"] == ["BULK-0", "BULK-1", "BULK-2"]
+
+
+def test_materialized_pivot_reads_one_query():
+    _music_samples()
+
+    with CaptureQueriesContext(connection) as queries:
+        sample_type_pivot("music")
+
+    assert len(queries) == 1
+
+
+def test_rebuild_sample_pivot_command():
+    _music_samples()
+    SamplePivotCell.objects.all().delete()
+
+    call_command("rebuild_sample_pivot", stdout=io.StringIO())
+
+    assert sample_type_pivot("music") == MUSIC_PIVOT
@@ -0,0 +1,152 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from app.factories import SampleFactory, StudyIdentifierFactory
+from app.models import SampleRollup
+from core.rollups import ROLLUP_KEY_FIELDS, rebuild_sample_rollups, sample_analytics
+from core.services.samples import SampleArchiveService, SampleBatchScanService
+from users.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _buckets():
+    return {
+        tuple(row[field] for field in ROLLUP_KEY_FIELDS): row["sample_count"]
+        for row in SampleRollup.objects.values(*ROLLUP_KEY_FIELDS, "sample_count")
+    }
+
+
+def _rebuilt_buckets():
+    incremental = _buckets()
+    rebuild_sample_rollups()
+    return incremental, _buckets()
+
+
+def _sample(**kwargs):
+    kwargs.setdefault("sample_datetime", timezone.make_aware(datetime.datetime(2024, 3, 5, 9, 30)))
+    kwargs.setdefault("study_name", "gidamps")
+    kwargs.setdefault("sample_type", "serum")
+    kwargs.setdefault("sample_location", "Freezer A")
+    return SampleFactory(**kwargs)
+
+
+def test_save_and_delete_move_samples_between_buckets():
+    sample = _sample()
+    _sample()
+    march = datetime.date(2024, 3, 1)
+    assert _buckets() == {(march, "gidamps", "serum", "Freezer A", False): 2}
+
+    sample.sample_location = "Freezer B"
+    sample.is_used = True
+    sample.save()
+    assert _buckets() == {
+        (march, "gidamps", "serum", "Freezer A", False): 1,
+        (march, "gidamps", "serum", "Freezer B", True): 1,
+    }
+
+    sample.delete()
+    assert _buckets() == {(march, "gidamps", "serum", "Freezer A", False): 1}
+
+
+def test_partial_save_of_other_fields_skips_rollup():
+    sample = _sample()
+    sample.sample_comments = "noted"
+
+    with CaptureQueriesContext(connection) as queries:
+        sample.save(update_fields=["sample_comments"])
+
+    # Neither the previous-bucket lookup nor a rollup write runs.
+    assert not any('"app_sample"."is_used"' in query["sql"] for query in queries)
+    assert not any("app_samplerollup" in query["sql"] for query in queries)
+    assert sum(_buckets().values()) == 1
+
+
+def test_bulk_paths_match_a_full_rebuild():
+    samples = [_sample(sample_id=f"BULK-{index}", sample_location=f"Rack {index % 3}") for index in range(6)]
+    SampleBatchScanService.apply([sample.sample_id for sample in samples[:4]], {"sample_location": "Cryo Tank"})
+    SampleBatchScanService.apply([sample.sample_id for sample in samples[2:]], {"is_used": True})
+    SampleArchiveService.archive_used(chunk_size=2)
+
+    incremental, rebuilt = _rebuilt_buckets()
+
+    assert incremental == rebuilt
+    assert rebuilt[(datetime.date(2024, 3, 1), "gidamps", "serum", "used", True)] == 4
+
+
+def test_multiple_sample_create_counts_new_samples():
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    StudyIdentifierFactory(name="GID-7-P")
+    payload = {
+        "study_name": "gidamps",
+        "study_id": "GID-7-P",
+        "sample_location": "Freezer 1",
+        "sample_type": "serum",
+        "sample_datetime": "2024-03-01T10:00:00Z",
+    }
+
+    response = client.post(
+        reverse("v3-multiple-samples-list"),
+        [{**payload, "sample_id": f"NEW-{index}"} for index in range(3)],
+        format="json",
+    )
+
+    assert response.status_code == 201
+    assert _buckets() == {(datetime.date(2024, 3, 1), "gidamps", "serum", "Freezer 1", False): 3}
+
+
+def test_rebuild_command_repairs_drift(capsys):
+    _sample()
+    SampleRollup.objects.update(sample_count=99)
+
+    call_command("rebuild_sample_rollups")
+
+    assert sum(_buckets().values()) == 1
+    assert "Rebuilt 1 sample rollup buckets." in capsys.readouterr().out
+
+
+def test_sample_analytics_breakdowns():
+    now = timezone.now()
+    _sample(sample_datetime=now, sample_location="Freezer A")
+    _sample(sample_datetime=now, sample_location="Freezer A", sample_type="saliva", study_name="music")
+    _sample(sample_datetime=now, is_used=True, sample_location="Freezer B")
+    _sample(sample_datetime=now - datetime.timedelta(days=800))
+
+    analytics = sample_analytics()
+
+    assert (analytics["total_samples"], analytics["total_active_samples"]) == (4, 3)
+    assert analytics["samples_by_month"] == [{"month": now.date().replace(day=1), "sample_count": 3}]
+    assert analytics["samples_by_location"] == [{"sample_location": "Freezer A", "sample_location_count": 3}]
+    assert {row["study_name"]: row["study_name_count"] for row in analytics["samples_by_study"]} == {
+        "gidamps": 3,
+        "music": 1,
+    }
+
+
+def test_v3_analytics_endpoint_reflects_new_samples():
+    client = APIClient()
+    client.force_authenticate(user=UserFactory())
+    _sample()
+    url = reverse("v3-samples-analytics")
+
+    assert client.get(url).json()["total_samples"] == 1
+    _sample()
+    assert client.get(url).json()["total_samples"] == 2
+
+
+def test_legacy_analytics_page_reads_rollup(client):
+    client.force_login(UserFactory())
+    _sample(sample_datetime=timezone.now())
+
+    response = client.get(reverse("analytics"))
+
+    assert response.context["total_samples"] == 1
+    assert response.context["samples_by_month"][0]["sample_month_label"] == timezone.now().strftime("%b %Y")
@@ -0,0 +1,108 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from app.factories import SampleFactory, StudyIdentifierFactory
+from app.models import Sample
+from core.search import SEARCH_TABLE, looks_like_barcode, search_index_available, search_samples
+
+pytestmark = pytest.mark.django_db
+
+
+def _ids(queryset):
+    return sorted(queryset.values_list("sample_id", flat=True))
+
+
+def _indexed_rowids():
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT rowid FROM {SEARCH_TABLE}")
+        return sorted(row[0] for row in cursor.fetchall())
+
+
+def test_search_index_is_created_by_migration():
+    assert search_index_available()
+
+
+def test_search_matches_substrings_across_columns():
+    study = StudyIdentifierFactory(name="GID-777-P")
+    SampleFactory(sample_id="ALPHA-1", study_id=study)
+    SampleFactory(sample_id="BETA-2", sample_location="Freezer Omega")
+    SampleFactory(sample_id="GAMMA-3", sample_comments="haemolysed sample")
+    SampleFactory(sample_id="DELTA-4")
+
+    assert _ids(search_samples(Sample.objects.all(), "gid-777")) == ["ALPHA-1"]
+    assert _ids(search_samples(Sample.objects.all(), "omeg")) == ["BETA-2"]
+    assert _ids(search_samples(Sample.objects.all(), "HAEMOLYSED")) == ["GAMMA-3"]
+
+
+def test_search_index_follows_updates_and_deletes():
+    sample = SampleFactory(sample_id="EPSILON-1", sample_location="Old Freezer")
+    sample.sample_location = "New Cabinet"
+    sample.save()
+
+    assert _ids(search_samples(Sample.objects.all(), "cabinet")) == ["EPSILON-1"]
+    assert _ids(search_samples(Sample.objects.all(), "old freezer")) == []
+
+    sample.delete()
+    assert _indexed_rowids() == []
+
+
+def test_renaming_study_id_reindexes_samples():
+    study = StudyIdentifierFactory(name="MID-01-1")
+    SampleFactory(sample_id="ZETA-1", study_id=study)
+    study.name = "MID-99-9"
+    study.save()
+
+    assert _ids(search_samples(Sample.objects.all(), "MID-99")) == ["ZETA-1"]
+
+
+def test_ranked_barcode_query_puts_the_exact_match_first():
+    SampleFactory(
+        sample_id="ABC1234",
+        study_id=StudyIdentifierFactory(name="ABC123-ABC123"),
+        sample_location="ABC123 ABC123",
+        sample_sublocation="ABC123 ABC123",
+    )
+    SampleFactory(sample_id="ABC123")
+    SampleFactory(sample_id="ABC1")
+
+    assert looks_like_barcode("abc123")
+    ranked = search_samples(Sample.objects.all(), "abc123", rank=True)
+    assert list(ranked.values_list("sample_id", flat=True)) == ["ABC123", "ABC1234"]
+    # An exact hit does not hide the samples whose IDs contain it.
+    assert _ids(search_samples(Sample.objects.all(), "ABC1")) == ["ABC1", "ABC123", "ABC1234"]
+
+
+def test_search_runs_no_exists_query():
+    SampleFactory(sample_id="ABC123")
+
+    with CaptureQueriesContext(connection) as queries:
+        assert search_samples(Sample.objects.all(), "ABC123", rank=True).count() == 1
+    assert len(queries) == 1
+
+
+def test_short_queries_fall_back_to_icontains():
+    SampleFactory(sample_id="XY-1")
+    SampleFactory(sample_id="ZZ-2")
+
+    assert _ids(search_samples(Sample.objects.all(), "xy")) == ["XY-1"]
+
+
+def test_ranked_search_prefers_sample_id_matches():
+    SampleFactory(sample_id="OTHER-1", sample_comments="mentions RANKME here")
+    SampleFactory(sample_id="RANKME-1")
+
+    ranked = list(search_samples(Sample.objects.all(), "rankme", rank=True).values_list("sample_id", flat=True))
+
+    assert ranked == ["RANKME-1", "OTHER-1"]
+
+
+def test_rebuild_command_restores_missing_rows():
+    samples = [SampleFactory() for _ in range(3)]
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+    call_command("rebuild_sample_search_index")
+
+    assert _indexed_rowids() == sorted(sample.pk for sample in samples)
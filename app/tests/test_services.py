@@ -2,6 +2,8 @@ import pandas as pd
 from django.test import TestCase
 
 from app.models import StudyIdentifier
+from core.autocomplete import study_id_index
+from core.counts import cached_count
 from core.services.imports import StudyIdentifierImportService
 
 
@@ -223,6 +225,16 @@ class TestStudyIdentifierImportService(TestCase):
         self.assertIsNone(new_id1.sex)
         self.assertIsNone(new_id1.age)
 
+    def test_import_refreshes_cached_counts_and_autocomplete(self):
+        """Test that bulk-created identifiers show up in cached counts and autocomplete."""
+        study_id_index.rebuild()
+        self.assertEqual(cached_count(StudyIdentifier.objects.all()), 3)
+
+        StudyIdentifierImportService.import_from_dataframe(pd.DataFrame({"study_id": ["GID-301"]}))
+
+        self.assertEqual(cached_count(StudyIdentifier.objects.all()), 4)
+        self.assertEqual(study_id_index.search("GID-301"), ["GID-301"])
+
     def test_case_insensitivity(self):
         """Test that study IDs are case-insensitive."""
         df = pd.DataFrame(
@@ -0,0 +1,200 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from app.factories import SampleFactory
+from app.models import Sample
+from core.snapshots import (
+    SNAPSHOT_AGE_HEADER,
+    SNAPSHOT_DB_ALIAS,
+    SnapshotReadMiddleware,
+    SnapshotRouter,
+    begin_snapshot_reads,
+    end_snapshot_reads,
+    online_backup,
+    refresh_snapshot,
+    snapshot_age,
+)
+from core.transactions import get_view_mark
+from users.models import User
+
+
+def _create_database(path, rows):
+    with closing(sqlite3.connect(path, isolation_level=None)) as database:
+        database.execute("PRAGMA journal_mode = WAL")
+        database.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, payload TEXT)")
+        database.executemany("INSERT INTO item (payload) VALUES (?)", (("x" * 200,) for _ in range(rows)))
+
+
+def _count(path):
+    with closing(sqlite3.connect(path)) as database:
+        return database.execute("SELECT COUNT(*) FROM item").fetchone()[0]
+
+
+@pytest.fixture(scope="module")
+def snapshot_alias(django_db_setup, tmp_path_factory):
+    """
+    Register the snapshot alias the way base settings do when DB_SNAPSHOT_PATH is set.
+
+    Registered after the test databases exist (so no test database is made for it) but before each test's database
+    access rules are set up, so tests can list it in ``databases``.
+    """
+    path = tmp_path_factory.mktemp("snapshot") / "snapshot.sqlite3"
+    configured = connections.configure_settings(
+        {
+            DEFAULT_DB_ALIAS: dict(connections.settings[DEFAULT_DB_ALIAS]),
+            SNAPSHOT_DB_ALIAS: {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": f"file:{path}?mode=ro&immutable=1",
+            },
+        }
+    )
+    connections.settings[SNAPSHOT_DB_ALIAS] = configured[SNAPSHOT_DB_ALIAS]
+    yield path
+    connections[SNAPSHOT_DB_ALIAS].close()
+    del connections[SNAPSHOT_DB_ALIAS]
+    del connections.settings[SNAPSHOT_DB_ALIAS]
+
+
+@pytest.fixture
+def snapshot_database(snapshot_alias, settings):
+    settings.DB_SNAPSHOT_PATH = str(snapshot_alias)
+    yield snapshot_alias
+    end_snapshot_reads()
+    connections[SNAPSHOT_DB_ALIAS].close()
+    # Leave an empty database behind for the test teardown to flush.
+    snapshot_alias.unlink(missing_ok=True)
+    snapshot_alias.touch()
+
+
+def test_online_backup_is_consistent_while_another_connection_writes(tmp_path):
+    source, target = str(tmp_path / "live.sqlite3"), str(tmp_path / "copy.sqlite3")
+    _create_database(source, 5000)
+    steps = []
+
+    def write_during_backup():
+        with closing(sqlite3.connect(source, timeout=30, isolation_level=None)) as writer:
+            for _ in range(20):
+                writer.execute("INSERT INTO item (payload) VALUES ('late')")
+                time.sleep(0.001)
+
+    writer = threading.Thread(target=write_during_backup)
+
+    def progress(remaining, total):
+        steps.append(remaining)
+        if len(steps) == 1:
+            writer.start()
+
+    online_backup(source, target, pages=16, pause=0.002, progress=progress)
+    writer.join()
+
+    assert _count(target) == 5000
+    assert _count(source) == 5020
+    # Stepped, and never restarted by the concurrent commits.
+    assert len(steps) > 10
+    assert steps == sorted(steps, reverse=True)
+
+
+def test_refresh_snapshot_swaps_in_a_rollback_journal_copy(tmp_path):
+    source, target = str(tmp_path / "live.sqlite3"), tmp_path / "snapshot.sqlite3"
+    _create_database(source, 10)
+    target.write_bytes(b"stale")
+    before = time.time()
+
+    refresh_snapshot(source_path=source, target_path=target)
+
+    assert _count(str(target)) == 10
+    with closing(sqlite3.connect(target)) as snapshot:
+        assert snapshot.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    assert before - 1 <= os.stat(target).st_mtime <= time.time()
+    assert not list(tmp_path.glob(".*.partial"))
+
+
+def test_router_sends_only_data_app_reads_to_the_snapshot():
+    router = SnapshotRouter()
+    assert router.db_for_read(Sample) is None
+
+    begin_snapshot_reads()
+    try:
+        assert router.db_for_read(Sample) == SNAPSHOT_DB_ALIAS
+        assert router.db_for_read(User) is None
+        assert router.db_for_write(Sample) == DEFAULT_DB_ALIAS
+    finally:
+        end_snapshot_reads()
+    assert router.allow_migrate(SNAPSHOT_DB_ALIAS, "app") is False
+    assert router.allow_migrate(DEFAULT_DB_ALIAS, "app") is None
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        reverse("analytics"),
+        reverse("export_historical_samples"),
+        reverse("v3-samples-export"),
+        reverse("v3-samples-pivot", kwargs={"study_name": "music"}),
+        reverse("v3-datasets-export-csv", kwargs={"name": "demo"}),
+    ],
+)
+def test_heavy_readers_tolerate_staleness(url):
+    assert get_view_mark(resolve(url).func, "GET", "tolerates_staleness")
+
+
+def test_no_snapshot_without_configuration():
+    assert snapshot_age() is None
+
+
+def test_middleware_skips_stale_and_unsafe_requests(snapshot_database, settings):
+    snapshot_database.touch()
+    middleware = SnapshotReadMiddleware(lambda request: None)
+    view = resolve(reverse("export_historical_samples")).func
+
+    request = RequestFactory().post("/")
+    middleware.process_view(request, view, (), {})
+    assert not hasattr(request, "snapshot_age")
+
+    settings.DB_SNAPSHOT_MAX_AGE = 60
+    os.utime(snapshot_database, (time.time() - 120, time.time() - 120))
+    request = RequestFactory().get("/")
+    middleware.process_view(request, view, (), {})
+    assert not hasattr(request, "snapshot_age")
+
+
+@pytest.mark.django_db(transaction=True, databases=[DEFAULT_DB_ALIAS, SNAPSHOT_DB_ALIAS])
+def test_stale_tolerant_export_reads_the_snapshot(client, snapshot_database):
+    client.force_login(User.objects.create_user(email="snapshot@example.com", password="x"))
+    SampleFactory(sample_id="BEFORE-SNAPSHOT")
+    refresh_snapshot(source_path=connection.settings_dict["NAME"], target_path=snapshot_database)
+    SampleFactory(sample_id="AFTER-SNAPSHOT")
+
+    response = client.get(reverse("export_samples"))
+    content = b"".join(response.streaming_content).decode()
+
+    assert "BEFORE-SNAPSHOT" in content
+    assert "AFTER-SNAPSHOT" not in content
+    assert int(response[SNAPSHOT_AGE_HEADER]) >= 0
+
+    # Views that do not opt in keep reading the live database.
+    response = client.get(reverse("v3-samples-list"))
+    assert SNAPSHOT_AGE_HEADER not in response
+    assert response.json()["count"] == 2
+
+
+@pytest.mark.django_db(transaction=True, databases=[DEFAULT_DB_ALIAS, SNAPSHOT_DB_ALIAS])
+def test_snapshot_reads_fall_back_to_the_live_database_when_too_old(client, snapshot_database, settings):
+    client.force_login(User.objects.create_user(email="snapshot@example.com", password="x"))
+    refresh_snapshot(source_path=connection.settings_dict["NAME"], target_path=snapshot_database)
+    SampleFactory(sample_id="AFTER-SNAPSHOT")
+    settings.DB_SNAPSHOT_MAX_AGE = 60
+    os.utime(snapshot_database, (time.time() - 120, time.time() - 120))
+
+    response = client.get(reverse("export_samples"))
+
+    assert "AFTER-SNAPSHOT" in b"".join(response.streaming_content).decode()
+    assert SNAPSHOT_AGE_HEADER not in response
@@ -0,0 +1,105 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from core.transactions import (
+    READ_POLICY,
+    WRITE_POLICY,
+    TransactionPolicyMiddleware,
+    get_transaction_policy,
+    read_only_transaction,
+    set_read_only_request,
+    write_transaction,
+)
+
+
+@pytest.fixture
+def immediate_mode(monkeypatch):
+    monkeypatch.setitem(connection.settings_dict, "OPTIONS", {"transaction_mode": "IMMEDIATE"})
+    connection.transaction_mode = "IMMEDIATE"
+    yield
+    set_read_only_request(False)
+
+
+def _view(request):
+    return HttpResponse()
+
+
+def test_safe_methods_read_and_others_write():
+    assert get_transaction_policy(_view, "GET") == READ_POLICY
+    assert get_transaction_policy(_view, "HEAD") == READ_POLICY
+    assert get_transaction_policy(_view, "POST") == WRITE_POLICY
+    assert get_transaction_policy(_view, "DELETE") == WRITE_POLICY
+
+
+def test_marked_views_override_the_method():
+    assert get_transaction_policy(write_transaction(lambda request: None), "GET") == WRITE_POLICY
+    assert get_transaction_policy(read_only_transaction(lambda request: None), "POST") == READ_POLICY
+
+
+@pytest.mark.parametrize(
+    "url, method, policy",
+    [
+        (reverse("v3-samples-list"), "GET", READ_POLICY),
+        (reverse("v3-samples-list"), "POST", WRITE_POLICY),
+        (reverse("v3-datasets-list"), "GET", READ_POLICY),
+        # Recording the access writes, so the dataset detail and export take the write lock on GET.
+        (reverse("v3-datasets-detail", kwargs={"name": "demo"}), "GET", WRITE_POLICY),
+        (reverse("v3-datasets-export-csv", kwargs={"name": "demo"}), "GET", WRITE_POLICY),
+        (reverse("generate_token"), "GET", WRITE_POLICY),
+        # A GET link, but the heaviest bulk writer: each archived chunk must BEGIN IMMEDIATE.
+        (reverse("used_samples_archive_all"), "GET", WRITE_POLICY),
+        # Password reset requests only read users to send the email, so they skip the write lock on POST.
+        (reverse("password_reset"), "POST", READ_POLICY),
+        (reverse("password_reset_api"), "POST", READ_POLICY),
+        (reverse("v3-password-reset"), "POST", READ_POLICY),
+        (reverse("v3-samples-analytics"), "GET", READ_POLICY),
+    ],
+)
+def test_policy_of_routed_views(url, method, policy):
+    assert get_transaction_policy(resolve(url).func, method) == policy
+
+
+@pytest.mark.parametrize("method, expected_mode", [("get", None), ("post", "IMMEDIATE")])
+def test_middleware_sets_the_mode_for_the_view_and_restores_it(immediate_mode, method, expected_mode):
+    seen = []
+
+    def view(request):
+        seen.append(connection.transaction_mode)
+        return HttpResponse()
+
+    def get_response(request):
+        # Django calls process_view, then the (atomic) view.
+        middleware.process_view(request, view, (), {})
+        return view(request)
+
+    middleware = TransactionPolicyMiddleware(get_response)
+    middleware(getattr(RequestFactory(), method)("/"))
+
+    assert seen == [expected_mode]
+    assert connection.transaction_mode == "IMMEDIATE"
+
+
+def test_connections_opened_during_a_read_request_start_deferred(immediate_mode):
+    set_read_only_request(True)
+    connection.transaction_mode = "IMMEDIATE"
+
+    connection_created.send(sender=type(connection), connection=connection)
+
+    assert connection.transaction_mode is None
+
+
+def test_benchmark_read_concurrency_reports_each_worker_count():
+    stdout = io.StringIO()
+
+    call_command("benchmark_read_concurrency", workers="1,2", duration=0.1, rows=100, hold_ms=0, stdout=stdout)
+
+    lines = stdout.getvalue().splitlines()
+    assert "IMMEDIATE" in lines[0] and "DEFERRED" in lines[0]
+    assert [line.split()[0] for line in lines[1:]] == ["1", "2"]
@@ -4,12 +4,13 @@ from django.http import JsonResponse
 from django.shortcuts import render
 from rest_framework import viewsets
 
-from app.models import Sample, StudyIdentifier
+from app.models import Sample
 from app.serializers import (
     MultipleSampleSerializer,
     SampleIsUsedSerializer,
     SampleLocationSerializer,
 )
+from core.autocomplete import location_index, parse_limit, study_id_index, sublocation_index
 
 #############################################################################
 # AUTOCOMPLETE/AJAX SECTION #################################################
@@ -19,48 +20,20 @@ from app.serializers import (
 @login_required(login_url="/login/")
 def autocomplete_locations(request):
     # Helps speed up sample adding by autocompleting already existing locations
-    if "term" in request.GET:
-        qs = (
-            Sample.objects.filter(sample_location__icontains=request.GET.get("term"))
-            .order_by()
-            .values("sample_location")
-            .distinct()
-        )
-    else:
-        qs = Sample.objects.all().order_by().values("sample_location").distinct()
-    locations = []
-    for sample in qs:
-        locations.append(sample["sample_location"])
+    locations = location_index.search(request.GET.get("term"), parse_limit(request.GET.get("limit")))
     return JsonResponse(locations, safe=False)
 
 
 @login_required(login_url="/login/")
 def autocomplete_sublocations(request):
-    if "term" in request.GET:
-        qs = (
-            Sample.objects.filter(sample_sublocation__icontains=request.GET.get("term"))
-            .order_by()
-            .values("sample_sublocation")
-            .distinct()
-        )
-    else:
-        qs = Sample.objects.all().order_by().values("sample_sublocation").distinct()
-    sublocations = []
-    for sample in qs:
-        sublocations.append(sample["sample_sublocation"])
+    sublocations = sublocation_index.search(request.GET.get("term"), parse_limit(request.GET.get("limit")))
     return JsonResponse(sublocations, safe=False)
 
 
 @login_required(login_url="/login/")
 def autocomplete_study_id(request):
     # Helps speed up sample adding by locating existing study IDs
-    if "term" in request.GET:
-        qs = StudyIdentifier.objects.filter(name__icontains=request.GET.get("term")).values("name")
-    else:
-        qs = StudyIdentifier.objects.all().values("name")
-    patients = []
-    for study_id in qs:
-        patients.append(study_id["name"])
+    patients = study_id_index.search(request.GET.get("term"), parse_limit(request.GET.get("limit")))
     return JsonResponse(patients, safe=False)
 
 
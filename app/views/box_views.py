@@ -11,8 +11,9 @@ from django.views.generic import CreateView, DeleteView, DetailView, ListView, U
 
 from app.filters import BasicScienceBoxFilter, ExperimentFilter
 from app.forms import BasicScienceBoxForm, ExperimentForm
-from app.models import BasicScienceBox, Experiment
-from core.utils.export import export_csv
+from app.models import BasicScienceBox, BasicScienceSampleType, Experiment, TissueType
+from core.counts import CachedCountPaginator
+from core.utils.export import stream_csv
 from core.utils.history import historical_changes
 
 EXPERIMENT_PREFETCH = Prefetch(
@@ -20,6 +21,9 @@ EXPERIMENT_PREFETCH = Prefetch(
     queryset=Experiment.objects.prefetch_related("sample_types", "tissue_types"),
 )
 
+# Models the box list filters read; a change to any of them invalidates cached list counts.
+BOX_COUNT_MODELS = (BasicScienceBox, Experiment, BasicScienceSampleType, TissueType)
+
 
 class BasicScienceBoxDetailView(LoginRequiredMixin, PermissionRequiredMixin, DetailView):
     model = BasicScienceBox
@@ -55,6 +59,7 @@ class BasicScienceBoxListView(LoginRequiredMixin, PermissionRequiredMixin, ListV
     template_name = "boxes/box_list.html"
     context_object_name = "boxes"
     paginate_by = 20
+    paginator_class = CachedCountPaginator
     permission_required = "app.view_basicsciencebox"
 
     def get_queryset(self):
@@ -69,7 +74,7 @@ class BasicScienceBoxListView(LoginRequiredMixin, PermissionRequiredMixin, ListV
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["box_count"] = self.get_queryset().count()
+        context["box_count"] = context["paginator"].count
         return context
 
 
@@ -229,7 +234,7 @@ def export_boxes_csv(request):
             .select_related("created_by", "last_modified_by")
         )
 
-    return export_csv(queryset, file_prefix="gtrac", file_name="basic_science_boxes")
+    return stream_csv(queryset, file_prefix="gtrac", file_name="basic_science_boxes")
 
 
 @login_required(login_url="/login/")
@@ -242,11 +247,12 @@ def box_filter(request):
     )
     box_filter = BasicScienceBoxFilter(request.GET, queryset=queryset)
     box_list = box_filter.qs
-    box_count = box_list.count()
 
     # Pagination
+    # Using same pagination size as BasicScienceBoxListView
+    paginator = CachedCountPaginator(box_list, 25, count_models=BOX_COUNT_MODELS)
+    box_count = paginator.count
     page = request.GET.get("page", 1)
-    paginator = Paginator(box_list, 25)  # Using same pagination size as BasicScienceBoxListView
     try:
         boxes = paginator.page(page)
     except PageNotAnInteger:
@@ -281,7 +287,7 @@ def box_filter_export_csv(request):
     )
     box_filter = BasicScienceBoxFilter(request.GET, queryset=queryset)
     box_list = box_filter.qs
-    return export_csv(box_list, file_prefix="gtrac", file_name="filtered_basic_science_boxes")
+    return stream_csv(box_list, file_prefix="gtrac", file_name="filtered_basic_science_boxes")
 
 
 def serialize_experiment(experiment: Experiment) -> dict:
@@ -527,7 +533,7 @@ def export_experiments_csv(request):
             .select_related("created_by", "last_modified_by")
         )
 
-    return export_csv(queryset, file_prefix="gtrac", file_name="experiments")
+    return stream_csv(queryset, file_prefix="gtrac", file_name="experiments")
 
 
 @login_required(login_url="/login/")
@@ -579,4 +585,4 @@ def experiment_filter_export_csv(request):
     )
     experiment_filter = ExperimentFilter(request.GET, queryset=queryset)
     experiments = experiment_filter.qs
-    return export_csv(experiments, file_prefix="gtrac", file_name="filtered_experiments")
+    return stream_csv(experiments, file_prefix="gtrac", file_name="filtered_experiments")
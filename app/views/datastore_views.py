@@ -13,7 +13,8 @@ from app.filters import DataStoreFilter
 from app.forms import DataStoreForm, DataStoreUpdateForm
 from app.models import DataStore, file_generate_name
 from core.services.storage import azure_delete_file, azure_generate_download_link
-from core.utils.export import export_csv
+from core.transactions import write_transaction
+from core.utils.export import stream_csv
 from core.utils.history import historical_changes
 
 DATASTORE_PAGINATION_SIZE = settings.DATASTORE_PAGINATION_SIZE
@@ -120,6 +121,7 @@ def datastore_azure_view(request, id):
 
 @login_required()
 @permission_required("app.view_datastore", raise_exception=True)
+@write_transaction
 def datastore_delete_view(request, id):
     file = get_object_or_404(DataStore, id=id)
     if (
@@ -206,7 +208,7 @@ def datastore_search_export_csv(request):
         )
     else:
         queryset = DataStore.objects.all()
-    return export_csv(queryset, file_prefix="gtrac", file_name="files")
+    return stream_csv(queryset, file_prefix="gtrac", file_name="files")
 
 
 @login_required()
@@ -215,4 +217,4 @@ def datastore_filter_export_csv(request):
     queryset = DataStore.objects.all()
     datastore_filter = DataStoreFilter(request.GET, queryset=queryset)
     datastore_list = datastore_filter.qs
-    return export_csv(datastore_list, file_prefix="filtered", file_name="files")
+    return stream_csv(datastore_list, file_prefix="filtered", file_name="files")
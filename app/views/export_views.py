@@ -4,7 +4,8 @@ from django.db.models import Q
 from django.shortcuts import render
 
 from app.models import Sample
-from core.utils.export import export_csv
+from core.snapshots import tolerates_staleness
+from core.utils.export import stream_csv
 from core.utils.queries import queryset_by_study_name
 
 User = get_user_model()
@@ -16,6 +17,7 @@ def data_export(request):
 
 
 @login_required(login_url="/login/")
+@tolerates_staleness
 def export_csv_view(request, study_name):
     """
     Takes in study_name parameter and returns csv file with relevant samples.
@@ -37,23 +39,25 @@ def export_csv_view(request, study_name):
         ).select_related("study_id")
     else:
         samples_queryset = queryset
-    response = export_csv(samples_queryset)
+    response = stream_csv(samples_queryset)
     return response
 
 
 @login_required(login_url="/login/")
 def export_users(request):
     queryset = User.objects.all()
-    return export_csv(queryset, file_prefix="users")
+    return stream_csv(queryset, file_prefix="users")
 
 
 @login_required(login_url="/login/")
+@tolerates_staleness
 def export_samples(request):
     queryset = Sample.objects.all()
-    return export_csv(queryset, file_prefix="samples")
+    return stream_csv(queryset, file_prefix="samples")
 
 
 @login_required(login_url="/login/")
+@tolerates_staleness
 def export_historical_samples(request):
     queryset = Sample.history.all()
-    return export_csv(queryset, file_prefix="historicalsamples")
+    return stream_csv(queryset, file_prefix="historicalsamples")
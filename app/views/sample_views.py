@@ -2,16 +2,20 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
-from django.db.models import Q
+from django.core.paginator import EmptyPage, PageNotAnInteger
+from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 
 from app.filters import SampleFilter
 from app.forms import CheckoutForm, ReactivateForm, SampleForm, UsedForm
-from app.models import Sample
+from app.models import ClinicalData, Sample, StudyIdentifier
 from core.clinical import get_samples_with_clinical_data
-from core.utils.export import export_csv
+from core.counts import CachedCountPaginator
+from core.search import search_samples
+from core.services.samples import SampleArchiveService
+from core.transactions import write_transaction
+from core.utils.export import stream_csv
 from core.utils.history import historical_changes
 
 # from django.views.decorators.cache import cache_page
@@ -21,16 +25,20 @@ User = get_user_model()
 
 SAMPLE_PAGINATION_SIZE = settings.SAMPLE_PAGINATION_SIZE
 
+# Models the sample list filters read; a change to any of them invalidates cached list counts.
+SAMPLE_COUNT_MODELS = (Sample, StudyIdentifier, ClinicalData)
+
 
 @login_required(login_url="/login/")
 def index(request):
     # Home Page
-    sample_list = get_samples_with_clinical_data(
-        Sample.objects.filter(is_used=False).select_related("study_id").order_by("-sample_datetime")
+    queryset = Sample.objects.filter(is_used=False).select_related("study_id").order_by("-sample_datetime")
+    sample_list = get_samples_with_clinical_data(queryset)
+    paginator = CachedCountPaginator(
+        sample_list, SAMPLE_PAGINATION_SIZE, count_queryset=queryset, count_models=SAMPLE_COUNT_MODELS
     )
-    sample_count = sample_list.count()
+    sample_count = paginator.count
     page = request.GET.get("page", 1)
-    paginator = Paginator(sample_list, SAMPLE_PAGINATION_SIZE)
     try:
         samples = paginator.page(page)
     except PageNotAnInteger:
@@ -50,11 +58,13 @@ def filter(request):
     queryset = Sample.objects.select_related("study_id").all()
     sample_filter = SampleFilter(request.GET, queryset=queryset)
     sample_list = get_samples_with_clinical_data(sample_filter.qs)
-    sample_count = sample_list.count()
 
     # Pagination
+    paginator = CachedCountPaginator(
+        sample_list, SAMPLE_PAGINATION_SIZE, count_queryset=sample_filter.qs, count_models=SAMPLE_COUNT_MODELS
+    )
+    sample_count = paginator.count
     page = request.GET.get("page", 1)
-    paginator = Paginator(sample_list, SAMPLE_PAGINATION_SIZE)
     try:
         samples = paginator.page(page)
     except PageNotAnInteger:
@@ -84,16 +94,18 @@ def filter_export_csv(request):
     queryset = Sample.objects.select_related("study_id").all()
     sample_filter = SampleFilter(request.GET, queryset=queryset)
     sample_list = sample_filter.qs
-    return export_csv(sample_list)
+    return stream_csv(sample_list)
 
 
 @login_required(login_url="/login/")
 def used_samples(request):
     queryset = Sample.objects.filter(is_used=True).select_related("study_id").order_by("-last_modified")
     sample_list = get_samples_with_clinical_data(queryset)
-    sample_count = sample_list.count()
+    paginator = CachedCountPaginator(
+        sample_list, SAMPLE_PAGINATION_SIZE, count_queryset=queryset, count_models=SAMPLE_COUNT_MODELS
+    )
+    sample_count = paginator.count
     page = request.GET.get("page", 1)
-    paginator = Paginator(sample_list, SAMPLE_PAGINATION_SIZE)
     try:
         samples = paginator.page(page)
     except PageNotAnInteger:
@@ -113,17 +125,8 @@ def used_samples_search(request):
     query_string = ""
     if ("q" in request.GET) and request.GET["q"].strip():
         query_string = request.GET.get("q")
-        sample_list = (
-            Sample.objects.filter(is_used=True)
-            .filter(
-                Q(sample_id__icontains=query_string)
-                | Q(study_id__name__icontains=query_string)
-                | Q(sample_location__icontains=query_string)
-                | Q(sample_sublocation__icontains=query_string)
-                | Q(sample_type__icontains=query_string)
-                | Q(sample_comments__icontains=query_string)
-            )
-            .select_related("study_id")
+        sample_list = search_samples(
+            Sample.objects.filter(is_used=True).select_related("study_id"), query_string, rank=True
         )
         sample_count = sample_list.count()
         return render(
@@ -143,22 +146,19 @@ def used_samples_search(request):
         )
 
 
+@transaction.non_atomic_requests
 @login_required(login_url="/login/")
+@write_transaction
 def used_samples_archive_all(request):
     """
     This function will retrieve all used samples and remove their last location.
     This helps to keep the database clean.
+    Runs outside the request transaction so each archived chunk commits on its own.
     """
-    sample_list = Sample.objects.filter(is_used=True).exclude(sample_location="used").select_related("study_id")
-
-    number_of_samples = sample_list.count()
+    number_of_samples = SampleArchiveService.archive_used(user=request.user, user_identifier=request.user.email)
     if number_of_samples == 0:  # if no samples need updating; skip the database update step
         messages.error(request, "No samples to update.")
     else:
-        for sample in sample_list:
-            sample.sample_location = "used"
-            sample.sample_sublocation = ""
-            sample.save()
         messages.success(
             request,
             f"Used samples locations archived successfully. ({number_of_samples} samples updated)",
@@ -244,28 +244,12 @@ def sample_search(request):
     if ("q" in request.GET) and request.GET["q"].strip():
         query_string = request.GET.get("q")
 
-        queryset = (
-            Sample.objects.filter(
-                Q(sample_id__icontains=query_string)
-                | Q(study_id__name__icontains=query_string)
-                | Q(sample_location__icontains=query_string)
-                | Q(sample_sublocation__icontains=query_string)
-                | Q(sample_type__icontains=query_string)
-                | Q(sample_comments__icontains=query_string)
-            )
-            .filter(is_used=False)
-            .select_related("study_id")
-        )
+        queryset = Sample.objects.filter(is_used=False).select_related("study_id")
 
         if ("include_used_samples" in request.GET) and request.GET["include_used_samples"].strip():
-            queryset = Sample.objects.filter(
-                Q(sample_id__icontains=query_string)
-                | Q(study_id__name__icontains=query_string)
-                | Q(sample_location__icontains=query_string)
-                | Q(sample_sublocation__icontains=query_string)
-                | Q(sample_type__icontains=query_string)
-                | Q(sample_comments__icontains=query_string)
-            )
+            queryset = Sample.objects.select_related("study_id")
+
+        queryset = search_samples(queryset, query_string, rank=True)
 
         sample_list = get_samples_with_clinical_data(queryset)
 
@@ -16,7 +16,9 @@ from rest_framework.response import Response
 
 from app.forms import StudyIdUpdateForm
 from app.models import StudyIdentifier
+from core.counts import CachedCountPaginator
 from core.services.imports import StudyIdentifierImportService
+from core.transactions import write_transaction
 from core.utils.history import historical_changes
 
 STUDY_ID_PAGINATION_SIZE = settings.STUDY_ID_PAGINATION_SIZE
@@ -101,10 +103,10 @@ def import_study_identifiers(request):
 def study_id_list_view(request):
     # Get all StudyIdentifiers with related samples and files in a single query
     study_id_list = StudyIdentifier.objects.all().prefetch_related("samples", "files")
-    study_id_list_count = study_id_list.count()
+    paginator = CachedCountPaginator(study_id_list, STUDY_ID_PAGINATION_SIZE)
+    study_id_list_count = paginator.count
 
     page = request.GET.get("page", 1)
-    paginator = Paginator(study_id_list, STUDY_ID_PAGINATION_SIZE)
     try:
         study_id_list = paginator.page(page)
     except PageNotAnInteger:
@@ -178,6 +180,7 @@ def study_id_search_view(request):
 
 
 @staff_member_required
+@write_transaction
 def study_id_delete_view(request, id):
     study_id = get_object_or_404(StudyIdentifier, id=id)
     try:
@@ -193,7 +196,7 @@ def study_id_delete_view(request, id):
 def study_id_detail_view(request, name):
     # retrieves sample history and also linked notes both public and private
     study_id = get_object_or_404(StudyIdentifier, name=name)
-    study_id_history = study_id.history.filter(name=name)
+    study_id_history = study_id.history.all()
     changes = historical_changes(study_id_history)
     first_change = study_id_history.first()
     return render(
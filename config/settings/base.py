@@ -41,6 +41,24 @@ DATABASES = {
         },
     }
 }
+# Read-only copy of the database for views that tolerate stale data (core.snapshots), rebuilt by
+# `manage.py refresh_db_snapshot`. Without DB_SNAPSHOT_PATH every read goes to the default database.
+DB_SNAPSHOT_PATH = env("DB_SNAPSHOT_PATH", default="")  # type:ignore
+DB_SNAPSHOT_MAX_AGE = env.int("DB_SNAPSHOT_MAX_AGE", default=15 * 60)  # type:ignore
+if DB_SNAPSHOT_PATH:
+    DATABASES["snapshot"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        # immutable: the file is only ever replaced whole, never written, so readers can skip locking.
+        "NAME": f"file:{DB_SNAPSHOT_PATH}?mode=ro&immutable=1",
+        "OPTIONS": {
+            "init_command": "PRAGMA query_only = ON;PRAGMA temp_store = MEMORY;PRAGMA mmap_size = 134217728;",
+        },
+        "TEST": {"MIRROR": "default"},
+    }
+DATABASE_ROUTERS = ["core.snapshots.SnapshotRouter"]
+# SQLite maintenance (core.maintenance): `manage.py dbmaintain`, or every DB_MAINTENANCE_INTERVAL_HOURS in-process.
+DB_MAINTENANCE_INTERVAL_HOURS = env.float("DB_MAINTENANCE_INTERVAL_HOURS", default=0)  # type:ignore
+DB_MAINTENANCE_STEP_BUDGET = env.int("DB_MAINTENANCE_STEP_BUDGET", default=60)  # type:ignore
 
 DJANGO_APPS = [
     "django.contrib.admin",
@@ -90,6 +108,9 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "simple_history.middleware.HistoryRequestMiddleware",
+    # Must see the view before ATOMIC_REQUESTS opens its transaction; see core.transactions.
+    "core.transactions.TransactionPolicyMiddleware",
+    "core.snapshots.SnapshotReadMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -162,6 +183,20 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 MEDIA_URL = "/files/"
 
 
+# STORAGES
+# ------------------------------------------------------------------------------
+# "dbbackups" receives `manage.py backup_db` uploads (core.backups); settings that replace STORAGES keep it.
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+    "dbbackups": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {"location": str(BASE_DIR / "db_backups")},
+    },
+}
+DB_BACKUP_STORAGE = "dbbackups"
+
+
 # EMAIL
 # ------------------------------------------------------------------------------
 DEFAULT_FROM_EMAIL = "G-Trac Support <support@musicstudy.uk>"
@@ -191,12 +226,17 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:8000",
 ]
 CORS_ALLOW_CREDENTIALS = True
+CORS_EXPOSE_HEADERS = ["X-Snapshot-Age"]
 
 DATA_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100MB
 
 # App Configuration
 SAMPLE_PAGINATION_SIZE = 100
+# Group-commit single-sample scan updates (core.services.coalescer). Requests only share a batch when they run in
+# the same process, so this pays off with threaded gunicorn workers (--threads).
+SAMPLE_SCAN_COALESCING = env.bool("SAMPLE_SCAN_COALESCING", default=False)  # type:ignore
+SAMPLE_SCAN_COALESCE_WINDOW_MS = env.int("SAMPLE_SCAN_COALESCE_WINDOW_MS", default=5)  # type:ignore
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "G-Trac API",
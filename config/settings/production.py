@@ -91,11 +91,24 @@ SECURE_CONTENT_TYPE_NOSNIFF = env.bool(
 
 # AWS
 # ------------------------------------------------------------------------------
-# Used for SES service only at this time. Previously S3 was also used.
+# Used for SES and for database backups.
 AWS_ACCESS_KEY_ID = env("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = env("AWS_SECRET_ACCESS_KEY")
 AWS_REGION_NAME = "eu-west-2"
 
+# Database backups (`manage.py backup_db`) go to S3.
+STORAGES["dbbackups"] = {
+    "BACKEND": "storages.backends.s3.S3Storage",
+    "OPTIONS": {
+        "bucket_name": env("AWS_BACKUP_BUCKET", default="musicsamplesdbbackup"),  # type:ignore
+        "location": env("AWS_BACKUP_PREFIX", default="musicsamples"),  # type:ignore
+        "access_key": AWS_ACCESS_KEY_ID,
+        "secret_key": AWS_SECRET_ACCESS_KEY,
+        "region_name": env("AWS_DEFAULT_REGION", default=AWS_REGION_NAME),  # type:ignore
+        "file_overwrite": False,
+    },
+}
+
 # EMAIL
 # ------------------------------------------------------------------------------
 EMAIL_BACKEND = "anymail.backends.amazon_ses.EmailBackend"
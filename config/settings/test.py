@@ -6,6 +6,7 @@ DATABASES = {
         "NAME": ":memory:",
     }
 }
+DB_SNAPSHOT_PATH = ""
 
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
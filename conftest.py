@@ -0,0 +1,9 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Data versions and cached payloads live in the cache, which outlives each test's database rollback."""
+    cache.clear()
+    yield
@@ -0,0 +1,162 @@
+# core/autocomplete.py
+# Serves location, sublocation and study ID suggestions from sorted in-memory indexes instead of DISTINCT scans.
+# Exists because autocomplete fires on every keystroke and the value sets are small enough to keep per worker.
+
+import time
+from bisect import bisect_left, insort
+
+from django.core.cache import cache
+
+DEFAULT_SUGGESTION_LIMIT = 20
+MAX_SUGGESTION_LIMIT = 100
+
+# Values are only ever added incrementally; removals (deletes, renames, moved samples) are picked up by a full
+# rebuild once this long has passed since the previous one, however many values were added in between.
+INDEX_REBUILD_INTERVAL = 60 * 60
+# Times add() retries after losing a publish race to another worker before leaving its values to the next rebuild.
+PUBLISH_ATTEMPTS = 5
+
+
+class AutocompleteIndex:
+    """
+    Case-insensitive prefix and substring index over the distinct values of one column.
+
+    The shared cache holds the current revision number with its rebuild deadline, and the value list of each
+    revision; each worker keeps a local copy and only reloads it when the revision changes, so a lookup costs one
+    cache read plus a bisect and scan.
+    """
+
+    def __init__(self, name, loader):
+        self.name = name
+        self._loader = loader
+        self._revision = None
+        self._values = []
+        self._folded = []
+        self._known = set()
+
+    @property
+    def _state_key(self):
+        return f"autocomplete:{self.name}:state"
+
+    def _values_key(self, revision):
+        return f"autocomplete:{self.name}:values:{revision}"
+
+    def _successor_key(self, revision):
+        return f"autocomplete:{self.name}:successor:{revision}"
+
+    def _load(self, values, revision):
+        self._values = values
+        self._folded = [value.casefold() for value in values]
+        self._known = set(values)
+        self._revision = revision
+
+    def _publish(self, values, rebuild_at, base=None):
+        """
+        Publish ``values`` as a new revision. Returns False, publishing nothing, when ``base`` is given and another
+        worker has already published a successor of it.
+
+        Claiming the successor with ``cache.add`` makes concurrent read-modify-write updates of one revision a
+        compare-and-set: only the first wins, and the others re-read and merge into its values. Rebuilds publish
+        unconditionally, since they read every committed value from the table.
+        """
+        revision = time.time_ns()
+        if base is not None and not cache.add(self._successor_key(base), revision, INDEX_REBUILD_INTERVAL * 2):
+            return False
+        # Every revision's values outlive its rebuild deadline, so a current revision never lacks its values.
+        cache.set(self._values_key(revision), values, INDEX_REBUILD_INTERVAL * 2)
+        cache.set(self._state_key, (revision, rebuild_at), None)
+        self._load(values, revision)
+        return True
+
+    def rebuild(self):
+        self._publish(
+            sorted({value for value in self._loader() if value}, key=lambda value: (value.casefold(), value)),
+            rebuild_at=time.time() + INDEX_REBUILD_INTERVAL,
+        )
+
+    def sync(self, state=None):
+        state = state or cache.get(self._state_key)
+        if state is None or time.time() >= state[1]:
+            self.rebuild()
+            return
+        revision = state[0]
+        if revision != self._revision:
+            values = cache.get(self._values_key(revision))
+            if values is None:
+                self.rebuild()
+            else:
+                self._load(values, revision)
+
+    def add(self, *values):
+        """
+        Insert newly seen values, keeping the list sorted. Called from model signals and bulk write paths.
+        """
+        for _ in range(PUBLISH_ATTEMPTS):
+            state = cache.get(self._state_key)
+            if state is None or time.time() >= state[1]:
+                # Nothing is published yet (or it is due a rebuild); the next lookup rebuilds from the table anyway.
+                return
+            self.sync(state)
+            new_values = {value for value in values if value and value not in self._known}
+            if not new_values:
+                return
+            merged = list(self._values)
+            for value in new_values:
+                insort(merged, value, key=lambda item: (item.casefold(), item))
+            if self._publish(merged, rebuild_at=state[1], base=state[0]):
+                return
+        # Still losing to other workers: the values are in the table, so the next rebuild picks them up.
+
+    def search(self, term=None, limit=DEFAULT_SUGGESTION_LIMIT):
+        """
+        Return up to ``limit`` values containing ``term``, prefix matches first, each group in sorted order.
+        """
+        self.sync()
+        limit = max(1, min(limit, MAX_SUGGESTION_LIMIT))
+        if not term:
+            return self._values[:limit]
+
+        folded_term = term.casefold()
+        results = []
+        index = bisect_left(self._folded, folded_term)
+        while index < len(self._folded) and len(results) < limit and self._folded[index].startswith(folded_term):
+            results.append(self._values[index])
+            index += 1
+        if len(results) < limit:
+            for folded, value in zip(self._folded, self._values):
+                if folded_term in folded and not folded.startswith(folded_term):
+                    results.append(value)
+                    if len(results) >= limit:
+                        break
+        return results
+
+
+def _distinct_values(model_name, field_name):
+    def load():
+        from django.apps import apps
+
+        model = apps.get_model("app", model_name)
+        return model.objects.order_by().values_list(field_name, flat=True).distinct()
+
+    return load
+
+
+location_index = AutocompleteIndex("sample_location", _distinct_values("Sample", "sample_location"))
+sublocation_index = AutocompleteIndex("sample_sublocation", _distinct_values("Sample", "sample_sublocation"))
+study_id_index = AutocompleteIndex("study_id", _distinct_values("StudyIdentifier", "name"))
+
+
+def parse_limit(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_SUGGESTION_LIMIT
+
+
+def index_samples(samples):
+    """
+    Add the locations of saved samples to the indexes; used where bulk writes bypass post_save.
+    """
+    samples = list(samples)
+    location_index.add(*(sample.sample_location for sample in samples))
+    sublocation_index.add(*(sample.sample_sublocation for sample in samples))
@@ -0,0 +1,204 @@
+# core/backups.py
+# Takes consistent, gzip-compressed online backups of the SQLite database, optionally as page-level deltas.
+# Exists because copying the live WAL database file misses commits still in the -wal file and re-uploads every page.
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import struct
+import tempfile
+from contextlib import closing
+from pathlib import Path
+
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from core.snapshots import BACKUP_PAGES_PER_STEP, BACKUP_STEP_PAUSE, online_backup
+
+FULL_BACKUP = "full"
+DELTA_BACKUP = "delta"
+MANIFEST_DIR = "manifests"
+# Deltas chained on one full backup before the next backup is full again, so a restore never replays too many.
+MAX_DELTA_CHAIN = 6
+PAGE_DIGEST_SIZE = 16
+DELTA_MAGIC = b"GTRACDELTA1\n"
+# Page size and page count of the database a delta produces, then (page number, page) records until the end.
+DELTA_HEADER = struct.Struct(">IQ")
+DELTA_PAGE_NUMBER = struct.Struct(">Q")
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def _page_digest(page):
+    return hashlib.blake2b(page, digest_size=PAGE_DIGEST_SIZE).digest()
+
+
+def _iter_pages(path, page_size):
+    with open(path, "rb") as database:
+        while page := database.read(page_size):
+            yield page
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        while chunk := source.read(COPY_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _upload(storage, name, path):
+    with open(path, "rb") as source:
+        saved = storage.save(name, File(source, name=os.path.basename(name)))
+    if saved != name:
+        raise ValueError(f"Backup storage already holds {name}.")
+    return saved
+
+
+def _download(storage, name, directory, sha256):
+    """
+    Copy a stored file to ``directory`` and check it against its manifest checksum. Returns the local path.
+    """
+    path = os.path.join(directory, os.path.basename(name))
+    with storage.open(name, "rb") as source, open(path, "wb") as target:
+        shutil.copyfileobj(source, target, COPY_CHUNK_SIZE)
+    if _file_sha256(path) != sha256:
+        raise ValueError(f"Checksum mismatch for {name}.")
+    return path
+
+
+def read_manifest(storage, name):
+    with storage.open(f"{MANIFEST_DIR}/{name}.json", "rb") as manifest:
+        return json.load(manifest)
+
+
+def latest_manifest(storage):
+    """
+    Return the manifest of the newest complete backup in ``storage``, or None when it holds none.
+    """
+    try:
+        _, files = storage.listdir(MANIFEST_DIR)
+    except FileNotFoundError:
+        return None
+    names = sorted(name.removesuffix(".json") for name in files if name.endswith(".json"))
+    return read_manifest(storage, names[-1]) if names else None
+
+
+def backup_database(
+    source_path,
+    storage,
+    delta=False,
+    max_chain=MAX_DELTA_CHAIN,
+    pages=BACKUP_PAGES_PER_STEP,
+    pause=BACKUP_STEP_PAUSE,
+):
+    """
+    Back up the SQLite database at ``source_path`` to a Django storage and return the backup's manifest.
+
+    The database is copied with the online backup API (see ``core.snapshots.online_backup``), checked with
+    ``PRAGMA quick_check`` and streamed through gzip a page at a time. With ``delta`` only the pages that differ
+    from the latest backup in ``storage`` are uploaded, unless that chain already holds ``max_chain`` deltas or the
+    page size changed. Each backup stores its compressed file, its page digests (for the next delta) and, last, a
+    JSON manifest with checksums; a backup without a manifest is incomplete and ignored.
+    """
+    name = timezone.now().strftime("%Y%m%dT%H%M%S%fZ")
+    with tempfile.TemporaryDirectory() as directory:
+        copy_path = os.path.join(directory, "backup.sqlite3")
+        page_count = online_backup(str(source_path), copy_path, pages=pages, pause=pause)
+        with closing(sqlite3.connect(copy_path)) as copy:
+            check = copy.execute("PRAGMA quick_check").fetchone()[0]
+            page_size = copy.execute("PRAGMA page_size").fetchone()[0]
+        if check != "ok":
+            raise ValueError(f"The backup copy failed PRAGMA quick_check: {check}")
+
+        previous = latest_manifest(storage) if delta else None
+        base_digests = None
+        if previous and previous["page_size"] == page_size and previous["chain_length"] < max_chain:
+            with storage.open(previous["page_digests"], "rb") as stored, gzip.open(stored) as digests:
+                base_digests = digests.read()
+        kind = DELTA_BACKUP if base_digests is not None else FULL_BACKUP
+
+        blob_name = f"{kind}/{name}.{'sqlite3' if kind == FULL_BACKUP else 'delta'}.gz"
+        blob_path = os.path.join(directory, "blob.gz")
+        database_sha256 = hashlib.sha256()
+        digests = bytearray()
+        written_pages = 0
+        with gzip.open(blob_path, "wb") as blob:
+            if kind == DELTA_BACKUP:
+                blob.write(DELTA_MAGIC + DELTA_HEADER.pack(page_size, page_count))
+            for number, page in enumerate(_iter_pages(copy_path, page_size)):
+                database_sha256.update(page)
+                digest = _page_digest(page)
+                digests += digest
+                if kind == FULL_BACKUP:
+                    blob.write(page)
+                elif base_digests[number * PAGE_DIGEST_SIZE : (number + 1) * PAGE_DIGEST_SIZE] != digest:
+                    blob.write(DELTA_PAGE_NUMBER.pack(number) + page)
+                else:
+                    continue
+                written_pages += 1
+
+        digests_name = f"pages/{name}.digests.gz"
+        manifest = {
+            "name": name,
+            "kind": kind,
+            "created": timezone.now().isoformat(),
+            "base": previous["name"] if kind == DELTA_BACKUP else None,
+            "chain_length": previous["chain_length"] + 1 if kind == DELTA_BACKUP else 0,
+            "page_size": page_size,
+            "page_count": page_count,
+            "written_pages": written_pages,
+            "sha256": database_sha256.hexdigest(),
+            "file": blob_name,
+            "file_size": os.path.getsize(blob_path),
+            "file_sha256": _file_sha256(blob_path),
+            "page_digests": digests_name,
+        }
+        _upload(storage, blob_name, blob_path)
+        storage.save(digests_name, ContentFile(gzip.compress(bytes(digests))))
+        storage.save(f"{MANIFEST_DIR}/{name}.json", ContentFile(json.dumps(manifest, indent=2).encode()))
+    return manifest
+
+
+def _apply_delta(delta, database):
+    if delta.read(len(DELTA_MAGIC)) != DELTA_MAGIC:
+        raise ValueError("Not a database delta.")
+    page_size, page_count = DELTA_HEADER.unpack(delta.read(DELTA_HEADER.size))
+    while number := delta.read(DELTA_PAGE_NUMBER.size):
+        (page_number,) = DELTA_PAGE_NUMBER.unpack(number)
+        database.seek(page_number * page_size)
+        database.write(delta.read(page_size))
+    database.truncate(page_count * page_size)
+
+
+def restore_backup(storage, name, target_path):
+    """
+    Rebuild the database of backup ``name`` at ``target_path``: its full backup, then each delta in order.
+
+    Every stored file and the rebuilt database are checked against their manifest checksums before the result
+    replaces ``target_path``. Returns the manifest of ``name``.
+    """
+    chain = [read_manifest(storage, name)]
+    while chain[-1]["kind"] == DELTA_BACKUP:
+        chain.append(read_manifest(storage, chain[-1]["base"]))
+
+    target_path = Path(target_path)
+    partial_path = target_path.with_name(f".{target_path.name}.partial")
+    with tempfile.TemporaryDirectory() as directory:
+        with open(partial_path, "wb") as database:
+            for manifest in reversed(chain):
+                blob_path = _download(storage, manifest["file"], directory, manifest["file_sha256"])
+                with gzip.open(blob_path, "rb") as blob:
+                    if manifest["kind"] == FULL_BACKUP:
+                        shutil.copyfileobj(blob, database, COPY_CHUNK_SIZE)
+                    else:
+                        _apply_delta(blob, database)
+                os.remove(blob_path)
+    if _file_sha256(partial_path) != chain[0]["sha256"]:
+        partial_path.unlink()
+        raise ValueError(f"The restored database does not match the checksum of backup {name}.")
+    os.replace(partial_path, target_path)
+    return chain[0]
@@ -1,12 +1,23 @@
 # /Users/chershiongchuah/Developer/musicsamples/core/clinical.py
 # This module contains functions for retrieving clinical data for samples.
-# It handles study-specific matching logic for clinical data queries.
+# It handles study-specific matching logic and maintains the persisted sample -> clinical data link.
 
-from django.db import models
-from django.db.models import Case, OuterRef, Subquery, When
-from django.db.models.functions import Lower
+import threading
+from contextlib import contextmanager
+
+from django.db.models import Case, F, When
+from django.utils import timezone
 
 from app.models import ClinicalData
+from core.versions import bump_data_version
+
+CLINICAL_VALUE_FIELDS = ("crp", "calprotectin")
+CLINICAL_MUSIC_ONLY_FIELDS = ("endoscopic_mucosal_healing_at_3_6_months", "endoscopic_mucosal_healing_at_12_months")
+
+# Sample fields that feed the matching rule; saving any of them re-resolves the link.
+LINK_SOURCE_FIELDS = ("study_id", "sample_datetime", "music_timepoint")
+
+_deferred = threading.local()
 
 
 def get_sample_with_clinical_data(sample):
@@ -55,58 +66,143 @@ def get_sample_with_clinical_data(sample):
         return None
 
 
-def get_samples_with_clinical_data(queryset):
+def _match_key(study_name, sample_datetime, music_timepoint):
     """
-    Annotate a queryset of samples with clinical data using study-specific matching
+    Return the (kind, value) lookup used to find a sample's clinical record, or None when it cannot match.
+
+    GI-DAMPs and unknown studies match on sample date; MUSIC and Mini-MUSIC match on timepoint.
     """
-    # First, annotate with sample_date for joining
-    samples_with_date = queryset.annotate(
-        sample_date=models.functions.TruncDate("sample_datetime"), study_name_lower=Lower("study_id__study_name")
-    )
+    study_name = (study_name or "").lower()
+    if "music" in study_name and "gidamps" not in study_name:
+        return ("timepoint", music_timepoint) if music_timepoint else None
+    if sample_datetime is None:
+        return None
+    if timezone.is_naive(sample_datetime):
+        return ("date", sample_datetime.date())
+    return ("date", timezone.localtime(sample_datetime).date())
 
-    # Create a conditional subquery based on study name
-    # For GI-DAMPs - use study_id and sample_date
-    gidamps_clinical_data = ClinicalData.objects.filter(
-        study_id=OuterRef("study_id"), sample_date=OuterRef("sample_date")
-    )
 
-    # For MUSIC/Mini-MUSIC - use study_id and music_timepoint
-    music_clinical_data = ClinicalData.objects.filter(
-        study_id=OuterRef("study_id"), music_timepoint=OuterRef("music_timepoint")
+def resolve_clinical_data_id(sample):
+    """
+    Return the primary key of the clinical record matching a sample, or None.
+    """
+    study_identifier = sample.study_id
+    if study_identifier is None:
+        return None
+    # Unsaved instances may still carry the raw form/serializer value (e.g. an ISO string).
+    sample_datetime = type(sample)._meta.get_field("sample_datetime").to_python(sample.sample_datetime)
+    key = _match_key(study_identifier.study_name, sample_datetime, sample.music_timepoint)
+    if key is None:
+        return None
+    kind, value = key
+    lookup = {"sample_date": value} if kind == "date" else {"music_timepoint": value}
+    return (
+        ClinicalData.objects.filter(study_id=study_identifier.pk, **lookup)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+        .first()
     )
 
-    # Default - use study_id and sample_date
-    default_clinical_data = ClinicalData.objects.filter(
-        study_id=OuterRef("study_id"), sample_date=OuterRef("sample_date")
-    )
 
-    # Annotate with clinical data fields using conditional lookups
-    samples_with_clinical = samples_with_date.annotate(
-        crp=Case(
-            When(study_name_lower__contains="gidamps", then=Subquery(gidamps_clinical_data.values("crp")[:1])),
-            When(study_name_lower__contains="music", then=Subquery(music_clinical_data.values("crp")[:1])),
-            default=Subquery(default_clinical_data.values("crp")[:1]),
-        ),
-        calprotectin=Case(
-            When(
-                study_name_lower__contains="gidamps", then=Subquery(gidamps_clinical_data.values("calprotectin")[:1])
-            ),
-            When(study_name_lower__contains="music", then=Subquery(music_clinical_data.values("calprotectin")[:1])),
-            default=Subquery(default_clinical_data.values("calprotectin")[:1]),
-        ),
-        # Add more fields as needed using the same pattern
-        endoscopic_mucosal_healing_at_3_6_months=Case(
-            When(
-                study_name_lower__contains="music",
-                then=Subquery(music_clinical_data.values("endoscopic_mucosal_healing_at_3_6_months")[:1]),
-            )
-        ),
-        endoscopic_mucosal_healing_at_12_months=Case(
-            When(
-                study_name_lower__contains="music",
-                then=Subquery(music_clinical_data.values("endoscopic_mucosal_healing_at_12_months")[:1]),
-            )
-        ),
+def link_samples_to_clinical_data(sample_queryset, chunk_size=2000) -> int:
+    """
+    Re-resolve the clinical data link for every sample in the queryset and persist changed links in bulk.
+
+    Works with historical (migration) models as well as the live ones. Returns the number of changed samples.
+    """
+    sample_model = sample_queryset.model
+    clinical_model = sample_model._meta.get_field("clinical_data").related_model
+    rows = (
+        sample_queryset.order_by("pk")
+        .values_list(
+            "pk", "study_id", "study_id__study_name", "sample_datetime", "music_timepoint", "clinical_data_id"
+        )
+        .iterator(chunk_size=chunk_size)
     )
 
-    return samples_with_clinical
+    changed = 0
+    chunk = []
+
+    def flush(chunk):
+        study_ids = {row[1] for row in chunk if row[1] is not None}
+        by_key = {}
+        clinical_rows = (
+            clinical_model.objects.filter(study_id__in=study_ids)
+            .order_by("pk")
+            .values_list("pk", "study_id", "sample_date", "music_timepoint")
+        )
+        for clinical_pk, study_id, sample_date, music_timepoint in clinical_rows:
+            # The lowest primary key wins when several records share a key, mirroring the old [:1] subqueries.
+            if sample_date is not None:
+                by_key.setdefault((study_id, "date", sample_date), clinical_pk)
+            if music_timepoint:
+                by_key.setdefault((study_id, "timepoint", music_timepoint), clinical_pk)
+
+        updates = []
+        for pk, study_id, study_name, sample_datetime, music_timepoint, current in chunk:
+            key = None if study_id is None else _match_key(study_name, sample_datetime, music_timepoint)
+            target = by_key.get((study_id, *key)) if key else None
+            if target != current:
+                updates.append(sample_model(pk=pk, clinical_data_id=target))
+        if updates:
+            sample_model.objects.bulk_update(updates, ["clinical_data"], batch_size=500)
+        return len(updates)
+
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            changed += flush(chunk)
+            chunk = []
+    if chunk:
+        changed += flush(chunk)
+    if changed:
+        bump_data_version(sample_model)
+    return changed
+
+
+def relink_study_identifiers(study_identifier_ids) -> int:
+    """
+    Re-resolve links for all samples of the given study identifiers, unless linking is currently deferred.
+    """
+    from app.models import Sample
+
+    study_identifier_ids = {pk for pk in study_identifier_ids if pk is not None}
+    if not study_identifier_ids:
+        return 0
+    pending = getattr(_deferred, "study_identifier_ids", None)
+    if pending is not None:
+        pending.update(study_identifier_ids)
+        return 0
+    return link_samples_to_clinical_data(Sample.objects.filter(study_id__in=study_identifier_ids))
+
+
+@contextmanager
+def deferred_clinical_linking():
+    """
+    Collect relink requests raised inside the block and resolve them once on exit.
+
+    Used by bulk imports so each saved ClinicalData row does not trigger its own relink query.
+    """
+    if getattr(_deferred, "study_identifier_ids", None) is not None:
+        yield
+        return
+    _deferred.study_identifier_ids = set()
+    try:
+        yield
+    finally:
+        pending = _deferred.study_identifier_ids
+        _deferred.study_identifier_ids = None
+    relink_study_identifiers(pending)
+
+
+def get_samples_with_clinical_data(queryset):
+    """
+    Annotate a queryset of samples with clinical values read through the persisted clinical data link.
+    """
+    annotations = {field: F(f"clinical_data__{field}") for field in CLINICAL_VALUE_FIELDS}
+    # Endoscopic outcomes are only reported for MUSIC studies.
+    for field in CLINICAL_MUSIC_ONLY_FIELDS:
+        annotations[field] = Case(
+            When(study_id__study_name__icontains="music", then=F(f"clinical_data__{field}")),
+        )
+    return queryset.annotate(**annotations)
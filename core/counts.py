@@ -0,0 +1,63 @@
+# core/counts.py
+# Caches list counts keyed by the filter's SQL signature and the data versions of the models it depends on.
+# Exists because COUNT(*) over large filtered scopes often costs more than the page itself, on every request.
+
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from core.versions import get_data_versions
+
+COUNT_CACHE_TIMEOUT = 24 * 60 * 60
+COUNT_KEY_PREFIX = "count"
+
+
+def count_signature(queryset) -> str:
+    """
+    Return a stable digest of the queryset's filters, ignoring ordering.
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    return hashlib.sha1(f"{sql}|{params!r}".encode("utf-8")).hexdigest()
+
+
+def cached_count(queryset, models=()) -> int:
+    """
+    Count ``queryset``, reusing the last result while the data versions of ``models`` are unchanged.
+
+    ``models`` must cover every model the filters read (the queryset's own model is always included), since a
+    change to any of them can change the count. Pass the un-annotated base queryset: annotations never change
+    cardinality but their joins still make the COUNT slower.
+    """
+    try:
+        signature = count_signature(queryset)
+    except EmptyResultSet:
+        return 0
+    models = (queryset.model, *(model for model in models if model is not queryset.model))
+    versions = get_data_versions(*models)
+    key = ":".join([COUNT_KEY_PREFIX, queryset.model._meta.label_lower, signature, *map(str, versions)])
+    count = cache.get(key)
+    if count is None:
+        count = queryset.order_by().count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator whose total comes from ``cached_count`` over ``count_queryset`` (defaults to the object list).
+    """
+
+    def __init__(self, object_list, per_page, *args, count_queryset=None, count_models=(), **kwargs):
+        super().__init__(object_list, per_page, *args, **kwargs)
+        self.count_queryset = count_queryset
+        self.count_models = count_models
+
+    @cached_property
+    def count(self):
+        queryset = self.count_queryset if self.count_queryset is not None else self.object_list
+        if not hasattr(queryset, "query"):
+            return super().count
+        return cached_count(queryset, self.count_models)
@@ -0,0 +1,247 @@
+# core/maintenance.py
+# Runs SQLite upkeep (ANALYZE, PRAGMA optimize, incremental vacuum, WAL checkpoint) within per-step time budgets
+# and records database size statistics. Exists because nothing else refreshes planner statistics or trims the WAL.
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.utils import timezone
+
+from app.models import DatabaseMaintenanceRun
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+SKIPPED = "skipped"
+BUSY = "busy"
+TIMED_OUT = "timed_out"
+FAILED = "failed"
+
+# Rows ANALYZE samples per index: approximate statistics, but the step stays quick however large tables grow.
+ANALYSIS_LIMIT = 1000
+# Free pages released per incremental_vacuum statement, so the budget is checked between chunks.
+INCREMENTAL_VACUUM_PAGES = 1000
+# Virtual machine instructions between budget checks while a statement runs.
+BUDGET_CHECK_INTERVAL = 1000
+MAINTENANCE_LOCK_KEY = "core:db-maintenance:lock"
+
+
+@contextmanager
+def time_budget(raw_connection, seconds):
+    """
+    Interrupt whatever ``raw_connection`` runs once ``seconds`` have passed; the statement raises "interrupted".
+    """
+    deadline = time.monotonic() + seconds
+    raw_connection.set_progress_handler(lambda: int(time.monotonic() > deadline), BUDGET_CHECK_INTERVAL)
+    try:
+        yield deadline
+    finally:
+        raw_connection.set_progress_handler(None, 0)
+
+
+def _pragma(raw_connection, name):
+    return raw_connection.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def analyze(raw_connection, deadline):
+    raw_connection.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+    raw_connection.execute("ANALYZE")
+    return OK, {"analysis_limit": ANALYSIS_LIMIT}
+
+
+def optimize(raw_connection, deadline):
+    raw_connection.execute("PRAGMA optimize")
+    return OK, {}
+
+
+def incremental_vacuum(raw_connection, deadline):
+    # Only auto_vacuum=INCREMENTAL databases can hand free pages back without a full VACUUM, which rewrites the
+    # whole file under an exclusive lock and is left to planned downtime.
+    if _pragma(raw_connection, "auto_vacuum") != 2:
+        return SKIPPED, {"reason": "auto_vacuum is not INCREMENTAL"}
+    before = remaining = _pragma(raw_connection, "freelist_count")
+    while remaining and time.monotonic() < deadline:
+        raw_connection.execute(f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES})").fetchall()
+        remaining = _pragma(raw_connection, "freelist_count")
+    return (OK if not remaining else TIMED_OUT), {"freed_pages": before - remaining}
+
+
+def checkpoint(raw_connection, deadline):
+    if _pragma(raw_connection, "journal_mode") != "wal":
+        return SKIPPED, {"reason": "not in WAL mode"}
+    busy, wal_frames, checkpointed_frames = raw_connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    # Busy means a reader or writer kept the WAL from being reset; the frames are still copied where possible.
+    return (BUSY if busy else OK), {"wal_frames": wal_frames, "checkpointed_frames": checkpointed_frames}
+
+
+MAINTENANCE_STEPS = {
+    "analyze": analyze,
+    "optimize": optimize,
+    "incremental_vacuum": incremental_vacuum,
+    "checkpoint": checkpoint,
+}
+
+
+def _wal_bytes(connection):
+    if connection.is_in_memory_db():
+        return None
+    try:
+        return os.path.getsize(f"{connection.settings_dict['NAME']}-wal")
+    except FileNotFoundError:
+        return 0
+
+
+def _table_sizes(raw_connection, budget):
+    """
+    Return {table: (table bytes, index bytes)} from the dbstat virtual table, or {} when it is unavailable or
+    reading it overruns ``budget`` seconds.
+    """
+    owners = dict(raw_connection.execute("SELECT name, tbl_name FROM sqlite_master WHERE type IN ('table', 'index')"))
+    sizes = {}
+    try:
+        with time_budget(raw_connection, budget):
+            rows = raw_connection.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    for name, size in rows:
+        table = owners.get(name, name)
+        table_bytes, index_bytes = sizes.get(table, (0, 0))
+        if table == name:
+            sizes[table] = (table_bytes + size, index_bytes)
+        else:
+            sizes[table] = (table_bytes, index_bytes + size)
+    return sizes
+
+
+def _row_estimates(raw_connection):
+    """
+    Return {table: rows} from the statistics ANALYZE leaves in sqlite_stat1 (empty before the first ANALYZE).
+    """
+    try:
+        rows = raw_connection.execute("SELECT tbl, stat FROM sqlite_stat1").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    estimates = {}
+    for table, stat in rows:
+        count = int(stat.split()[0]) if stat else 0
+        estimates[table] = max(estimates.get(table, 0), count)
+    return estimates
+
+
+def collect_database_stats(connection, budget):
+    """
+    Return page size, page count, free pages, WAL size and per-table row and byte estimates of a SQLite connection.
+    """
+    connection.ensure_connection()
+    raw_connection = connection.connection
+    tables = [
+        name
+        for (name,) in raw_connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )
+    ]
+    sizes = _table_sizes(raw_connection, budget)
+    rows = _row_estimates(raw_connection)
+    table_stats = [
+        {
+            "name": name,
+            "rows": rows.get(name),
+            "bytes": sizes[name][0] if name in sizes else None,
+            "index_bytes": sizes[name][1] if name in sizes else None,
+        }
+        for name in tables
+    ]
+    table_stats.sort(key=lambda table: (table["bytes"] is None, -(table["bytes"] or 0), table["name"]))
+    return {
+        "page_size": _pragma(raw_connection, "page_size"),
+        "page_count": _pragma(raw_connection, "page_count"),
+        "freelist_count": _pragma(raw_connection, "freelist_count"),
+        "wal_bytes": _wal_bytes(connection),
+        "tables": table_stats,
+    }
+
+
+def run_maintenance(steps=tuple(MAINTENANCE_STEPS), budget=None, using=DEFAULT_DB_ALIAS):
+    """
+    Run the named maintenance steps, each within ``budget`` seconds, then record a DatabaseMaintenanceRun.
+
+    A step that overruns its budget is interrupted and recorded as timed out; a failing step is recorded with its
+    error and the remaining steps still run.
+    """
+    budget = budget or settings.DB_MAINTENANCE_STEP_BUDGET
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        raise ValueError("Database maintenance only supports SQLite.")
+
+    started, clock = timezone.now(), time.monotonic()
+    connection.ensure_connection()
+    raw_connection = connection.connection
+    results = []
+    for name in steps:
+        step_clock = time.monotonic()
+        try:
+            with time_budget(raw_connection, budget) as deadline:
+                status, details = MAINTENANCE_STEPS[name](raw_connection, deadline)
+        except sqlite3.Error as exc:
+            status, details = (TIMED_OUT, {}) if "interrupted" in str(exc) else (FAILED, {"error": str(exc)})
+        results.append({"step": name, "status": status, "seconds": round(time.monotonic() - step_clock, 3), **details})
+
+    stats = collect_database_stats(connection, budget)
+    return DatabaseMaintenanceRun.objects.using(using).create(
+        started=started, duration=round(time.monotonic() - clock, 3), steps=results, **stats
+    )
+
+
+class MaintenanceScheduler:
+    """
+    Runs ``run_maintenance`` every ``interval`` seconds from a daemon thread.
+
+    Every web process has one; a cache lock held for the interval makes only the first process to wake up run it.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="db-maintenance", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            if not cache.add(MAINTENANCE_LOCK_KEY, os.getpid(), timeout=self.interval):
+                continue
+            # The thread outlives requests, so it recycles its connection the way request_started/finished do.
+            close_old_connections()
+            try:
+                run_maintenance()
+            except Exception:
+                logger.exception("Scheduled database maintenance failed.")
+            finally:
+                close_old_connections()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_maintenance_scheduler():
+    """
+    Start this process's scheduler once, when DB_MAINTENANCE_INTERVAL_HOURS is set; return it, or None when off.
+    """
+    global _scheduler
+    if _scheduler is not None or not settings.DB_MAINTENANCE_INTERVAL_HOURS:
+        return _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = MaintenanceScheduler(interval=settings.DB_MAINTENANCE_INTERVAL_HOURS * 3600)
+            _scheduler.start()
+        return _scheduler
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from core.services.samples import SAMPLE_BATCH_SIZE, SampleArchiveService
+
+
+class Command(BaseCommand):
+    help = "Moves every used sample to the 'used' location in short chunked transactions, reporting progress."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=SAMPLE_BATCH_SIZE)
+        parser.add_argument("--user-identifier", default="", help="Recorded as last_modified_by on archived samples.")
+
+    def handle(self, *args, **options):
+        def report(archived, total):
+            self.stdout.write(f"Archived {archived}/{total} samples.")
+
+        archived = SampleArchiveService.archive_used(
+            user_identifier=options["user_identifier"], chunk_size=options["chunk_size"], progress=report
+        )
+        self.stdout.write(f"Archived {archived} used samples.")
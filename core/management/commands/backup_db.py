@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.backups import MAX_DELTA_CHAIN, backup_database
+from core.snapshots import BACKUP_PAGES_PER_STEP, BACKUP_STEP_PAUSE
+
+
+class Command(BaseCommand):
+    help = (
+        "Backs up the live SQLite database with the online backup API, gzip-compressed and with a checksum manifest, "
+        "to the DB_BACKUP_STORAGE storage. With --delta only pages changed since the previous backup are uploaded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--delta", action="store_true", help="Upload pages changed since the latest backup.")
+        parser.add_argument(
+            "--max-chain", type=int, default=MAX_DELTA_CHAIN, help="Deltas allowed before a full backup is forced."
+        )
+        parser.add_argument("--storage", default=settings.DB_BACKUP_STORAGE, help="STORAGES alias to upload to.")
+        parser.add_argument("--pages", type=int, default=BACKUP_PAGES_PER_STEP, help="Pages copied per step.")
+        parser.add_argument(
+            "--pause-ms", type=float, default=BACKUP_STEP_PAUSE * 1000, help="Milliseconds to pause between steps."
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[DEFAULT_DB_ALIAS]
+        if connection.vendor != "sqlite" or connection.is_in_memory_db():
+            raise CommandError("Online backups need a file-based SQLite default database.")
+
+        try:
+            manifest = backup_database(
+                connection.settings_dict["NAME"],
+                storages[options["storage"]],
+                delta=options["delta"],
+                max_chain=options["max_chain"],
+                pages=options["pages"],
+                pause=options["pause_ms"] / 1000,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(
+            f"Stored {manifest['kind']} backup {manifest['name']}: {manifest['written_pages']}/{manifest['page_count']} "
+            f"pages, {manifest['file_size']} bytes compressed, sha256 {manifest['sha256']}."
+        )
@@ -0,0 +1,90 @@
+import multiprocessing
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+BEGIN_MODES = ("IMMEDIATE", "DEFERRED")
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+    # WAL is what lets deferred readers run alongside each other and alongside a writer.
+    connection.execute("PRAGMA journal_mode = WAL")
+    init_command = settings.DATABASES["default"].get("OPTIONS", {}).get("init_command", "")
+    for statement in init_command.split(";"):
+        if statement.strip():
+            connection.execute(statement)
+    return connection
+
+
+def _create_database(path, rows):
+    connection = _connect(path)
+    connection.execute("CREATE TABLE bench_sample (id INTEGER PRIMARY KEY, sample_id TEXT, is_used INTEGER)")
+    connection.executemany(
+        "INSERT INTO bench_sample (sample_id, is_used) VALUES (?, ?)",
+        ((f"BENCH-{index:06d}", index % 7 == 0) for index in range(rows)),
+    )
+    connection.close()
+
+
+def _read_requests(path, mode, duration, hold):
+    """
+    Run list-like read transactions (a count and a page) for ``duration`` seconds; return how many completed.
+
+    ``hold`` keeps each transaction open the way ATOMIC_REQUESTS does while a view serializes its response.
+    """
+    connection = _connect(path)
+    completed = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        connection.execute(f"BEGIN {mode}")
+        connection.execute("SELECT COUNT(*) FROM bench_sample WHERE is_used = 0").fetchone()
+        connection.execute("SELECT * FROM bench_sample ORDER BY id DESC LIMIT 50").fetchall()
+        if hold:
+            time.sleep(hold)
+        connection.execute("COMMIT")
+        completed += 1
+    connection.close()
+    return completed
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures read request throughput against a scratch SQLite database for growing numbers of worker "
+        "processes, with IMMEDIATE and with DEFERRED transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker process counts.")
+        parser.add_argument("--duration", type=float, default=2.0, help="Seconds per measurement.")
+        parser.add_argument("--rows", type=int, default=10000, help="Rows in the scratch table.")
+        parser.add_argument(
+            "--hold-ms", type=float, default=5.0, help="Milliseconds each transaction stays open after its queries."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            worker_counts = [int(value) for value in options["workers"].split(",") if value.strip()]
+        except ValueError:
+            raise CommandError("--workers must be a comma-separated list of integers.")
+        if not worker_counts or min(worker_counts) < 1:
+            raise CommandError("--workers needs at least one positive worker count.")
+        duration = options["duration"]
+        hold = options["hold_ms"] / 1000
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = str(Path(directory) / "benchmark.sqlite3")
+            _create_database(path, options["rows"])
+
+            self.stdout.write(f"{'Workers':>7}  {'IMMEDIATE req/s':>15}  {'DEFERRED req/s':>14}")
+            for workers in worker_counts:
+                throughput = []
+                for mode in BEGIN_MODES:
+                    with multiprocessing.Pool(workers) as pool:
+                        completed = pool.starmap(_read_requests, [(path, mode, duration, hold)] * workers)
+                    throughput.append(sum(completed) / duration)
+                self.stdout.write(f"{workers:>7}  {throughput[0]:>15.1f}  {throughput[1]:>14.1f}")
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.maintenance import MAINTENANCE_STEPS, run_maintenance
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs SQLite maintenance (ANALYZE, PRAGMA optimize, incremental vacuum, WAL checkpoint), each step within a "
+        "time budget, and records WAL size, page counts, free pages and per-table size estimates."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--steps",
+            default=",".join(MAINTENANCE_STEPS),
+            help=f"Comma-separated steps to run, in order, from: {', '.join(MAINTENANCE_STEPS)}.",
+        )
+        parser.add_argument("--stats-only", action="store_true", help="Record statistics without running any step.")
+        parser.add_argument(
+            "--budget", type=int, default=settings.DB_MAINTENANCE_STEP_BUDGET, help="Seconds allowed per step."
+        )
+
+    def handle(self, *args, **options):
+        steps = [] if options["stats_only"] else [step.strip() for step in options["steps"].split(",") if step.strip()]
+        unknown = [step for step in steps if step not in MAINTENANCE_STEPS]
+        if unknown:
+            raise CommandError(f"Unknown maintenance steps: {', '.join(unknown)}.")
+
+        try:
+            run = run_maintenance(steps, budget=options["budget"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        for step in run.steps:
+            self.stdout.write(f"{step['step']}: {step['status']} in {step['seconds']}s")
+        self.stdout.write(
+            f"{run.page_count} pages of {run.page_size} bytes, {run.freelist_count} free, "
+            f"WAL {run.wal_bytes if run.wal_bytes is not None else 'n/a'} bytes; {len(run.tables)} tables recorded."
+        )
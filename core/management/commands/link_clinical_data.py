@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.models import Sample
+from core.clinical import link_samples_to_clinical_data
+
+
+class Command(BaseCommand):
+    help = "Backfills the persisted sample -> clinical data link using the study-specific matching rules."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--study-name", help="Only relink samples whose study ID belongs to this study.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        queryset = Sample.objects.all()
+        if options["study_name"]:
+            queryset = queryset.filter(study_id__study_name=options["study_name"])
+        with transaction.atomic():
+            changed = link_samples_to_clinical_data(queryset, chunk_size=options["chunk_size"])
+        self.stdout.write(f"Updated clinical data links for {changed} samples.")
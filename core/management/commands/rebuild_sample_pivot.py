@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.pivots import rebuild_sample_pivot
+
+
+class Command(BaseCommand):
+    help = "Recomputes the materialized sample type pivot from the sample table."
+
+    def handle(self, *args, **options):
+        cells = rebuild_sample_pivot()
+        self.stdout.write(f"Rebuilt {cells} sample pivot cells.")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from app.models import Sample
+from core.rollups import rebuild_sample_rollups
+from core.versions import bump_data_version
+
+
+class Command(BaseCommand):
+    help = "Recomputes the sample analytics rollup from the sample table."
+
+    def handle(self, *args, **options):
+        buckets = rebuild_sample_rollups()
+        # Cached analytics payloads are keyed by the sample data version.
+        bump_data_version(Sample)
+        self.stdout.write(f"Rebuilt {buckets} sample rollup buckets.")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.search import create_search_index, rebuild_search_index, search_index_available
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the SQLite full-text search index used by sample search."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not search_index_available() and not create_search_index():
+            self.stderr.write("Full-text search is not available on this database; searches use icontains.")
+            return
+        indexed = rebuild_search_index(batch_size=options["batch_size"])
+        self.stdout.write(f"Indexed {indexed} samples.")
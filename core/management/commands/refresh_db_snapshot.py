@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.snapshots import BACKUP_PAGES_PER_STEP, BACKUP_STEP_PAUSE, refresh_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the read-only database snapshot (DB_SNAPSHOT_PATH) used by stale-tolerant views, copying the live "
+        "SQLite database with the online backup API. Run it from cron more often than DB_SNAPSHOT_MAX_AGE."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", type=int, default=BACKUP_PAGES_PER_STEP, help="Pages copied per step.")
+        parser.add_argument(
+            "--pause-ms", type=float, default=BACKUP_STEP_PAUSE * 1000, help="Milliseconds to pause between steps."
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DB_SNAPSHOT_PATH:
+            raise CommandError("Set DB_SNAPSHOT_PATH to enable the database snapshot.")
+        connection = connections[DEFAULT_DB_ALIAS]
+        if connection.vendor != "sqlite" or connection.is_in_memory_db():
+            raise CommandError("The database snapshot needs a file-based SQLite default database.")
+
+        page_count = refresh_snapshot(pages=options["pages"], pause=options["pause_ms"] / 1000)
+        self.stdout.write(f"Refreshed {settings.DB_SNAPSHOT_PATH} ({page_count} pages).")
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand, CommandError
+
+from core.backups import latest_manifest, restore_backup
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds a database file from a backup taken by backup_db (its full backup plus any deltas), verifying "
+        "every checksum. Restore to a new path and swap it in with the application stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("target", help="Path of the database file to write.")
+        parser.add_argument("--name", default="", help="Backup to restore; defaults to the latest.")
+        parser.add_argument("--storage", default=settings.DB_BACKUP_STORAGE, help="STORAGES alias to read from.")
+        parser.add_argument("--force", action="store_true", help="Overwrite an existing target file.")
+
+    def handle(self, *args, **options):
+        target = Path(options["target"])
+        if target.exists() and not options["force"]:
+            raise CommandError(f"{target} exists; pass --force to overwrite it.")
+        storage = storages[options["storage"]]
+        name = options["name"]
+        if not name:
+            latest = latest_manifest(storage)
+            if latest is None:
+                raise CommandError("The backup storage holds no backups.")
+            name = latest["name"]
+
+        try:
+            manifest = restore_backup(storage, name, target)
+        except (FileNotFoundError, ValueError) as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(f"Restored backup {manifest['name']} ({manifest['page_count']} pages) to {target}.")
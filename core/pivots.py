@@ -0,0 +1,168 @@
+# core/pivots.py
+# Maintains the materialized sample type pivot: the sample IDs in each (study, study ID, date, type) cell.
+# Exists so the study overview downloads read precomputed cells instead of pivoting every sample with pandas.
+
+import re
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from app.choices import SampleTypeChoices
+from app.models import Sample, SamplePivotCell
+
+# Sample fields that decide a sample's cell; saves touching none of them leave the pivot alone.
+PIVOT_SOURCE_FIELDS = ("study_name", "study_id", "sample_datetime", "sample_type", "sample_id")
+PIVOT_KEY_FIELDS = ("study_name", "study_identifier_id", "sample_date", "sample_type")
+PIVOT_INDEX = ["study_id", "sample_date"]
+PIVOT_BATCH_SIZE = 500
+SAMPLE_TYPE_LABELS = dict(SampleTypeChoices.choices)
+# Study IDs outside these formats (e.g. negative controls) are left out of the pivot.
+STUDY_ID_PATTERNS = {
+    "mini_music": r"MINI-\d{3}-\d+",
+    "music": r"MID-\d{2}-\d+",
+    "gidamps": r"GID-\d+-.",
+    "marvel": r"^\d{6}$",
+}
+# Studies whose IDs read <prefix>-<center>-<patient> and are listed by center, then patient number.
+CENTER_SORTED_STUDIES = ("mini_music", "music")
+CENTER_PATIENT_PATTERN = re.compile(r"^[^-]*-([^-]*)-([^-]*)")
+
+
+def date_of(value):
+    """
+    Return the date of ``value`` in the current timezone, matching TruncDate.
+    """
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date()
+
+
+def pivot_entry(sample):
+    """
+    Return the (cell key, sample ID) pair of a sample instance or a values() dict of PIVOT_SOURCE_FIELDS.
+
+    Samples without a study ID or sample date have no cell and return None.
+    """
+    if isinstance(sample, dict):
+        study_name, study_identifier_id, sample_datetime, sample_type, sample_id = (
+            sample[field] for field in PIVOT_SOURCE_FIELDS
+        )
+    else:
+        study_name, study_identifier_id, sample_type, sample_id = (
+            sample.study_name,
+            sample.study_id_id,
+            sample.sample_type,
+            sample.sample_id,
+        )
+        sample_datetime = Sample._meta.get_field("sample_datetime").to_python(sample.sample_datetime)
+    if study_identifier_id is None or sample_datetime is None:
+        return None
+    return (study_name, study_identifier_id, date_of(sample_datetime), sample_type), sample_id
+
+
+def update_pivot_cells(added=(), removed=()):
+    """
+    Add the ``added`` and drop the ``removed`` pivot entries (see ``pivot_entry``; None entries are ignored).
+
+    Affected cells are read with one query and written back with one bulk create, update and delete each, so the
+    cost does not grow with the number of samples written.
+    """
+    changes = defaultdict(lambda: (set(), set()))
+    for index, entries in ((1, removed), (0, added)):
+        for entry in entries:
+            if entry is not None:
+                key, sample_id = entry
+                changes[key][index].add(sample_id)
+    if not changes:
+        return
+
+    with transaction.atomic():
+        study_identifier_ids = {key[1] for key in changes}
+        cells = {
+            tuple(getattr(cell, field) for field in PIVOT_KEY_FIELDS): cell
+            for cell in SamplePivotCell.objects.filter(study_identifier_id__in=study_identifier_ids)
+        }
+        to_create, to_update, to_delete = [], [], []
+        for key, (adds, removes) in changes.items():
+            cell = cells.get(key)
+            current = set(cell.sample_ids) if cell else set()
+            sample_ids = sorted((current - removes) | adds)
+            if cell is None:
+                if sample_ids:
+                    to_create.append(SamplePivotCell(**dict(zip(PIVOT_KEY_FIELDS, key)), sample_ids=sample_ids))
+            elif not sample_ids:
+                to_delete.append(cell.pk)
+            elif sample_ids != cell.sample_ids:
+                cell.sample_ids = sample_ids
+                to_update.append(cell)
+        if to_create:
+            SamplePivotCell.objects.bulk_create(to_create, batch_size=PIVOT_BATCH_SIZE)
+        if to_update:
+            SamplePivotCell.objects.bulk_update(to_update, ["sample_ids"], batch_size=PIVOT_BATCH_SIZE)
+        if to_delete:
+            SamplePivotCell.objects.filter(pk__in=to_delete).delete()
+
+
+@transaction.atomic
+def rebuild_sample_pivot(sample_model=Sample, cell_model=SamplePivotCell) -> int:
+    """
+    Recompute every pivot cell from the sample table. Returns the number of cells written.
+
+    Works with historical (migration) models as well as the live ones.
+    """
+    rows = (
+        sample_model.objects.order_by()
+        .filter(study_id__isnull=False)
+        .annotate(sample_date=TruncDate("sample_datetime"))
+        .values_list("study_name", "study_id", "sample_date", "sample_type", "sample_id")
+    )
+    grouped = defaultdict(list)
+    for *key, sample_id in rows.iterator(chunk_size=PIVOT_BATCH_SIZE):
+        grouped[tuple(key)].append(sample_id)
+    cell_model.objects.all().delete()
+    cells = cell_model.objects.bulk_create(
+        (
+            cell_model(**dict(zip(PIVOT_KEY_FIELDS, key)), sample_ids=sorted(sample_ids))
+            for key, sample_ids in grouped.items()
+        ),
+        batch_size=PIVOT_BATCH_SIZE,
+    )
+    return len(cells)
+
+
+def _center_sort_key(row):
+    match = CENTER_PATIENT_PATTERN.match(row["study_id"])
+    center, patient = match.groups() if match else (None, None)
+    patient = int(patient) if patient and patient.isdigit() else None
+    # Unparseable center or patient numbers sort last.
+    return (center is None, center or "", patient is None, patient or 0, row["sample_date"])
+
+
+def sample_type_pivot(study_name: str):
+    """
+    Return (sample type labels, rows) of a study's overview pivot, read from the materialized cells.
+
+    Each row holds ``study_id``, ``sample_date`` and one sorted list of sample IDs (or None) per sample type label.
+    Rows of CENTER_SORTED_STUDIES are ordered by center, numeric patient number and date; others by study ID and date.
+    """
+    pattern = re.compile(STUDY_ID_PATTERNS[study_name])
+    cells = SamplePivotCell.objects.filter(study_name=study_name).values_list(
+        "study_identifier__name", "sample_date", "sample_type", "sample_ids"
+    )
+    grouped = defaultdict(dict)
+    for name, sample_date, sample_type, sample_ids in cells:
+        if pattern.search(name):
+            grouped[(name, sample_date)][SAMPLE_TYPE_LABELS.get(sample_type, sample_type)] = sample_ids
+
+    sample_types = sorted({label for row in grouped.values() for label in row})
+    rows = [
+        {"study_id": name, "sample_date": sample_date, **{label: row.get(label) for label in sample_types}}
+        for (name, sample_date), row in grouped.items()
+    ]
+    if study_name in CENTER_SORTED_STUDIES:
+        rows.sort(key=_center_sort_key)
+    else:
+        rows.sort(key=lambda row: (row["study_id"], row["sample_date"]))
+    return sample_types, rows
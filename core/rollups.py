@@ -0,0 +1,131 @@
+# core/rollups.py
+# Maintains the sample analytics rollup: counts per (month, study, type, location, used) bucket.
+# Exists so analytics read a table that grows with the number of buckets, not with the number of samples.
+
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count, DateField, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from app.models import Sample, SampleRollup
+
+# Sample fields that decide a sample's bucket; saves touching none of them leave the rollup alone.
+ROLLUP_SOURCE_FIELDS = ("sample_datetime", "study_name", "sample_type", "sample_location", "is_used")
+ROLLUP_KEY_FIELDS = ("month", "study_name", "sample_type", "sample_location", "is_used")
+ROLLUP_BATCH_SIZE = 500
+# Calendar months (including the current one) covered by the samples-by-month breakdown.
+ANALYTICS_MONTHS = 12
+
+
+def month_of(value):
+    """
+    Return the first day of the month containing ``value`` in the current timezone, matching TruncMonth.
+    """
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date().replace(day=1)
+
+
+def rollup_key(sample) -> tuple:
+    """
+    Return the bucket a sample instance (or a values() dict of ROLLUP_SOURCE_FIELDS) counts towards.
+    """
+    if isinstance(sample, dict):
+        values = [sample[field] for field in ROLLUP_SOURCE_FIELDS]
+    else:
+        sample_datetime = Sample._meta.get_field("sample_datetime").to_python(sample.sample_datetime)
+        values = [sample_datetime, *(getattr(sample, field) for field in ROLLUP_SOURCE_FIELDS[1:])]
+    sample_datetime, study_name, sample_type, sample_location, is_used = values
+    return (month_of(sample_datetime), study_name or "", sample_type or "", sample_location or "", bool(is_used))
+
+
+def update_rollups(added=(), removed=()):
+    """
+    Count the ``added`` bucket keys in and the ``removed`` ones out.
+
+    Deltas are merged per bucket and written with one upsert statement plus, when anything was removed, one
+    delete of emptied buckets, so the cost does not grow with the number of samples written.
+    """
+    deltas = Counter(added)
+    deltas.subtract(removed)
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    table = connection.ops.quote_name(SampleRollup._meta.db_table)
+    columns = ", ".join(connection.ops.quote_name(field) for field in ROLLUP_KEY_FIELDS)
+    count_column = connection.ops.quote_name("sample_count")
+    sql = (
+        f"INSERT INTO {table} ({columns}, {count_column}) VALUES (%s, %s, %s, %s, %s, %s) "
+        f"ON CONFLICT ({columns}) DO UPDATE SET {count_column} = {table}.{count_column} + excluded.{count_column}"
+    )
+    params = [
+        (connection.ops.adapt_datefield_value(month), study_name, sample_type, sample_location, is_used, delta)
+        for (month, study_name, sample_type, sample_location, is_used), delta in deltas.items()
+    ]
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+        if any(delta < 0 for delta in deltas.values()):
+            SampleRollup.objects.filter(sample_count__lte=0).delete()
+
+
+@transaction.atomic
+def rebuild_sample_rollups(sample_model=Sample, rollup_model=SampleRollup) -> int:
+    """
+    Recompute every bucket from the sample table. Returns the number of buckets written.
+
+    Works with historical (migration) models as well as the live ones.
+    """
+    rows = (
+        sample_model.objects.order_by()
+        .annotate(month=TruncMonth("sample_datetime", output_field=DateField()))
+        .values(*ROLLUP_KEY_FIELDS)
+        .annotate(sample_count=Count("pk"))
+    )
+    rollup_model.objects.all().delete()
+    buckets = rollup_model.objects.bulk_create(
+        (rollup_model(**row) for row in rows.iterator(chunk_size=ROLLUP_BATCH_SIZE)), batch_size=ROLLUP_BATCH_SIZE
+    )
+    return len(buckets)
+
+
+def first_analytics_month(months=ANALYTICS_MONTHS):
+    month = month_of(timezone.now())
+    index = month.year * 12 + month.month - months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def sample_analytics(months=ANALYTICS_MONTHS) -> dict:
+    """
+    Return the sample analytics breakdowns (totals, by month, type, study and location) read from the rollup.
+
+    Type and location breakdowns count active (unused) samples only, as on the legacy analytics page.
+    """
+    buckets = SampleRollup.objects.order_by()
+    active = buckets.filter(is_used=False)
+    totals = buckets.aggregate(
+        total_samples=Sum("sample_count", default=0),
+        total_active_samples=Sum("sample_count", filter=Q(is_used=False), default=0),
+    )
+    return {
+        **totals,
+        "samples_by_month": list(
+            buckets.filter(month__gte=first_analytics_month(months))
+            .values("month")
+            .annotate(sample_count=Sum("sample_count"))
+            .order_by("month")
+        ),
+        "samples_by_type": list(
+            active.values("sample_type").annotate(sample_type_count=Sum("sample_count")).order_by("sample_type")
+        ),
+        "samples_by_study": list(
+            buckets.values("study_name").annotate(study_name_count=Sum("sample_count")).order_by("study_name")
+        ),
+        "samples_by_location": list(
+            active.values("sample_location")
+            .annotate(sample_location_count=Sum("sample_count"))
+            .order_by("-sample_location_count", "sample_location")
+        ),
+    }
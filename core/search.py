@@ -0,0 +1,203 @@
+# core/search.py
+# Maintains the SQLite FTS5 index over sample search columns and routes sample search queries through it.
+# Exists so keystroke searches avoid a six-column icontains OR (including a join to study IDs) on every request.
+
+import re
+
+from django.db import DatabaseError, connection
+from django.db.models import Case, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = "app_sample_search"
+
+# Column order matters: it is mirrored by INSERT statements and the bm25() weights below.
+SEARCH_COLUMNS = (
+    "sample_id",
+    "study_id_name",
+    "sample_location",
+    "sample_sublocation",
+    "sample_type",
+    "sample_comments",
+)
+SEARCH_WEIGHTS = (10.0, 5.0, 2.0, 2.0, 1.0, 1.0)
+
+# The trigram tokenizer matches arbitrary substrings, so it cannot answer queries shorter than three characters.
+MIN_INDEXED_QUERY_LENGTH = 3
+
+# Barcodes are single tokens of letters, digits and separators that contain at least one digit.
+BARCODE_PATTERN = re.compile(r"^(?=.*\d)[A-Za-z0-9][A-Za-z0-9_.\-/]*$")
+
+# Table existence per database, so searches do not introspect sqlite_master on every request.
+_index_available = {}
+
+
+def create_search_index(schema_connection=None) -> bool:
+    """
+    Create the FTS5 table on SQLite. Returns False when the backend or SQLite build cannot support it.
+    """
+    conn = schema_connection or connection
+    if conn.vendor != "sqlite":
+        return False
+    columns = ", ".join(SEARCH_COLUMNS)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5({columns}, tokenize='trigram')"
+            )
+    except DatabaseError:
+        return False
+    _index_available.clear()
+    return True
+
+
+def drop_search_index(schema_connection=None):
+    conn = schema_connection or connection
+    if conn.vendor != "sqlite":
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+    _index_available.clear()
+
+
+def search_index_available() -> bool:
+    if connection.vendor != "sqlite":
+        return False
+    key = (connection.alias, connection.settings_dict["NAME"])
+    if key not in _index_available:
+        _index_available[key] = SEARCH_TABLE in connection.introspection.table_names()
+    return _index_available[key]
+
+
+def _row_values(sample_id, study_id_name, location, sublocation, sample_type, comments):
+    return [sample_id or "", study_id_name or "", location or "", sublocation or "", sample_type or "", comments or ""]
+
+
+def reindex_samples(sample_ids):
+    """
+    Refresh the index rows for the given sample primary keys, removing rows for samples that no longer exist.
+
+    Bulk write paths (``bulk_update``, ``queryset.update``) bypass model signals and must call this explicitly.
+    """
+    from app.models import Sample
+
+    sample_ids = [int(pk) for pk in sample_ids]
+    if not sample_ids or not search_index_available():
+        return
+    rows = Sample.objects.filter(pk__in=sample_ids).values_list(
+        "pk",
+        "sample_id",
+        "study_id__name",
+        "sample_location",
+        "sample_sublocation",
+        "sample_type",
+        "sample_comments",
+    )
+    remove_samples(sample_ids)
+    placeholders = ", ".join(["%s"] * (len(SEARCH_COLUMNS) + 1))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) VALUES ({placeholders})",
+            [[pk, *_row_values(*values)] for pk, *values in rows],
+        )
+
+
+def remove_samples(sample_ids):
+    sample_ids = [int(pk) for pk in sample_ids]
+    if not sample_ids or not search_index_available():
+        return
+    with connection.cursor() as cursor:
+        # SQLite caps bound parameters per statement, so deletes are chunked.
+        for start in range(0, len(sample_ids), 500):
+            chunk = sample_ids[start : start + 500]
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(chunk))})",
+                chunk,
+            )
+
+
+def rebuild_search_index(batch_size=2000) -> int:
+    """
+    Repopulate the whole index from the sample table. Returns the number of indexed samples.
+    """
+    from app.models import Sample
+
+    if not search_index_available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    indexed = 0
+    batch = []
+    sample_ids = Sample.objects.order_by("pk").values_list("pk", flat=True).iterator(chunk_size=batch_size)
+    for pk in sample_ids:
+        batch.append(pk)
+        if len(batch) >= batch_size:
+            reindex_samples(batch)
+            indexed += len(batch)
+            batch = []
+    if batch:
+        reindex_samples(batch)
+        indexed += len(batch)
+    return indexed
+
+
+def legacy_search_filter(query_string: str) -> Q:
+    """
+    The original six-column icontains filter, kept for short queries and non-SQLite backends.
+    """
+    return (
+        Q(sample_id__icontains=query_string)
+        | Q(study_id__name__icontains=query_string)
+        | Q(sample_location__icontains=query_string)
+        | Q(sample_sublocation__icontains=query_string)
+        | Q(sample_type__icontains=query_string)
+        | Q(sample_comments__icontains=query_string)
+    )
+
+
+def _match_expression(query_string: str) -> str:
+    # A quoted phrase with the trigram tokenizer behaves like a case-insensitive substring match.
+    return '"{}"'.format(query_string.replace('"', '""'))
+
+
+def looks_like_barcode(query_string: str) -> bool:
+    return bool(BARCODE_PATTERN.match(query_string))
+
+
+def search_samples(queryset, query_string: str, rank: bool = False):
+    """
+    Filter a sample queryset by a free-text query.
+
+    The FTS index is used, falling back to the icontains filter when the index is unavailable or the query is too
+    short to be indexed. With ``rank`` set, results are ordered by bm25 relevance, and a query that looks like a
+    barcode puts the sample with exactly that ID first, still followed by the samples that merely contain it.
+    """
+    query_string = (query_string or "").strip()
+    if not query_string:
+        return queryset
+
+    ordering = []
+    if rank and looks_like_barcode(query_string):
+        queryset = queryset.alias(
+            exact_sample_id=Case(When(sample_id=query_string.upper(), then=Value(0)), default=Value(1))
+        )
+        ordering.append("exact_sample_id")
+
+    if len(query_string) < MIN_INDEXED_QUERY_LENGTH or not search_index_available():
+        queryset = queryset.filter(legacy_search_filter(query_string))
+        return queryset.order_by(*ordering, "-sample_datetime") if ordering else queryset
+
+    match = _match_expression(query_string)
+    queryset = queryset.filter(
+        pk__in=RawSQL(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [match])
+    )
+    if rank:
+        weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS)
+        sample_table = queryset.model._meta.db_table
+        queryset = queryset.annotate(
+            search_rank=RawSQL(
+                f"SELECT bm25({SEARCH_TABLE}, {weights}) FROM {SEARCH_TABLE} "
+                f'WHERE {SEARCH_TABLE} MATCH %s AND {SEARCH_TABLE}.rowid = "{sample_table}"."id"',
+                [match],
+            )
+        ).order_by(*ordering, "search_rank", "-sample_datetime")
+    return queryset
@@ -0,0 +1,159 @@
+# core/services/coalescer.py
+# Group-commits single-sample scan updates: requests queued within a few milliseconds share one transaction.
+# Exists because each scan request otherwise pays its own SQLite commit and write-lock wait during busy sessions.
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, NamedTuple
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from core.services.samples import SampleBatchScanService
+
+COALESCE_MAX_BATCH = 100
+# Longest a request waits for its batch; the batch itself may still commit afterwards.
+COALESCE_RESULT_TIMEOUT = 30
+# Seconds a client is asked to wait before retrying a scan whose batch did not commit in time.
+COALESCE_RETRY_AFTER = 5
+
+
+class QueuedScan(NamedTuple):
+    sample_id: str
+    changes: dict
+    user: Any
+    user_identifier: str
+    future: Future
+
+
+class SampleScanCoalescer:
+    """
+    Queues single-sample scan changes and applies everything queued within ``window`` seconds in one transaction.
+
+    Consecutive changes with the same (changes, user) are grouped and each group goes through SampleBatchScanService,
+    so history, search indexes, rollups and data versions are maintained exactly as for a batch scan. Groups are
+    applied in submission order, so repeated scans of a sample end in its last change. Every caller is released with
+    the status of its own scan once the transaction commits. One daemon thread per process does the writes.
+    """
+
+    def __init__(self, window, max_batch=COALESCE_MAX_BATCH):
+        self.window = window
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, sample_id, changes, user=None, user_identifier=""):
+        """
+        Queue one change and block until its batch commits. Returns the scan status of ``sample_id``.
+
+        Raises concurrent.futures.TimeoutError after COALESCE_RESULT_TIMEOUT seconds; the change stays queued and
+        may still be applied.
+        """
+        future = Future()
+        self._ensure_worker()
+        self._queue.put(QueuedScan(sample_id, changes, user, user_identifier, future))
+        return future.result(timeout=COALESCE_RESULT_TIMEOUT)
+
+    def backed_up(self):
+        """
+        Return True when at least a full batch is already waiting, so a new change would wait for more than one.
+        """
+        return self._queue.qsize() >= self.max_batch
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="sample-scan-coalescer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # The thread outlives requests, so it recycles its connection the way request_started/finished do.
+            close_old_connections()
+            try:
+                self.apply(batch)
+            finally:
+                close_old_connections()
+
+    def apply(self, batch):
+        """
+        Apply a batch of QueuedScan entries in one transaction and resolve each entry's future.
+
+        If the shared transaction fails, each group is retried in its own transaction so one bad change only
+        fails the requests that asked for it.
+        """
+        groups = self._group(batch)
+        try:
+            with transaction.atomic():
+                resolved = [pair for entries in groups for pair in self._apply_group(entries)]
+        except Exception:
+            resolved = []
+            for entries in groups:
+                try:
+                    with transaction.atomic():
+                        resolved += self._apply_group(entries)
+                except Exception as exc:
+                    for entry in entries:
+                        entry.future.set_exception(exc)
+        for future, status in resolved:
+            future.set_result(status)
+
+    @staticmethod
+    def _group(batch):
+        """
+        Split a batch into runs of consecutive entries with the same changes and user, in submission order.
+
+        A run also ends at a sample it already holds: SampleBatchScanService reports duplicate scans once, and each
+        scan needs its own status and history row.
+        """
+        groups = []
+        previous_key = None
+        for entry in batch:
+            key = (tuple(sorted(entry.changes.items())), getattr(entry.user, "pk", None), entry.user_identifier)
+            if key != previous_key or any(queued.sample_id == entry.sample_id for queued in groups[-1]):
+                groups.append([])
+            groups[-1].append(entry)
+            previous_key = key
+        return groups
+
+    @staticmethod
+    def _apply_group(entries):
+        first = entries[0]
+        results = SampleBatchScanService.apply(
+            [entry.sample_id for entry in entries],
+            first.changes,
+            user=first.user,
+            user_identifier=first.user_identifier,
+        )
+        statuses = {result["sample_id"]: result["status"] for result in results}
+        return [(entry.future, statuses[entry.sample_id]) for entry in entries]
+
+
+_coalescer = None
+_coalescer_lock = threading.Lock()
+
+
+def get_sample_scan_coalescer():
+    """
+    Return the process-wide coalescer, or None when SAMPLE_SCAN_COALESCING is off.
+    """
+    global _coalescer
+    if not settings.SAMPLE_SCAN_COALESCING:
+        return None
+    with _coalescer_lock:
+        if _coalescer is None:
+            _coalescer = SampleScanCoalescer(window=settings.SAMPLE_SCAN_COALESCE_WINDOW_MS / 1000)
+        return _coalescer
@@ -6,6 +6,9 @@ import pandas as pd
 from django.db import transaction
 
 from app.models import ClinicalData, StudyIdentifier
+from core.autocomplete import study_id_index
+from core.clinical import deferred_clinical_linking
+from core.versions import bump_data_version
 
 
 class StudyIdentifierImportService:
@@ -112,6 +115,9 @@ class StudyIdentifierImportService:
         if new_identifiers:
             StudyIdentifier.objects.bulk_create(new_identifiers)
             created = len(new_identifiers)
+            # bulk_create bypasses the model signals that maintain the autocomplete index and data version.
+            study_id_index.add(*(study_identifier.name for study_identifier in new_identifiers))
+            bump_data_version(StudyIdentifier)
 
         return {"total": len(df), "created": created, "updated": updated, "skipped": skipped}
 
@@ -119,10 +125,12 @@ class StudyIdentifierImportService:
 class ClinicalDataImportService:
     @staticmethod
     @transaction.atomic
+    @deferred_clinical_linking()
     def import_from_dataframe(df):
         """
         Import clinical data from DataFrame with different merging strategies by study
         Returns a dictionary with counts of processed records
+        Sample links to the imported records are re-resolved once, after all rows are processed.
         """
         # Initialize counters
         created = 0
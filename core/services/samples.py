@@ -0,0 +1,136 @@
+# /Users/chershiongchuah/Developer/musicsamples/core/services/samples.py
+# This module provides batch write services for samples used by the QR scan and archive workflows.
+# It applies one change to many samples with set-based queries and bulk history records.
+
+from django.db import transaction
+from django.utils import timezone
+from simple_history.utils import bulk_update_with_history
+
+from app.models import Sample
+from core.autocomplete import index_samples, location_index
+from core.rollups import ROLLUP_SOURCE_FIELDS, rollup_key, update_rollups
+from core.search import reindex_samples
+from core.versions import bump_data_version
+
+# Stay well under SQLite's bound-parameter limit for IN lookups and bulk UPDATE batches.
+SAMPLE_BATCH_SIZE = 500
+
+SCAN_STATUS_UPDATED = "updated"
+SCAN_STATUS_UNCHANGED = "unchanged"
+SCAN_STATUS_NOT_FOUND = "not_found"
+SCAN_STATUSES = (SCAN_STATUS_UPDATED, SCAN_STATUS_UNCHANGED, SCAN_STATUS_NOT_FOUND)
+
+# Location given to used samples when their storage location is archived.
+ARCHIVED_LOCATION = "used"
+
+
+class SampleBatchScanService:
+    @staticmethod
+    @transaction.atomic
+    def apply(sample_ids, changes, user=None, user_identifier=""):
+        """
+        Apply the same field changes to every scanned sample in one transaction.
+        Returns a list of {"sample_id", "status"} results in scan order, where status is one of
+        updated, unchanged or not_found. Duplicate scans are reported once.
+        """
+        sample_ids = list(dict.fromkeys(sample_ids))
+        samples = {}
+        for start in range(0, len(sample_ids), SAMPLE_BATCH_SIZE):
+            chunk = sample_ids[start : start + SAMPLE_BATCH_SIZE]
+            samples.update((sample.sample_id, sample) for sample in Sample.objects.filter(sample_id__in=chunk))
+
+        now = timezone.now()
+        results = []
+        changed_samples = []
+        previous_keys = []
+        rollup_changed = bool(set(changes) & set(ROLLUP_SOURCE_FIELDS))
+        for sample_id in sample_ids:
+            sample = samples.get(sample_id)
+            if sample is None:
+                results.append({"sample_id": sample_id, "status": SCAN_STATUS_NOT_FOUND})
+                continue
+            if all(getattr(sample, field) == value for field, value in changes.items()):
+                results.append({"sample_id": sample_id, "status": SCAN_STATUS_UNCHANGED})
+                continue
+            if rollup_changed:
+                previous_keys.append(rollup_key(sample))
+            for field, value in changes.items():
+                setattr(sample, field, value)
+            # bulk_update skips auto_now, so the modification stamp is set explicitly.
+            sample.last_modified = now
+            sample.last_modified_by = user_identifier
+            changed_samples.append(sample)
+            results.append({"sample_id": sample_id, "status": SCAN_STATUS_UPDATED})
+
+        if changed_samples:
+            bulk_update_with_history(
+                changed_samples,
+                Sample,
+                [*changes, "last_modified", "last_modified_by"],
+                batch_size=SAMPLE_BATCH_SIZE,
+                default_user=user if getattr(user, "is_authenticated", False) else None,
+                default_date=now,
+            )
+            # bulk_update bypasses post_save, so the search and autocomplete indexes, analytics rollup and data
+            # version are refreshed here. The autocomplete index and data version live in the cache, outside the
+            # transaction, so they only change once it commits and a rolled-back scan leaves nothing behind.
+            if {"sample_location", "sample_sublocation"} & set(changes):
+                reindex_samples([sample.pk for sample in changed_samples])
+                transaction.on_commit(lambda: index_samples(changed_samples))
+            if rollup_changed:
+                update_rollups(added=[rollup_key(sample) for sample in changed_samples], removed=previous_keys)
+            transaction.on_commit(lambda: bump_data_version(Sample))
+        return results
+
+
+class SampleArchiveService:
+    @staticmethod
+    def pending_queryset():
+        return Sample.objects.filter(is_used=True).exclude(sample_location=ARCHIVED_LOCATION)
+
+    @staticmethod
+    def archive_used(user=None, user_identifier="", chunk_size=SAMPLE_BATCH_SIZE, progress=None):
+        """
+        Move every used sample that still has a location to the "used" location and clear its sublocation.
+
+        Unlike the other services this is not one transaction: each chunk is written with bulk_update and bulk
+        history in its own short transaction, so scanners can take the SQLite write lock between chunks.
+        ``progress`` is called with (archived, total) after each committed chunk. Returns the number archived.
+        """
+        total = SampleArchiveService.pending_queryset().count()
+        archived = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic():
+                samples = list(
+                    SampleArchiveService.pending_queryset().filter(pk__gt=last_pk).order_by("pk")[:chunk_size]
+                )
+                if not samples:
+                    break
+                now = timezone.now()
+                previous_keys = [rollup_key(sample) for sample in samples]
+                for sample in samples:
+                    sample.sample_location = ARCHIVED_LOCATION
+                    sample.sample_sublocation = ""
+                    # bulk_update skips auto_now, so the modification stamp is set explicitly.
+                    sample.last_modified = now
+                    if user_identifier:
+                        sample.last_modified_by = user_identifier
+                bulk_update_with_history(
+                    samples,
+                    Sample,
+                    ["sample_location", "sample_sublocation", "last_modified", "last_modified_by"],
+                    batch_size=chunk_size,
+                    default_user=user if getattr(user, "is_authenticated", False) else None,
+                    default_date=now,
+                )
+                reindex_samples([sample.pk for sample in samples])
+                update_rollups(added=[rollup_key(sample) for sample in samples], removed=previous_keys)
+            last_pk = samples[-1].pk
+            archived += len(samples)
+            bump_data_version(Sample)
+            if progress is not None:
+                progress(archived, total)
+        if archived:
+            location_index.add(ARCHIVED_LOCATION)
+        return archived
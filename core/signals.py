@@ -0,0 +1,210 @@
+# core/signals.py
+# Connects model signals keeping derived data (search and autocomplete indexes, rollups, pivots, versions) current.
+# Exists so save/delete paths stay simple while denormalised structures are refreshed in one place.
+
+from django.core.signals import request_finished, request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from app.models import (
+    BasicScienceBox,
+    BasicScienceSampleType,
+    ClinicalData,
+    DataStore,
+    Experiment,
+    Sample,
+    StudyIdentifier,
+    TissueType,
+)
+from core import autocomplete, maintenance, pivots, rollups, search, snapshots, transactions
+from core.clinical import LINK_SOURCE_FIELDS, relink_study_identifiers, resolve_clinical_data_id
+from core.versions import bump_data_version
+from datasets.models import Dataset, DatasetAccessHistory, DatasetAnalytics, DataSourceStatusCheck
+
+# Models whose data version (core.versions) is bumped on every save, delete and many-to-many change.
+VERSIONED_MODELS = (
+    Sample,
+    StudyIdentifier,
+    ClinicalData,
+    DataStore,
+    BasicScienceBox,
+    Experiment,
+    BasicScienceSampleType,
+    TissueType,
+    Dataset,
+    DatasetAccessHistory,
+    DatasetAnalytics,
+    DataSourceStatusCheck,
+)
+
+
+@receiver(pre_save, sender=Sample, dispatch_uid="core_sample_clinical_data_link")
+def link_sample_clinical_data(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(LINK_SOURCE_FIELDS):
+        return
+    clinical_data_id = resolve_clinical_data_id(instance)
+    if update_fields is not None and "clinical_data" not in update_fields and instance.pk:
+        # The link column is not part of this partial save, so persist it directly.
+        if clinical_data_id != instance.clinical_data_id:
+            Sample.objects.filter(pk=instance.pk).update(clinical_data=clinical_data_id)
+    instance.clinical_data_id = clinical_data_id
+
+
+@receiver(pre_save, sender=ClinicalData, dispatch_uid="core_clinical_data_previous_study_id")
+def remember_clinical_data_previous_study_id(sender, instance, raw=False, **kwargs):
+    instance._previous_study_id_id = None
+    if raw or instance._state.adding:
+        return
+    instance._previous_study_id_id = (
+        ClinicalData.objects.filter(pk=instance.pk).values_list("study_id", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=ClinicalData, dispatch_uid="core_clinical_data_link_save")
+@receiver(post_delete, sender=ClinicalData, dispatch_uid="core_clinical_data_link_delete")
+def relink_clinical_data_samples(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # A row moved to another study ID leaves the previous study's samples linked to it until they are relinked.
+    relink_study_identifiers([getattr(instance, "_previous_study_id_id", None), instance.study_id_id])
+
+
+@receiver(post_save, sender=Sample, dispatch_uid="core_sample_search_index_save")
+def update_sample_search_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.reindex_samples([instance.pk])
+
+
+@receiver(post_delete, sender=Sample, dispatch_uid="core_sample_search_index_delete")
+def remove_sample_search_index(sender, instance, **kwargs):
+    search.remove_samples([instance.pk])
+
+
+@receiver(post_save, sender=StudyIdentifier, dispatch_uid="core_study_identifier_search_index_save")
+def update_study_identifier_search_index(sender, instance, created=False, raw=False, **kwargs):
+    # A renamed study ID changes the indexed text of every sample that references it.
+    if raw or created:
+        return
+    search.reindex_samples(Sample.objects.filter(study_id=instance).values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=StudyIdentifier, dispatch_uid="core_study_identifier_clinical_data_link")
+def relink_study_identifier_samples(sender, instance, created=False, raw=False, **kwargs):
+    # The study name decides whether samples match on date or timepoint.
+    if raw or created:
+        return
+    relink_study_identifiers([instance.pk])
+
+
+# Rollup and pivot fields are read back in one query before a save changes them.
+PREVIOUS_KEY_FIELDS = tuple(dict.fromkeys(rollups.ROLLUP_SOURCE_FIELDS + pivots.PIVOT_SOURCE_FIELDS))
+
+
+@receiver(pre_save, sender=Sample, dispatch_uid="core_sample_rollup_previous_key")
+def remember_sample_previous_keys(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._rollup_previous_key = None
+    instance._pivot_previous_entry = None
+    instance._pivot_tracked = False
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not set(update_fields) & set(PREVIOUS_KEY_FIELDS):
+        return
+    previous = Sample.objects.filter(pk=instance.pk).values(*PREVIOUS_KEY_FIELDS).first()
+    if previous is not None:
+        instance._rollup_previous_key = rollups.rollup_key(previous)
+        # A previous sample without a cell (no study ID) still has to be tracked, hence the separate flag.
+        instance._pivot_previous_entry = pivots.pivot_entry(previous)
+        instance._pivot_tracked = True
+
+
+@receiver(post_save, sender=Sample, dispatch_uid="core_sample_rollup_save")
+def update_sample_rollup(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_rollup_previous_key", None)
+    if not created and previous is None:
+        return
+    key = rollups.rollup_key(instance)
+    if key != previous:
+        rollups.update_rollups(added=[key], removed=[previous] if previous else [])
+
+
+@receiver(post_delete, sender=Sample, dispatch_uid="core_sample_rollup_delete")
+def remove_sample_rollup(sender, instance, **kwargs):
+    rollups.update_rollups(removed=[rollups.rollup_key(instance)])
+
+
+@receiver(post_save, sender=Sample, dispatch_uid="core_sample_pivot_save")
+def update_sample_pivot(sender, instance, created=False, raw=False, **kwargs):
+    if raw or not (created or getattr(instance, "_pivot_tracked", False)):
+        return
+    previous = getattr(instance, "_pivot_previous_entry", None)
+    entry = pivots.pivot_entry(instance)
+    if entry != previous:
+        pivots.update_pivot_cells(added=[entry], removed=[previous])
+
+
+@receiver(post_delete, sender=Sample, dispatch_uid="core_sample_pivot_delete")
+def remove_sample_pivot(sender, instance, **kwargs):
+    pivots.update_pivot_cells(removed=[pivots.pivot_entry(instance)])
+
+
+@receiver(post_save, sender=Sample, dispatch_uid="core_sample_autocomplete_index")
+def update_sample_autocomplete_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    autocomplete.index_samples([instance])
+
+
+@receiver(post_save, sender=StudyIdentifier, dispatch_uid="core_study_identifier_autocomplete_index")
+def update_study_identifier_autocomplete_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    autocomplete.study_id_index.add(instance.name)
+
+
+def bump_instance_data_version(sender, **kwargs):
+    bump_data_version(sender)
+
+
+def bump_relation_data_version(sender, instance, action, model, **kwargs):
+    if action.startswith("post_"):
+        bump_data_version(type(instance), model)
+
+
+for versioned_model in VERSIONED_MODELS:
+    label = versioned_model._meta.label_lower
+    post_save.connect(
+        bump_instance_data_version, sender=versioned_model, dispatch_uid=f"core_data_version_save_{label}"
+    )
+    post_delete.connect(
+        bump_instance_data_version, sender=versioned_model, dispatch_uid=f"core_data_version_delete_{label}"
+    )
+    for field in versioned_model._meta.local_many_to_many:
+        m2m_changed.connect(
+            bump_relation_data_version,
+            sender=field.remote_field.through,
+            dispatch_uid=f"core_data_version_m2m_{label}_{field.name}",
+        )
+
+
+@receiver(connection_created, dispatch_uid="core_request_transaction_mode")
+def apply_request_transaction_mode(sender, connection, **kwargs):
+    transactions.apply_transaction_mode(connection)
+
+
+@receiver(request_started, dispatch_uid="core_reset_snapshot_reads")
+@receiver(request_finished, dispatch_uid="core_end_snapshot_reads")
+def end_snapshot_reads(sender, **kwargs):
+    # Snapshot routing (core.snapshots) outlives the view so streamed responses read the snapshot too.
+    snapshots.end_snapshot_reads()
+
+
+@receiver(request_started, dispatch_uid="core_start_maintenance_scheduler")
+def start_maintenance_scheduler(sender, **kwargs):
+    # Started lazily by the first request so management commands never spawn the thread.
+    maintenance.start_maintenance_scheduler()
@@ -0,0 +1,159 @@
+# core/snapshots.py
+# Routes the reads of views that tolerate stale data to a periodically refreshed, read-only copy of the database.
+# Exists so long exports and analytics stop holding read transactions open on the live database scanners write to.
+
+import os
+import sqlite3
+import time
+from contextlib import closing
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.transactions import SAFE_METHODS, get_view_mark
+
+SNAPSHOT_DB_ALIAS = "snapshot"
+# Only these apps are read from the snapshot; accounts, sessions and tokens always come from the live database so
+# new users and revoked tokens take effect at once.
+SNAPSHOT_APP_LABELS = ("app", "datasets")
+SNAPSHOT_AGE_HEADER = "X-Snapshot-Age"
+# Pages copied per online backup step, and the pause between steps that leaves the disk to live requests.
+BACKUP_PAGES_PER_STEP = 1024
+BACKUP_STEP_PAUSE = 0.005
+
+_snapshot_reads = ContextVar("snapshot_reads", default=False)
+
+
+def tolerates_staleness(view):
+    """
+    Mark a view function, view class or handler method as fine with data up to DB_SNAPSHOT_MAX_AGE seconds old.
+    """
+    view.tolerates_staleness = True
+    return view
+
+
+def online_backup(source_path, target_path, pages=BACKUP_PAGES_PER_STEP, pause=BACKUP_STEP_PAUSE, progress=None):
+    """
+    Copy the SQLite database at ``source_path`` to ``target_path`` with the online backup API. Returns the page count.
+
+    Pages are copied ``pages`` at a time inside one read transaction on the source, so the copy is consistent as of
+    its start, commits made meanwhile by other connections do not restart it, and under WAL writers never wait for
+    it. ``progress(remaining, total)`` is called after every step.
+    """
+
+    def step_done(status, remaining, total):
+        if progress is not None:
+            progress(remaining, total)
+        if remaining and pause:
+            time.sleep(pause)
+
+    with closing(sqlite3.connect(source_path, timeout=30, isolation_level=None, uri=True)) as source:
+        with closing(sqlite3.connect(target_path)) as target:
+            source.execute("BEGIN")
+            try:
+                # A deferred BEGIN takes its read snapshot at the first read.
+                source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                source.backup(target, pages=pages, progress=step_done)
+            finally:
+                source.execute("ROLLBACK")
+            return target.execute("PRAGMA page_count").fetchone()[0]
+
+
+def refresh_snapshot(source_path=None, target_path=None, pages=BACKUP_PAGES_PER_STEP, pause=BACKUP_STEP_PAUSE):
+    """
+    Rebuild the snapshot from the default database and swap it in atomically. Returns the snapshot's page count.
+
+    Connections already reading the old file keep it until they close; the new file's modification time is set to
+    when the copy started, which is what ``snapshot_age`` reports.
+    """
+    source_path = source_path or settings.DATABASES[DEFAULT_DB_ALIAS]["NAME"]
+    target_path = Path(target_path or settings.DB_SNAPSHOT_PATH)
+    partial_path = target_path.with_name(f".{target_path.name}.partial")
+    partial_path.unlink(missing_ok=True)
+
+    started = time.time()
+    page_count = online_backup(str(source_path), str(partial_path), pages=pages, pause=pause)
+    # The copy inherits the live database's WAL mode; a rollback journal keeps readers from creating -wal/-shm files.
+    with closing(sqlite3.connect(partial_path)) as snapshot:
+        snapshot.execute("PRAGMA journal_mode = DELETE")
+    os.utime(partial_path, (started, started))
+    os.replace(partial_path, target_path)
+    return page_count
+
+
+def snapshot_age():
+    """
+    Return how many seconds old the snapshot's data is, or None when no snapshot is configured or on disk.
+    """
+    if not settings.DB_SNAPSHOT_PATH or SNAPSHOT_DB_ALIAS not in connections.settings:
+        return None
+    try:
+        modified = os.stat(settings.DB_SNAPSHOT_PATH).st_mtime
+    except FileNotFoundError:
+        return None
+    return max(time.time() - modified, 0.0)
+
+
+def begin_snapshot_reads():
+    _snapshot_reads.set(True)
+
+
+def end_snapshot_reads():
+    _snapshot_reads.set(False)
+
+
+class SnapshotRouter:
+    """
+    Sends reads of SNAPSHOT_APP_LABELS models to the snapshot while a stale-tolerant view runs; writes always go to
+    the default database, including saves of instances read from the snapshot.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _snapshot_reads.get() and model._meta.app_label in SNAPSHOT_APP_LABELS:
+            return SNAPSHOT_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The snapshot is a copy of the default database, so their rows may reference each other.
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, SNAPSHOT_DB_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == SNAPSHOT_DB_ALIAS:
+            return False
+        return None
+
+
+class SnapshotReadMiddleware:
+    """
+    Serves safe-method requests to ``tolerates_staleness`` views from the snapshot while it is younger than
+    DB_SNAPSHOT_MAX_AGE, and reports its age in whole seconds in the X-Snapshot-Age response header.
+
+    Routing stays on until the request finishes (see core.signals), so streamed exports read the snapshot as well.
+    Without a usable snapshot the view simply reads the live database and the header is left out.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        age = getattr(request, "snapshot_age", None)
+        if age is not None:
+            response[SNAPSHOT_AGE_HEADER] = str(int(age))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in SAFE_METHODS or not get_view_mark(view_func, request.method, "tolerates_staleness"):
+            return None
+        age = snapshot_age()
+        if age is not None and age <= settings.DB_SNAPSHOT_MAX_AGE:
+            request.snapshot_age = age
+            begin_snapshot_reads()
+        return None
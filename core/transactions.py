@@ -0,0 +1,107 @@
+# core/transactions.py
+# Chooses the SQLite transaction mode of each request: deferred for reads, the configured (IMMEDIATE) mode for writes.
+# Exists because ATOMIC_REQUESTS with IMMEDIATE made every GET take the single write lock and queue behind writers.
+
+from contextvars import ContextVar
+
+from django.db import connections
+
+READ_POLICY = "read"
+WRITE_POLICY = "write"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+_read_only_request = ContextVar("read_only_request", default=False)
+
+
+def read_only_transaction(view):
+    """
+    Mark a view function, view class or handler method as read-only, so it runs deferred whatever the method.
+    """
+    view.transaction_policy = READ_POLICY
+    return view
+
+
+def write_transaction(view):
+    """
+    Mark a view function, view class or handler method as writing, so it takes the write lock even on GET.
+
+    Needed for safe-method views that record something (access history, tokens, GET delete links): a deferred
+    transaction that reads first cannot upgrade to a write once another worker has committed.
+    """
+    view.transaction_policy = WRITE_POLICY
+    return view
+
+
+def get_view_mark(view_func, method, attribute):
+    """
+    Return the value of a mark (``attribute``) set on a resolved view for an HTTP method, or None.
+
+    A mark on the handler method (viewset action or APIView/View method) wins over one on the view class, which
+    wins over one on the view function.
+    """
+    view_class = getattr(view_func, "cls", None) or getattr(view_func, "view_class", None)
+    candidates = []
+    if view_class is not None:
+        actions = getattr(view_func, "actions", None) or {}
+        handler_name = actions.get(method.lower(), method.lower())
+        candidates += [getattr(view_class, handler_name, None), view_class]
+    candidates.append(view_func)
+    for candidate in candidates:
+        value = getattr(candidate, attribute, None)
+        if value is not None:
+            return value
+    return None
+
+
+def get_transaction_policy(view_func, method):
+    """
+    Return READ_POLICY or WRITE_POLICY for a resolved view and HTTP method; unmarked views follow the method.
+    """
+    policy = get_view_mark(view_func, method, "transaction_policy")
+    if policy is not None:
+        return policy
+    return READ_POLICY if method in SAFE_METHODS else WRITE_POLICY
+
+
+def configured_transaction_mode(connection):
+    mode = connection.settings_dict.get("OPTIONS", {}).get("transaction_mode")
+    return mode.upper() if mode else None
+
+
+def apply_transaction_mode(connection):
+    """
+    Set a SQLite connection's BEGIN mode for the current request: plain (deferred) BEGIN for read-only requests.
+
+    Called for open connections when the policy changes and, through ``connection_created`` (see core.signals),
+    for connections opened later, since opening a connection re-reads the mode from settings.
+    """
+    if connection.vendor != "sqlite":
+        return
+    connection.transaction_mode = None if _read_only_request.get() else configured_transaction_mode(connection)
+
+
+def set_read_only_request(read_only):
+    _read_only_request.set(read_only)
+    for connection in connections.all(initialized_only=True):
+        apply_transaction_mode(connection)
+
+
+class TransactionPolicyMiddleware:
+    """
+    Runs safe-method and read-only views in deferred transactions and everything else in the configured mode.
+
+    ``process_view`` runs before Django opens the ATOMIC_REQUESTS transaction, so the mode is in place for its BEGIN.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            set_read_only_request(False)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        set_read_only_request(get_transaction_policy(view_func, request.method) == READ_POLICY)
+        return None
@@ -1,50 +1,67 @@
 # /Users/chershiongchuah/Developer/musicsamples/core/utils/export.py
 # This module provides CSV export and dataframe rendering utilities.
-# It generates downloadable CSV responses from querysets and dataframes.
+# It generates downloadable CSV responses from querysets and pivots, streaming queryset exports row by row.
 
 import csv
 import datetime
+import functools
+import io
+import itertools
+from collections import defaultdict
 
 import pandas as pd
-from django.http import HttpResponse
+from django.db.models import F
+from django.http import HttpResponse, StreamingHttpResponse
 
+# Derived, non-editable link columns that are maintained internally and never exported.
+EXCLUDED_EXPORT_FIELDS = ["clinical_data"]
 
-def export_csv(queryset, file_prefix="gtrac", file_name="samples", include_related=True):
-    """
-    Takes in queryset, returns csv download response
-    file_prefix: optional, default is gtrac to control the name of the csv file.
-    file_name: optional, default is samples
-    include_related: optional, default True. If True, includes foreign key fields
+# Rows fetched per database round trip while streaming an export.
+EXPORT_CHUNK_SIZE = 2000
 
-    By default takes in a queryset and returns gtrac_samples_[current_date].csv
+# Custom derived (non-field) columns exported for specific models.
+DERIVED_EXPORT_COLUMNS = {
+    "BasicScienceBox": ["sample_type_labels_display", "tissue_type_labels_display", "basic_science_groups_display"],
+}
+
+
+class Echo:
+    """
+    File-like object whose write() returns the value, so csv.writer can feed a StreamingHttpResponse.
     """
-    from django.db.models.fields.related import ForeignKey, OneToOneField
 
+    def write(self, value):
+        return value
+
+
+def _csv_filename(file_prefix, file_name):
     current_date = datetime.datetime.now().strftime("%d-%b-%Y")
+    return "%s_%s_%s.csv" % (file_prefix, file_name, current_date)
 
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename="%s_%s_%s.csv"' % (
-        file_prefix,
-        file_name,
-        current_date,
-    )
-    writer = csv.writer(response)
+
+def get_export_fields(model, include_related=True):
+    """
+    Returns the ordered list of column names exported for a model.
+    Direct fields come first, then many-to-many and derived fields, then related (foreign key) fields,
+    with the audit columns moved to the end.
+    """
+    from django.db.models.fields.related import ForeignKey, OneToOneField
 
     # Get all field names including related fields
     fields = []
 
     # First add the direct fields
-    for field in queryset.model._meta.fields:
-        fields.append(field.name)
+    for field in model._meta.fields:
+        if field.name not in EXCLUDED_EXPORT_FIELDS:
+            fields.append(field.name)
 
     # Then add the many-to-many fields
-    for field in queryset.model._meta.many_to_many:
+    for field in model._meta.many_to_many:
         fields.append(field.name)
 
     # Custom derived fields for specific models
-    if queryset.model.__name__ == "BasicScienceBox":
-        fields.extend(["sample_type_labels_display", "tissue_type_labels_display", "basic_science_groups_display"])
-    elif queryset.model.__name__ == "Experiment":
+    fields.extend(DERIVED_EXPORT_COLUMNS.get(model.__name__, []))
+    if model.__name__ == "Experiment":
         fields.append("boxes")
 
     # Then add the related fields
@@ -52,7 +69,9 @@ def export_csv(queryset, file_prefix="gtrac", file_name="samples", include_relat
         # List of related fields to exclude
         excluded_related_fields = ["study_id__study_name", "study_id__name"]
 
-        for field in queryset.model._meta.fields:
+        for field in model._meta.fields:
+            if field.name in EXCLUDED_EXPORT_FIELDS:
+                continue
             if isinstance(field, (ForeignKey, OneToOneField)):
                 related_model = field.related_model
                 if related_model and not related_model.__name__ == "User":
@@ -68,64 +87,197 @@ def export_csv(queryset, file_prefix="gtrac", file_name="samples", include_relat
     special_fields = ["created", "created_by", "last_modified", "last_modified_by"]
     regular_fields = [f for f in fields if f not in special_fields]
     special_fields_present = [f for f in special_fields if f in fields]
-    fields = regular_fields + special_fields_present
-
-    # Write header row
-    writer.writerow(fields)
-
-    # Write data rows
-    for obj in queryset:
-        row_data = []
-        for field_name in fields:
-            if "__" in field_name:
-                # This is a related field
-                parts = field_name.split("__")
-                value = obj
-                for part in parts:
-                    if value is None:
-                        break
-                    try:
-                        value = getattr(value, part)
-                        # Handle callable attributes (like methods)
-                        if callable(value):
-                            value = value()
-                    except (AttributeError, TypeError):
-                        value = None
-                        break
-            else:
-                # This is a direct field
-                try:
-                    value = getattr(obj, field_name)
-                    # Handle many-to-many fields first (before callable check)
-                    if hasattr(value, "all"):
-                        # This is a many-to-many manager
-                        related_objects = list(value.all())
-                        if related_objects:
-                            # Join the string representations
-                            value = ", ".join(str(obj) for obj in related_objects)
-                        else:
-                            value = ""
-                    # Handle callable attributes
-                    elif callable(value):
-                        value = value()
-                except (AttributeError, TypeError):
-                    value = None
-
-            # Convert None to empty string for CSV
-            if value is None:
-                value = ""
-
-            row_data.append(value)
-
-        writer.writerow(row_data)
+    return regular_fields + special_fields_present
+
+
+def _group_by_owner(model, lookup, owner_pks):
+    """
+    Returns {owner_pk: [instances]} for all instances of model related to the owners through lookup,
+    in one query and in the model's default ordering (primary key order when it has none).
+    """
+    grouped = defaultdict(list)
+    if not owner_pks:
+        return grouped
+    queryset = model._default_manager.filter(**{f"{lookup}__in": owner_pks}).annotate(export_owner_pk=F(lookup))
+    if not model._meta.ordering:
+        queryset = queryset.order_by("pk")
+    for instance in queryset:
+        grouped[instance.export_owner_pk].append(instance)
+    return grouped
+
+
+def _resolve_box_columns(box_pks):
+    """
+    Batched equivalent of the BasicScienceBox *_display properties, which otherwise query per box.
+    """
+    from app.choices import BasicScienceGroupChoices
+    from app.models import BasicScienceSampleType, Experiment, TissueType
+
+    experiments = _group_by_owner(Experiment, "boxes", box_pks)
+    experiment_pks = {experiment.pk for group in experiments.values() for experiment in group}
+    sample_types = _group_by_owner(BasicScienceSampleType, "experiments", experiment_pks)
+    tissue_types = _group_by_owner(TissueType, "experiments", experiment_pks)
+
+    def labels(types_by_experiment, box_experiments):
+        unique = {}
+        for experiment in box_experiments:
+            for item in types_by_experiment.get(experiment.pk, []):
+                unique[item.pk] = item.label or item.name
+        return ", ".join(unique.values())
+
+    columns = {column: {} for column in DERIVED_EXPORT_COLUMNS["BasicScienceBox"]}
+    for pk in box_pks:
+        box_experiments = experiments.get(pk, [])
+        groups = sorted({experiment.basic_science_group for experiment in box_experiments})
+        columns["sample_type_labels_display"][pk] = labels(sample_types, box_experiments)
+        columns["tissue_type_labels_display"][pk] = labels(tissue_types, box_experiments)
+        columns["basic_science_groups_display"][pk] = ", ".join(
+            BasicScienceGroupChoices(group).label for group in groups
+        )
+    return columns
+
+
+# Resolvers for DERIVED_EXPORT_COLUMNS, called once per chunk of primary keys.
+DERIVED_COLUMN_RESOLVERS = {
+    "BasicScienceBox": _resolve_box_columns,
+}
+
+
+class ExportPlan:
+    """
+    Compiled column plan for exporting one model.
+
+    Plain and related (``fk__field``) columns are read with a single values() projection. Foreign key
+    columns are rendered through the related object's __str__, many-to-many columns as a comma-joined
+    list, and derived columns through DERIVED_COLUMN_RESOLVERS; each of these is fetched in batches per
+    chunk of rows, so the number of queries does not depend on the number of exported objects.
+    """
+
+    def __init__(self, model, include_related=True):
+        self.model = model
+        self.columns = get_export_fields(model, include_related=include_related)
+        self.value_fields = []
+        self.object_columns = {}
+        self.many_columns = {}
+        self.derived_resolver = DERIVED_COLUMN_RESOLVERS.get(model.__name__)
+        derived = set(DERIVED_EXPORT_COLUMNS.get(model.__name__, []))
+
+        for column in self.columns:
+            if column in derived:
+                continue
+            field = self._resolve_field(column)
+            if field.many_to_many:
+                # Forward fields are looked up through their related query name, reverse ones by field name.
+                lookup = field.field.name if field.auto_created else field.related_query_name()
+                self.many_columns[column] = (field.related_model, lookup)
+                continue
+            self.value_fields.append(column)
+            if field.is_relation:
+                self.object_columns[column] = field.related_model
 
+    def _resolve_field(self, column):
+        model = self.model
+        field = None
+        for part in column.split("__"):
+            field = model._meta.get_field(part)
+            if field.is_relation:
+                model = field.related_model
+        return field
+
+    def render(self, rows):
+        """
+        Turns a chunk of values() dicts into CSV rows.
+        """
+        pks = [row["pk"] for row in rows]
+
+        objects_by_model = defaultdict(set)
+        for column, related_model in self.object_columns.items():
+            objects_by_model[related_model].update(row[column] for row in rows if row[column] is not None)
+        objects = {
+            related_model: {pk: str(obj) for pk, obj in related_model._base_manager.in_bulk(list(ids)).items()}
+            for related_model, ids in objects_by_model.items()
+        }
+
+        many = {}
+        for column, (related_model, lookup) in self.many_columns.items():
+            grouped = _group_by_owner(related_model, lookup, pks)
+            many[column] = {pk: ", ".join(str(obj) for obj in items) for pk, items in grouped.items()}
+
+        derived = self.derived_resolver(pks) if self.derived_resolver is not None else {}
+
+        for row in rows:
+            pk = row["pk"]
+            values = []
+            for column in self.columns:
+                if column in many:
+                    value = many[column].get(pk, "")
+                elif column in derived:
+                    value = derived[column].get(pk, "")
+                elif column in self.object_columns:
+                    value = row[column]
+                    if value is not None:
+                        value = objects[self.object_columns[column]].get(value)
+                else:
+                    value = row[column]
+
+                # Convert None to empty string for CSV
+                values.append("" if value is None else value)
+            yield values
+
+
+@functools.lru_cache(maxsize=None)
+def get_export_plan(model, include_related=True):
+    return ExportPlan(model, include_related=include_related)
+
+
+def iter_csv_rows(queryset, include_related=True, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields the header row followed by one list of cell values per object.
+    The queryset is read as a chunked values() iterator and related columns are resolved once per chunk,
+    so the full result set is never cached in memory and query count stays constant per chunk.
+    """
+    plan = get_export_plan(queryset.model, include_related=include_related)
+    yield list(plan.columns)
+    rows = queryset.values("pk", *plan.value_fields).iterator(chunk_size=chunk_size)
+    while chunk := list(itertools.islice(rows, chunk_size)):
+        yield from plan.render(chunk)
+
+
+def stream_csv(queryset, file_prefix="gtrac", file_name="samples", include_related=True):
+    """
+    Takes in queryset, returns a streaming csv download response
+    file_prefix: optional, default is gtrac to control the name of the csv file.
+    file_name: optional, default is samples
+    include_related: optional, default True. If True, includes foreign key fields
+
+    Rows are encoded as they are read from the database, so memory use does not grow with the export size.
+    """
+    writer = csv.writer(Echo())
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in iter_csv_rows(queryset, include_related=include_related)),
+        content_type="text/csv",
+    )
+    response["Content-Disposition"] = 'attachment; filename="%s"' % _csv_filename(file_prefix, file_name)
+    return response
+
+
+def export_csv(queryset, file_prefix="gtrac", file_name="samples", include_related=True):
+    """
+    Takes in queryset, returns a buffered csv download response
+    Prefer stream_csv for views; this builds the whole file in memory and suits small querysets only.
+
+    By default takes in a queryset and returns gtrac_samples_[current_date].csv
+    """
+    response = HttpResponse(content_type="text/csv")
+    response["Content-Disposition"] = 'attachment; filename="%s"' % _csv_filename(file_prefix, file_name)
+    csv.writer(response).writerows(iter_csv_rows(queryset, include_related=include_related))
     return response
 
 
-def render_dataframe_to_csv_response(df: pd.DataFrame, study_name: str):
+def render_pivot_to_csv_response(sample_types, rows, study_name: str):
     """
-    Takes in pandas dataframe and study name and
-    returns HttpResponse with csv file
+    Takes in the sample type labels and rows of a materialized pivot (core.pivots) and
+    returns HttpResponse with a csv file holding each cell's sample IDs joined by commas ("None" when empty)
     """
     current_date = datetime.datetime.now().strftime("%d-%b-%Y")
     response = HttpResponse(content_type="text/csv")
@@ -133,5 +285,26 @@ def render_dataframe_to_csv_response(df: pd.DataFrame, study_name: str):
         study_name,
         current_date,
     )
-    df.to_csv(response)  # type:ignore
+    writer = csv.writer(response, lineterminator="\n")
+    writer.writerow(["study_id", "sample_date", *sample_types])
+    for row in rows:
+        cells = [", ".join(row[label]) if row[label] else "None" for label in sample_types]
+        writer.writerow([row["study_id"], row["sample_date"].isoformat(), *cells])
+    return response
+
+
+def render_pivot_to_parquet_response(sample_types, rows, study_name: str):
+    """
+    Takes in the sample type labels and rows of a materialized pivot (core.pivots) and
+    returns HttpResponse with a parquet file holding one list column per sample type.
+    Raises ImportError when no parquet engine (pyarrow) is installed.
+    """
+    buffer = io.BytesIO()
+    pd.DataFrame(rows, columns=["study_id", "sample_date", *sample_types]).to_parquet(buffer, index=False)
+    current_date = datetime.datetime.now().strftime("%d-%b-%Y")
+    response = HttpResponse(buffer.getvalue(), content_type="application/vnd.apache.parquet")
+    response["Content-Disposition"] = "attachment; filename=%s_overview_%s.parquet" % (
+        study_name,
+        current_date,
+    )
     return response
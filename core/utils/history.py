@@ -3,47 +3,65 @@
 # It processes simple history diffs for audit and change visualization.
 
 import dataclasses
+from collections import defaultdict
 
+from django.db.models import ForeignKey
+
+
+def diff_history_records(records):
+    """
+    Diff each history record in ``records`` (newest first) against the record after it.
+
+    Foreign key values in the changes and the history users of all records are swapped for their objects with
+    one ``in_bulk`` per related model; values whose object no longer exists are left as raw primary keys.
+    """
+    records = list(records)
+    if not records:
+        return []
+    deltas = [new_record.diff_against(old_record) for new_record, old_record in zip(records, records[1:])]
+
+    foreign_keys = {
+        field.name: field.related_model for field in records[0]._meta.fields if isinstance(field, ForeignKey)
+    }
+    user_model = foreign_keys.get("history_user")
+    pending = defaultdict(set)
+    for delta in deltas:
+        for change in delta.changes:
+            related_model = foreign_keys.get(change.field)
+            if related_model is not None:
+                pending[related_model].update(value for value in (change.old, change.new) if value is not None)
+    if user_model is not None:
+        pending[user_model].update(record.history_user_id for record in records if record.history_user_id)
+    resolved = {model: model._base_manager.in_bulk(pks) for model, pks in pending.items() if pks}
+
+    if user_model is not None:
+        for record in records:
+            user = resolved.get(user_model, {}).get(record.history_user_id)
+            if user is not None:
+                record.history_user = user
 
-def historical_changes(query):
-    # Historical changes integrates simple history into the sample detail page
     changes = []
-    if query is not None:
-        last = query.first()
-        for all_changes in range(query.count()):
-            new_record, old_record = last, last.prev_record
-            if old_record is not None:
-                delta = new_record.diff_against(old_record)
-
-                # Prepare a new list for processed changes
-                processed_changes = []
-                for change in delta.changes:
-                    # Copy the change to avoid mutating a frozen instance
-                    change_dict = change.__dict__.copy()
-                    # Check if the field is 'study_id' (or any other FK field you want to handle)
-                    if change.field == "study_id":
-                        if change.old is not None:
-                            try:
-                                from app.models import StudyIdentifier
-
-                                old_instance = StudyIdentifier.objects.get(pk=change.old)
-                                change_dict["old"] = str(old_instance)
-                            except (StudyIdentifier.DoesNotExist, ValueError):  # type: ignore
-                                pass
-                        if change.new is not None:
-                            try:
-                                from app.models import StudyIdentifier
-
-                                new_instance = StudyIdentifier.objects.get(pk=change.new)
-                                change_dict["new"] = str(new_instance)
-                            except (StudyIdentifier.DoesNotExist, ValueError):  # type: ignore
-                                pass
-                    # Recreate the change object (assumes it's a dataclass)
-                    processed_change = dataclasses.replace(change, **change_dict)
-                    processed_changes.append(processed_change)
-
-                # Replace delta.changes with processed_changes
-                new_delta = dataclasses.replace(delta, changes=processed_changes)
-                changes.append(new_delta)
-                last = old_record
-        return changes
+    for delta in deltas:
+        processed_changes = []
+        for change in delta.changes:
+            related_model = foreign_keys.get(change.field)
+            if related_model is not None:
+                objects = resolved[related_model]
+                change = dataclasses.replace(
+                    change, old=objects.get(change.old, change.old), new=objects.get(change.new, change.new)
+                )
+            processed_changes.append(change)
+        changes.append(dataclasses.replace(delta, changes=processed_changes))
+    return changes
+
+
+def historical_changes(query):
+    """
+    Diff every history record in ``query`` against the one before it, newest first.
+
+    The records are loaded with one query and diffed in memory by ``diff_history_records``, so the cost does
+    not grow with the number of edits beyond the rows themselves.
+    """
+    if query is None:
+        return None
+    return diff_history_records(query.order_by("-history_date", "-history_id"))
@@ -0,0 +1,51 @@
+# core/versions.py
+# Keeps a per-model data version in the shared cache, refreshed whenever rows of that model change.
+# Exists so read endpoints can derive cheap validators (ETags, cache keys) without scanning the tables.
+
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY_PREFIX = "data-version"
+
+
+def _version_key(model) -> str:
+    return f"{VERSION_KEY_PREFIX}:{model._meta.label_lower}"
+
+
+def get_data_versions(*models) -> tuple:
+    """
+    Return the current version of each model, in the order given.
+
+    A version is the nanosecond timestamp of the model's last recorded change, so it also bounds the
+    Last-Modified time of anything derived from that model. A version missing from the cache (first use
+    or eviction) is seeded with the current time, which can only make data look newer, never older.
+    """
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key) or time.time_ns()
+    return tuple(versions[key] for key in keys)
+
+
+def bump_data_version(*models):
+    """
+    Mark the data of the given models as changed.
+
+    Model signals call this for ordinary saves and deletes. Bulk write paths (``bulk_update``,
+    ``bulk_create``, ``queryset.update``) bypass signals and must call it explicitly.
+
+    Inside a transaction the versions are bumped now and again once it commits: a reader between the two still
+    sees the old rows, and anything it caches under the first bump must not outlive the commit.
+    """
+    _set_versions(models)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _set_versions(models))
+
+
+def _set_versions(models):
+    now = time.time_ns()
+    cache.set_many({_version_key(model): now for model in models}, timeout=None)
@@ -3,6 +3,16 @@ import datetime
 import pandas as pd
 from django.http import HttpResponse
 
+from datasets.models import DatasetAnalytics
+
+GIDAMPS_ANALYTICS_NAMES = (
+    "gidamps_participants_by_center",
+    "gidamps_participants_by_study_group",
+    "gidamps_participants_by_recruitment_setting",
+    "gidamps_participants_by_new_diagnosis_of_ibd",
+    "gidamps_montreal_classification",
+)
+
 
 def export_json_field(dataset_name, jsonfield):
     """
@@ -16,3 +26,11 @@ def export_json_field(dataset_name, jsonfield):
     df.to_csv(path_or_buf=response, index=False)
 
     return response
+
+
+def get_dataset_analytics(names):
+    """
+    Return {name: data} for the named DatasetAnalytics entries with one query; missing entries map to None.
+    """
+    found = dict(DatasetAnalytics.objects.filter(name__in=names).values_list("name", "data"))
+    return {name: found.get(name) for name in names}
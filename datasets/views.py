@@ -8,6 +8,8 @@ from rest_framework.permissions import IsAdminUser
 from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from rest_framework.response import Response
 
+from core.snapshots import tolerates_staleness
+from core.transactions import write_transaction
 from datasets.models import Dataset, DatasetAccessHistory, DatasetAnalytics, DataSourceStatusCheck
 from datasets.permissions import CustomDjangoModelPermission
 from datasets.serializers import DatasetAnalyticsSerializer, DatasetSerializer, DataSourceStatusCheckSerializer
@@ -123,12 +125,15 @@ def list_datasets(request):
 
 @login_required
 @permission_required("datasets.view_dataset", raise_exception=True)
+@write_transaction
+@tolerates_staleness
 def dataset_export_csv(request, dataset_name):
     dataset = get_object_or_404(Dataset, name=dataset_name)
     DatasetAccessHistory.objects.create(dataset=dataset, user=request.user, access_type="CSV")
     return export_json_field(dataset.name, dataset.json)
 
 
+@write_transaction
 class RetrieveDatasetAPIView(RetrieveAPIView):
     lookup_field = "name"
     queryset = Dataset.objects.all()
@@ -22,28 +22,14 @@ import { Separator } from "@/components/ui/separator";
 import { SidebarInset, SidebarProvider, SidebarTrigger } from "@/components/ui/sidebar";
 import { AUTH_COOKIE_NAME, buildBackendUrl } from "@/lib/auth";
 import { resolveDashboardUser } from "@/lib/dashboard-user";
+import { buildHistoryEntries, fetchHistoryPage, type HistorySummaryResponse } from "@/lib/history";
 import { isJwtExpired } from "@/lib/jwt";
 
-type BoxHistoryChangeResponse = {
-  field: string;
-  label: string;
-  old: string | null;
-  new: string | null;
-};
-
-type BoxHistoryEntryResponse = {
-  timestamp: string;
-  user: string | null;
-  summary?: string | null;
-  changes: BoxHistoryChangeResponse[];
-};
-
-type BoxHistoryResponse = {
+type BoxHistoryResponse = HistorySummaryResponse & {
   created: string;
   created_by: string | null;
   last_modified: string;
   last_modified_by: string | null;
-  entries: BoxHistoryEntryResponse[];
 };
 
 type BoxExperimentSummary = {
@@ -197,30 +183,11 @@ export default async function BoxDetailPage({ params }: { params: PageParams })
     lastModified: box.history.last_modified,
     lastModifiedBy: box.history.last_modified_by,
   };
-  const normalizeHistoryValue = (value: string | null) => {
-    if (value === null) {
-      return null;
-    }
-    const trimmed = value.trim();
-    return trimmed ? trimmed : null;
-  };
-  const historyEntries = box.history.entries.map((entry) => ({
-    timestamp: entry.timestamp,
-    user: entry.user,
-    summary: entry.summary ?? null,
-    changes: entry.changes
-      .map((change) => ({
-        field: change.field,
-        label: change.label,
-        old: change.old,
-        new: change.new,
-      }))
-      .filter((change) => {
-        const normalizedOld = normalizeHistoryValue(change.old);
-        const normalizedNew = normalizeHistoryValue(change.new);
-        return normalizedOld !== null || normalizedNew !== null;
-      }),
-  }));
+  const historyPage = await fetchHistoryPage(
+    `/api/v3/boxes/${encodeURIComponent(params.boxId)}/`,
+    token,
+  );
+  const historyEntries = buildHistoryEntries(historyPage.results);
 
   return (
     <SidebarProvider>
@@ -24,28 +24,14 @@ import { Separator } from "@/components/ui/separator";
 import { SidebarInset, SidebarProvider, SidebarTrigger } from "@/components/ui/sidebar";
 import { AUTH_COOKIE_NAME, buildBackendUrl } from "@/lib/auth";
 import { resolveDashboardUser } from "@/lib/dashboard-user";
+import { buildHistoryEntries, fetchHistoryPage, type HistorySummaryResponse } from "@/lib/history";
 import { isJwtExpired } from "@/lib/jwt";
 
-type SampleHistoryChangeResponse = {
-  field: string;
-  label: string;
-  old: string | null;
-  new: string | null;
-};
-
-type SampleHistoryEntryResponse = {
-  timestamp: string;
-  user: string | null;
-  summary?: string | null;
-  changes: SampleHistoryChangeResponse[];
-};
-
-type SampleHistoryResponse = {
+type SampleHistoryResponse = HistorySummaryResponse & {
   created: string;
   created_by: string | null;
   last_modified: string;
   last_modified_by: string | null;
-  entries: SampleHistoryEntryResponse[];
 };
 
 type StudyIdentifierSummary = {
@@ -327,30 +313,11 @@ export default async function SampleDetailPage({
     lastModified: sample.history.last_modified,
     lastModifiedBy: sample.history.last_modified_by,
   };
-  const normalizeHistoryValue = (value: string | null) => {
-    if (value === null) {
-      return null;
-    }
-    const trimmed = value.trim();
-    return trimmed ? trimmed : null;
-  };
-  const historyEntries = sample.history.entries.map((entry) => ({
-    timestamp: entry.timestamp,
-    user: entry.user,
-    summary: entry.summary ?? null,
-    changes: entry.changes
-      .map((change) => ({
-        field: change.field,
-        label: change.label,
-        old: change.old,
-        new: change.new,
-      }))
-      .filter((change) => {
-        const normalizedOld = normalizeHistoryValue(change.old);
-        const normalizedNew = normalizeHistoryValue(change.new);
-        return normalizedOld !== null || normalizedNew !== null;
-      }),
-  }));
+  const historyPage = await fetchHistoryPage(
+    `/api/v3/samples/${encodeURIComponent(sample.sample_id)}/`,
+    token,
+  );
+  const historyEntries = buildHistoryEntries(historyPage.results);
   const showUpdatedMessage = searchParams?.updated === "1";
 
   return (
@@ -26,20 +26,13 @@ import { Separator } from "@/components/ui/separator";
 import { SidebarInset, SidebarProvider, SidebarTrigger } from "@/components/ui/sidebar";
 import { AUTH_COOKIE_NAME, buildBackendUrl } from "@/lib/auth";
 import { resolveDashboardUser } from "@/lib/dashboard-user";
+import {
+  fetchHistoryPage,
+  type HistoryEntryResponse,
+  type HistorySummaryResponse,
+} from "@/lib/history";
 import { isJwtExpired } from "@/lib/jwt";
 
-type StudyIdHistoryChange = {
-  field: string;
-  old: string | null;
-  new: string | null;
-};
-
-type StudyIdHistoryEntry = {
-  history_date: string;
-  history_user: string | null;
-  changes: StudyIdHistoryChange[];
-};
-
 type StudyIdDetailResponse = {
   id: number;
   name: string;
@@ -57,7 +50,7 @@ type StudyIdDetailResponse = {
   il23r_mutation_present: boolean | null;
   sample_count: number;
   file_count: number;
-  history: StudyIdHistoryEntry[];
+  history: HistorySummaryResponse;
 };
 
 type PageParams = {
@@ -203,25 +196,25 @@ function buildMetadataRows(detail: StudyIdDetailResponse): DetailRow[] {
   ];
 }
 
-function HistoryList({ history }: { history: StudyIdHistoryEntry[] }) {
+function HistoryList({ history }: { history: HistoryEntryResponse[] }) {
   if (!history.length) {
     return <p className="text-sm text-muted-foreground">No history recorded yet.</p>;
   }
 
   return (
     <div className="space-y-3">
-      {history.map((entry) => (
+      {history.map((entry, index) => (
         <div
-          key={entry.history_date}
+          key={`${entry.timestamp}-${index}`}
           className="rounded-md border border-border/60 bg-muted/50 px-3 py-2 text-sm"
         >
           <p className="text-[0.7rem] text-muted-foreground">
-            {formatDateTime(entry.history_date)} · {entry.history_user ?? "Unknown user"}
+            {formatDateTime(entry.timestamp)} · {entry.user ?? "Unknown user"}
           </p>
           {entry.changes.length ? (
             <ul className="mt-2 space-y-1">
               {entry.changes.map((change) => (
-                <li key={`${entry.history_date}-${change.field}`}>
+                <li key={`${entry.timestamp}-${change.field}`}>
                   <span className="font-semibold">{change.field.replace(/_/g, " ")}</span> changed
                   from <span className="font-semibold">{change.old ?? "blank field"}</span> to{" "}
                   <span className="font-semibold">{change.new ?? "blank field"}</span>
@@ -229,7 +222,9 @@ function HistoryList({ history }: { history: StudyIdHistoryEntry[] }) {
               ))}
             </ul>
           ) : (
-            <p className="mt-2 text-sm text-muted-foreground">No fields changed.</p>
+            <p className="mt-2 text-sm text-muted-foreground">
+              {entry.summary ?? "No fields changed."}
+            </p>
           )}
         </div>
       ))}
@@ -288,6 +283,7 @@ export default async function StudyIdDetailPage({ params }: { params: PageParams
     notFound();
   }
   const detail = await fetchStudyIdDetailById(resolvedId, token);
+  const historyPage = await fetchHistoryPage(`/api/v3/study-ids/${resolvedId}/`, token);
 
   return (
     <SidebarProvider>
@@ -346,7 +342,7 @@ export default async function StudyIdDetailPage({ params }: { params: PageParams
                     <CardTitle>History</CardTitle>
                   </CardHeader>
                   <CardContent>
-                    <HistoryList history={detail.history} />
+                    <HistoryList history={historyPage.results} />
                   </CardContent>
                 </Card>
               </div>
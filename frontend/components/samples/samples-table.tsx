@@ -475,6 +475,13 @@ export function SamplesTable({ initialFilters, hideToolbar = false }: SamplesTab
         const query = buildSamplesQueryParams();
         query.set("page", String(pageIndex + 1));
         query.set("page_size", String(pageSize));
+        // Hidden columns are omitted so the API can skip the joins and clinical lookups behind them.
+        const hiddenColumns = Object.entries(columnVisibility)
+          .filter(([, visible]) => !visible)
+          .map(([column]) => column);
+        if (hiddenColumns.length > 0) {
+          query.set("omit", hiddenColumns.join(","));
+        }
 
         const endpoint = searchQuery ? "/api/dashboard/samples/search" : "/api/dashboard/samples";
 
@@ -525,7 +532,7 @@ export function SamplesTable({ initialFilters, hideToolbar = false }: SamplesTab
     return () => {
       controller.abort();
     };
-  }, [pagination, sorting, searchQuery, includeUsed, filters]);
+  }, [pagination, sorting, searchQuery, includeUsed, filters, columnVisibility]);
 
   const closeUsedDialog = (forceClose = false) => {
     if (isMarkingUsed && !forceClose) {
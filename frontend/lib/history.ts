@@ -0,0 +1,69 @@
+// frontend/lib/history.ts
+// Fetches a page of audit history from the v3 history sub-resources (e.g. /api/v3/samples/{id}/history/).
+// Exists because detail payloads only carry a history summary; the entries are paginated separately.
+
+import { buildBackendUrl } from "@/lib/auth";
+
+export type HistoryChangeResponse = {
+  field: string;
+  label: string;
+  old: string | null;
+  new: string | null;
+};
+
+export type HistoryEntryResponse = {
+  timestamp: string;
+  user: string | null;
+  summary?: string | null;
+  changes: HistoryChangeResponse[];
+};
+
+export type HistorySummaryResponse = {
+  count: number;
+  last_change: HistoryEntryResponse | null;
+};
+
+export type HistoryPageResponse = {
+  next: string | null;
+  previous: string | null;
+  results: HistoryEntryResponse[];
+};
+
+export async function fetchHistoryPage(
+  resourcePath: string,
+  token: string,
+): Promise<HistoryPageResponse> {
+  const response = await fetch(buildBackendUrl(`${resourcePath}history/`), {
+    headers: {
+      Authorization: `Bearer ${token}`,
+      "Content-Type": "application/json",
+    },
+    cache: "no-store",
+  });
+
+  if (!response.ok) {
+    throw new Error(`Failed to load history: ${response.status}`);
+  }
+
+  return (await response.json()) as HistoryPageResponse;
+}
+
+function normalizeHistoryValue(value: string | null): string | null {
+  if (value === null) {
+    return null;
+  }
+  const trimmed = value.trim();
+  return trimmed ? trimmed : null;
+}
+
+export function buildHistoryEntries(entries: HistoryEntryResponse[]) {
+  return entries.map((entry) => ({
+    timestamp: entry.timestamp,
+    user: entry.user,
+    summary: entry.summary ?? null,
+    changes: entry.changes.filter(
+      (change) =>
+        normalizeHistoryValue(change.old) !== null || normalizeHistoryValue(change.new) !== null,
+    ),
+  }));
+}
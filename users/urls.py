@@ -1,6 +1,7 @@
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.views import LogoutView
 from django.urls import path
+from core.transactions import read_only_transaction
 from users.views import (
     PasswordChangeView,
     account,
@@ -41,11 +42,14 @@ urlpatterns = [
     ),
     path(
         "password_reset/",
-        auth_views.PasswordResetView.as_view(
-            template_name="accounts/password_reset.html",
-            subject_template_name="accounts/password_reset_subject.txt",
-            email_template_name="emails/password_reset_email.txt",
-            html_email_template_name="emails/password_reset_email.html",
+        # Sending the reset email only reads the user table.
+        read_only_transaction(
+            auth_views.PasswordResetView.as_view(
+                template_name="accounts/password_reset.html",
+                subject_template_name="accounts/password_reset_subject.txt",
+                email_template_name="emails/password_reset_email.txt",
+                html_email_template_name="emails/password_reset_email.html",
+            )
         ),
         name="password_reset",
     ),
@@ -23,6 +23,7 @@ from django.views.generic import FormView
 from rest_framework.authtoken.models import Token
 
 from app.models import Sample
+from core.transactions import read_only_transaction, write_transaction
 from users.forms import LoginForm, NewUserForm
 from users.utils import generate_random_password, send_welcome_email
 
@@ -52,6 +53,7 @@ def login_view(request):
 
 @csrf_exempt
 @require_POST
+@read_only_transaction
 def password_reset_api(request):
     try:
         payload = json.loads(request.body or "{}")
@@ -125,6 +127,7 @@ def password_reset_confirm_api(request):
 
 
 @login_required
+@write_transaction
 def generate_token(request):
     Token.objects.get_or_create(user=request.user)
     if "next" in request.GET:
@@ -134,6 +137,7 @@ def generate_token(request):
 
 
 @login_required
+@write_transaction
 def delete_token(request):
     token = get_object_or_404(Token, user=request.user)
     token.delete()
@@ -144,6 +148,7 @@ def delete_token(request):
 
 
 @login_required
+@write_transaction
 def refresh_token(request):
     token = get_object_or_404(Token, user=request.user)
     token.delete()
@@ -238,6 +243,7 @@ def user_list_view(request):
 
 
 @staff_member_required
+@write_transaction
 def make_staff_view(request, user_id):
     user = get_object_or_404(User, id=user_id)
     user.is_staff = True
@@ -247,6 +253,7 @@ def make_staff_view(request, user_id):
 
 
 @staff_member_required
+@write_transaction
 def remove_staff_view(request, user_id):
     user = get_object_or_404(User, id=user_id)
     if user == request.user:
@@ -261,6 +268,7 @@ def remove_staff_view(request, user_id):
 
 
 @staff_member_required
+@write_transaction
 def activate_account_view(request, user_id):
     user = get_object_or_404(User, id=user_id)
     user.is_active = True
@@ -270,6 +278,7 @@ def activate_account_view(request, user_id):
 
 
 @staff_member_required
+@write_transaction
 def deactivate_account_view(request, user_id):
     user = get_object_or_404(User, id=user_id)
     if user == request.user: